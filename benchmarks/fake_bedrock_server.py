@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Stand in for `bedrock_server` when benchmarking gazoo.
+
+The save commands are implemented like the real server: `save hold`
+starts a save, `save query` answers "A previous save has not been
+completed." until the save is done (after `--save-delay` seconds), then
+prints "Data saved. Files are now ready to be copied." followed by the
+`path:length` list of every file in the worlds directory.  `save resume`
+ends the save.  `stop` exits.
+
+With `--churn`, every `save resume` changes the world like a running
+server would: the LevelDB log grows, and every few saves a new table
+file is written.  Files are never changed while saving is held.
+"""
+
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from os import SEEK_END, walk
+from pathlib import Path
+from random import Random
+from sys import stdin
+from time import monotonic
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Final, List, Optional
+
+_NOT_COMPLETED: Final[str] = 'A previous save has not been completed.'
+_SAVED: Final[str] = 'Data saved. Files are now ready to be copied.'
+_WORLDS_DIR_NAME: Final[str] = 'worlds'
+
+
+def main() -> None:
+    """
+    Run the fake server until `stop` or the end of input.
+    """
+
+    parser = ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--churn',
+                        default=0,
+                        help='bytes appended to the log on each resume',
+                        type=int)
+    parser.add_argument('--save-delay',
+                        default=0.1,
+                        help='seconds a save takes after `save hold`',
+                        type=float)
+    args = parser.parse_args()
+
+    rng = Random(0)
+    hold_start: Optional[float] = None
+    resumes = 0
+
+    _print('[INFO] Starting Server')
+    _print('[INFO] Server started.')
+
+    for line in stdin:
+        command = line.strip()
+
+        if command == 'save hold':
+            if hold_start is None:
+                hold_start = monotonic()
+            _print('Saving...')
+        elif command == 'save query':
+            if (hold_start is None
+                    or monotonic() - hold_start < args.save_delay):
+                _print(_NOT_COMPLETED)
+            else:
+                _print(_SAVED)
+                _print(', '.join(_list_files()))
+        elif command == 'save resume':
+            if hold_start is not None and args.churn > 0:
+                resumes += 1
+                _churn(rng, args.churn, resumes)
+            hold_start = None
+            _print('Changes to the level are resumed.')
+        elif command == 'stop':
+            _print('[INFO] Stopping server...')
+            _print('Quit correctly')
+            break
+        else:
+            _print(f'Unknown command: {command}')
+
+
+def _churn(rng: Random, length: int, resumes: int) -> None:
+    """
+    Append to the log of each world, and write a new table sometimes.
+    """
+
+    for world_path in Path(_WORLDS_DIR_NAME).iterdir():
+        db_path = world_path.joinpath('db')
+
+        logs = sorted(db_path.glob('*.log'))
+        if logs:
+            with logs[-1].open(mode='ab') as log_file:
+                log_file.write(rng.getrandbits(length * 8).to_bytes(
+                    length, 'little'))
+
+        if resumes % 5 == 0:
+            tables = sorted(db_path.glob('*.ldb'))
+            number = int(tables[-1].stem) + 1 if tables else 1
+            with db_path.joinpath(f'{number:06}.ldb').open(
+                    mode='wb') as table_file:
+                table_file.write(
+                    rng.getrandbits(length * 8).to_bytes(length, 'little'))
+
+
+def _list_files() -> List[str]:
+    """
+    Get `path:length` of every file in the worlds directory.
+    """
+
+    files: List[str] = []
+    for (dir_path, _dir_names, file_names) in walk(_WORLDS_DIR_NAME):
+        for file_name in sorted(file_names):
+            path = Path(dir_path, file_name)
+            with path.open(mode='rb') as file:
+                length = file.seek(0, SEEK_END)
+            files.append(
+                f'{path.relative_to(_WORLDS_DIR_NAME).as_posix()}:{length}')
+
+    return files
+
+
+def _print(line: str) -> None:
+    print(line, flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Benchmark what a backup does to the page cache, with and without hints.
+
+For each setting of `page_cache_hints`, a server root is set up in a
+temporary directory with a synthetic world (see `world_generator`).  The
+newest part of the world (the "hot" set, `--hot` of its size) is read
+into the page cache and the rest is dropped from it, like a server that
+keeps reading its recent chunks.  A backup is then made in process, the
+way gazoo makes one (snapshot, then archive).  Reported are how long the
+backup took, how much of the page cache it left filled with pages that
+are not hot (world files and the archive), how much of the hot set is
+still cached, and the latency of random 4 KiB reads of the hot set, as
+the server would do them, right after the backup.
+
+Without memory pressure, nothing hot is evicted either way.  To see hot
+reads go cold without the hints, use a world bigger than the free memory
+or run the benchmark in a memory limited cgroup, e.g.
+`systemd-run --user --scope -p MemoryMax=256M python3 <this script>`.
+"""
+
+from __future__ import annotations
+
+import sys
+from argparse import ArgumentParser
+from json import dump
+from mmap import PAGESIZE
+from os import POSIX_FADV_DONTNEED, chdir, fsync, posix_fadvise, pread
+from pathlib import Path
+from random import Random
+from statistics import median, quantiles
+from tempfile import TemporaryDirectory
+from time import monotonic, perf_counter
+from typing import TYPE_CHECKING
+
+from world_generator import generate
+
+_SRC_PATH = Path(__file__).resolve().parent.parent.joinpath('src')
+sys.path.insert(0, str(_SRC_PATH))
+
+# pylint: disable=wrong-import-position
+from gazoo.backup_file import BackupFile  # noqa: E402
+from gazoo.page_cache import PageCache  # noqa: E402
+from gazoo.util import Util  # noqa: E402
+
+if TYPE_CHECKING:
+    from argparse import Namespace
+    from typing import Any, Dict, Final, List
+
+_BLOCK_SIZE: Final[int] = 4 * 1024  # 4 KiB
+_MIB: Final[int] = 1024 * 1024
+_WORLD_NAME: Final[str] = 'benchmark'
+
+
+def main() -> None:
+    """
+    Run the benchmark from command line arguments and report results.
+    """
+
+    parser = ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--files', default=200, type=int,
+                        help='number of world files (default: 200)')
+    parser.add_argument('--hot', default=0.25, type=float,
+                        help='fraction of the world the server reads ' +
+                        '(default: 0.25)')
+    parser.add_argument('--json', type=Path,
+                        help='also write results to a JSON file')
+    parser.add_argument('--samples', default=2000, type=int,
+                        help='random reads of the hot set (default: 2000)')
+    parser.add_argument('--size', default=256, type=float,
+                        help='world size in MiB (default: 256)')
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    with TemporaryDirectory(prefix='gazoo-page-cache-') as root:
+        for hints in [False, True]:
+            root_path = Path(root, 'on' if hints else 'off')
+            root_path.mkdir()
+            results.append(_run(root_path, hints, args))
+
+    _report(results)
+
+    if args.json is not None:
+        with args.json.open(mode='w') as json_file:
+            dump(results, json_file, indent=2)
+
+
+def _cached_bytes(paths: List[Path]) -> int:
+    """
+    Get how many bytes of files are in the page cache.
+    """
+
+    total = 0
+    for path in paths:
+        with path.open(mode='rb') as file:
+            resident = PageCache.resident_pages(file, path.stat().st_size)
+        if resident is None:
+            raise RuntimeError('mincore is not supported here')
+        total += sum(page & 1 for page in resident) * PAGESIZE
+
+    return min(total, sum(path.stat().st_size for path in paths))
+
+
+def _drop(paths: List[Path]) -> None:
+    """
+    Write files out to disk and drop them from the page cache.
+    """
+
+    for path in paths:
+        with path.open(mode='rb') as file:
+            fsync(file.fileno())
+            posix_fadvise(file.fileno(), 0, 0, POSIX_FADV_DONTNEED)
+
+
+def _read_latencies(paths: List[Path], samples: int) -> List[float]:
+    """
+    Time random block reads of files (in seconds).
+    """
+
+    rng = Random(0)
+    sizes = [path.stat().st_size for path in paths]
+    files = [path.open(mode='rb') for path in paths]
+
+    latencies: List[float] = []
+    try:
+        for _sample in range(samples):
+            index = rng.randrange(len(files))
+            offset = rng.randrange(max(sizes[index] // _BLOCK_SIZE, 1))
+            start = perf_counter()
+            pread(files[index].fileno(), _BLOCK_SIZE, offset * _BLOCK_SIZE)
+            latencies.append(perf_counter() - start)
+    finally:
+        for file in files:
+            file.close()
+
+    return latencies
+
+
+def _report(results: List[Dict[str, Any]]) -> None:
+    """
+    Print results as a table.
+    """
+
+    print(f'world: {results[0]["world_size"] / _MIB:.1f} MiB, hot set: ' +
+          f'{results[0]["hot_size"] / _MIB:.1f} MiB')
+    print(f'{"hints":>5}  {"backup (s)":>10}  {"left (MiB)":>10}  ' +
+          f'{"hot cached":>10}  {"p50 (us)":>9}  {"p99 (us)":>9}')
+
+    for result in results:
+        print(f'{"on" if result["hints"] else "off":>5}  ' +
+              f'{result["backup"]:>10.3f}  ' +
+              f'{result["left_cached"] / _MIB:>10.1f}  ' +
+              f'{result["hot_cached"] / result["hot_size"]:>10.1%}  ' +
+              f'{result["read_p50"] * 1e6:>9.1f}  ' +
+              f'{result["read_p99"] * 1e6:>9.1f}')
+
+
+def _run(root_path: Path, hints: bool, args: Namespace) -> Dict[str, Any]:
+    """
+    Set up a server root, make a backup in it, and collect results.
+    """
+
+    world_path = root_path.joinpath('worlds', _WORLD_NAME)
+    world_size = generate(world_path, int(args.size * _MIB), args.files)
+
+    root_path.joinpath('gazoo').mkdir()
+    root_path.joinpath('gazoo', 'gazoo.cfg').write_text(
+        f'full_backup_every=1\npage_cache_hints={str(hints).lower()}\n')
+
+    # newest first, like the tables a server reads most
+    world_files = sorted((path for path in world_path.rglob('*')
+                          if path.is_file()),
+                         key=lambda path: path.name,
+                         reverse=True)
+    hot_files: List[Path] = []
+    hot_size = 0
+    for path in world_files:
+        if hot_size >= world_size * args.hot:
+            break
+        hot_files.append(path)
+        hot_size += path.stat().st_size
+    cold_files = [path for path in world_files if path not in hot_files]
+
+    _drop(world_files)
+    for path in hot_files:
+        path.read_bytes()
+
+    chdir(root_path)
+    try:
+        Util.ensure_setup()
+        config = Util.read_config()
+
+        backup_files = [
+            BackupFile(str(path.relative_to(world_path.parent)),
+                       path.stat().st_size) for path in world_files
+        ]
+
+        PageCache.configure(config.page_cache_hints)
+
+        start = monotonic()
+        Util.save_snapshot(backup_files, config,
+                           Util.snapshot_files(backup_files))
+        backup = monotonic() - start
+
+        archives = [
+            path for path in Util.backups_dir_path().iterdir()
+            if path.name.startswith(_WORLD_NAME)
+        ]
+    finally:
+        chdir(root_path.parent)
+
+    left_cached = _cached_bytes(cold_files + archives)
+    hot_cached = _cached_bytes(hot_files)
+    latencies = _read_latencies(hot_files, args.samples)
+
+    return {
+        'hints': hints,
+        'world_size': world_size,
+        'hot_size': hot_size,
+        'backup': backup,
+        'left_cached': left_cached,
+        'hot_cached': hot_cached,
+        'read_p50': median(latencies),
+        'read_p99': quantiles(latencies, n=100)[-1],
+    }
+
+
+if __name__ == '__main__':
+    main()
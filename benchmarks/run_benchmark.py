@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Benchmark gazoo end to end against a fake bedrock server.
+
+A server root is set up in a temporary directory with a synthetic world
+(see `world_generator`) and a stand-in `bedrock_server` (see
+`fake_bedrock_server`).  gazoo (from this source tree) wraps it until
+the requested number of backups is saved, then the latest backup is
+restored.  Reported are, per backup, the time saving was held and the
+total backup time (and throughput, relative to the world size), and
+overall, the peak RSS of gazoo and its workers, and the restore time.
+"""
+
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from json import dump
+from os import environ, pathsep
+from pathlib import Path
+from re import compile as compyle
+from resource import RUSAGE_CHILDREN, getrusage
+from statistics import median
+from subprocess import DEVNULL, PIPE, Popen, run
+from sys import executable, platform
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from world_generator import generate
+
+if TYPE_CHECKING:
+    from argparse import Namespace
+    from typing import Any, Dict, Final, List
+
+_BENCHMARKS_DIR_PATH: Final[Path] = Path(__file__).resolve().parent
+_GAZOO: Final[List[str]] = [executable, '-c', 'import gazoo; gazoo.main()']
+_HOLD_PATTERN: Final[str] = r'Save hold released after ([\d.]+) seconds'
+_MIB: Final[int] = 1024 * 1024
+_SAVED_PATTERN: Final[str] = r'Backup saved after ([\d.]+) seconds'
+_WORLD_NAME: Final[str] = 'benchmark'
+
+
+def main() -> None:
+    """
+    Run the benchmark from command line arguments and report results.
+    """
+
+    parser = ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--asyncio', action='store_true',
+                        help='use the asyncio wrapper')
+    parser.add_argument('--backend', default='zip',
+                        help='backup backend (default: zip)')
+    parser.add_argument('--backups', default=3, type=int,
+                        help='number of backups to make (default: 3)')
+    parser.add_argument('--churn', default=0, type=int,
+                        help='bytes the server writes between backups ' +
+                        '(default: 0)')
+    parser.add_argument('--compress-queue-depth', default=0, type=int,
+                        help='files compressed ahead of writing ' +
+                        '(default: 0, twice the workers)')
+    parser.add_argument('--compression', default='deflate',
+                        help='compression method (default: deflate)')
+    parser.add_argument('--compression-level', default=6, type=int,
+                        help='compression level (default: 6)')
+    parser.add_argument('--compression-workers', default=0, type=int,
+                        help='compression processes (default: 0, per CPU)')
+    parser.add_argument('--files', default=200, type=int,
+                        help='number of world files (default: 200)')
+    parser.add_argument('--format', default='zip',
+                        help='archive format: zip, tar.xz, or tar.zst ' +
+                        '(default: zip)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='allow incremental backups')
+    parser.add_argument('--io-idle', action='store_true',
+                        help='archive with the idle I/O scheduling class')
+    parser.add_argument('--json', type=Path,
+                        help='also write results to a JSON file')
+    parser.add_argument('--read-queue-depth', default=0, type=int,
+                        help='files read ahead of compressing ' +
+                        '(default: 0, twice the workers)')
+    parser.add_argument('--read-rate', default=0, type=float,
+                        help='archive read limit in MiB/s (default: 0, none)')
+    parser.add_argument('--size', default=256, type=float,
+                        help='world size in MiB (default: 256)')
+    parser.add_argument('--timeout', default=600, type=float,
+                        help='seconds to wait for the backups (default: 600)')
+    parser.add_argument('--write-rate', default=0, type=float,
+                        help='archive write limit in MiB/s (default: 0, ' +
+                        'none)')
+    args = parser.parse_args()
+
+    with TemporaryDirectory(prefix='gazoo-benchmark-') as root:
+        results = _run(Path(root), args)
+
+    _report(results)
+
+    if args.json is not None:
+        with args.json.open(mode='w') as json_file:
+            dump(results, json_file, indent=2)
+
+
+def _env() -> Dict[str, str]:
+    """
+    Get the environment for running gazoo from this source tree.
+    """
+
+    env = dict(environ)
+    src_path = str(_BENCHMARKS_DIR_PATH.parent.joinpath('src'))
+    env['PYTHONPATH'] = pathsep.join(
+        path for path in [src_path, env.get('PYTHONPATH', '')] if path)
+
+    return env
+
+
+def _max_rss() -> int:
+    """
+    Get the peak RSS (in bytes) of the largest finished child process.
+    """
+
+    max_rss = getrusage(RUSAGE_CHILDREN).ru_maxrss
+
+    # kilobytes, except on macOS
+    return max_rss if platform == 'darwin' else max_rss * 1024
+
+
+def _report(results: Dict[str, Any]) -> None:
+    """
+    Print results as a table, followed by a summary.
+    """
+
+    print(f'world: {results["world_size"] / _MIB:.1f} MiB in ' +
+          f'{results["world_files"]} files')
+    print(f'{"backup":>6}  {"hold (s)":>9}  {"total (s)":>9}  ' +
+          f'{"MiB/s":>9}')
+
+    for (num, backup) in enumerate(results['backups'], start=1):
+        print(f'{num:>6}  {backup["hold"]:>9.3f}  {backup["total"]:>9.3f}  ' +
+              f'{backup["throughput"] / _MIB:>9.1f}')
+
+    holds = [backup['hold'] for backup in results['backups']]
+    totals = [backup['total'] for backup in results['backups']]
+    print(f'median hold: {median(holds):.3f} s, ' +
+          f'median total: {median(totals):.3f} s')
+    print(f'peak RSS: {results["peak_rss"] / _MIB:.1f} MiB')
+    print(f'restore: {results["restore"]:.3f} s')
+
+
+def _run(root_path: Path, args: Namespace) -> Dict[str, Any]:
+    """
+    Set up a server root, run gazoo in it, and collect results.
+    """
+
+    world_path = root_path.joinpath('worlds', _WORLD_NAME)
+    world_size = generate(world_path, int(args.size * _MIB), args.files)
+    world_files = sum(1 for path in world_path.rglob('*') if path.is_file())
+
+    _write_server(root_path, args)
+    _write_config(root_path, args)
+
+    proc = Popen(_GAZOO,
+                 cwd=root_path,
+                 env=_env(),
+                 stderr=PIPE,
+                 stdin=PIPE,
+                 stdout=DEVNULL,
+                 universal_newlines=True)
+    assert proc.stderr is not None
+    assert proc.stdin is not None
+
+    holds: List[float] = []
+    totals: List[float] = []
+
+    def scan_stderr() -> None:
+        assert proc.stderr is not None
+        assert proc.stdin is not None
+
+        hold_pattern = compyle(_HOLD_PATTERN)
+        saved_pattern = compyle(_SAVED_PATTERN)
+
+        for line in proc.stderr:
+            hold_match = hold_pattern.search(line)
+            saved_match = saved_pattern.search(line)
+
+            if hold_match is not None:
+                holds.append(float(hold_match.group(1)))
+            elif saved_match is not None:
+                totals.append(float(saved_match.group(1)))
+                if len(totals) == args.backups:
+                    proc.stdin.write('stop\n')
+                    proc.stdin.flush()
+            elif 'Traceback' in line or 'ERROR' in line:
+                print(line, end='')
+
+    scanner = Thread(target=scan_stderr)
+    scanner.start()
+
+    try:
+        proc.wait(timeout=args.timeout)
+    finally:
+        if proc.poll() is None:
+            proc.terminate()
+            proc.wait()
+        scanner.join()
+
+    if len(totals) < args.backups:
+        raise RuntimeError(f'only {len(totals)} of {args.backups} backups ' +
+                           'were saved')
+
+    peak_rss = _max_rss()
+
+    restore_start = monotonic()
+    run([*_GAZOO, 'restore', '1'], check=True, cwd=root_path, env=_env())
+    restore = monotonic() - restore_start
+
+    return {
+        'world_size': world_size,
+        'world_files': world_files,
+        'backups': [{
+            'hold': hold,
+            'total': total,
+            'throughput': world_size / total,
+        } for (hold, total) in zip(holds, totals)],
+        'peak_rss': peak_rss,
+        'restore': restore,
+    }
+
+
+def _write_config(root_path: Path, args: Namespace) -> None:
+    """
+    Write a gazoo config that backs up back to back, with info logging.
+    """
+
+    config_path = root_path.joinpath('gazoo', 'gazoo.cfg')
+    config_path.parent.mkdir(parents=True)
+    config_path.write_text(f'''archive_format={args.format}
+archive_io_idle={str(args.io_idle).lower()}
+archive_read_rate={args.read_rate}
+archive_write_rate={args.write_rate}
+asyncio={str(args.asyncio).lower()}
+backup_backend={args.backend}
+backup_interval=1
+cleanup_interval={7 * 24 * 60 * 60}
+compress_queue_depth={args.compress_queue_depth}
+compression={args.compression}
+compression_level={args.compression_level}
+compression_workers={args.compression_workers}
+debug=true
+full_backup_every={24 if args.incremental else 1}
+read_queue_depth={args.read_queue_depth}
+''')
+
+
+def _write_server(root_path: Path, args: Namespace) -> None:
+    """
+    Write a `bedrock_server` that runs the fake server.
+    """
+
+    fake_server_path = _BENCHMARKS_DIR_PATH.joinpath('fake_bedrock_server.py')
+    server_path = root_path.joinpath('bedrock_server')
+    server_path.write_text(f'''#!/bin/sh
+exec "{executable}" "{fake_server_path}" --churn {args.churn}
+''')
+    server_path.chmod(0o755)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic world laid out like a Bedrock (LevelDB) world.
+
+The world has a `db` directory with `CURRENT`, `LOCK`, a `MANIFEST`, a
+write-ahead `.log`, and table (`.ldb`) files making up most of the size,
+plus `level.dat` and `levelname.txt`.  Table sizes vary around the mean
+and their contents compress about as well as real chunk data (roughly
+half).  The same arguments always generate the same world.
+"""
+
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from pathlib import Path
+from random import Random
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import BinaryIO, Final
+
+_BLOCK_SIZE: Final[int] = 4 * 1024  # 4 KiB
+_LOG_FRACTION: Final[float] = 0.01
+_MIB: Final[int] = 1024 * 1024
+_POOL_SIZE: Final[int] = 4 * _MIB
+
+
+def generate(world_path: Path,
+             size: int,
+             files: int,
+             seed: int = 0) -> int:
+    """
+    Generate a world of about `size` bytes in about `files` files.
+
+    Return the total size of the generated files.
+    """
+
+    rng = Random(seed)
+    pool = rng.getrandbits(_POOL_SIZE * 8).to_bytes(_POOL_SIZE, 'little')
+
+    db_path = world_path.joinpath('db')
+    db_path.mkdir(parents=True, exist_ok=True)
+
+    tables = max(files - 6, 1)
+    log_size = int(size * _LOG_FRACTION)
+    mean_table_size = max((size - log_size) // tables, 1)
+
+    for number in range(1, tables + 1):
+        table_size = int(mean_table_size * rng.uniform(0.5, 1.5))
+        with db_path.joinpath(f'{number + 4:06}.ldb').open(
+                mode='wb') as table_file:
+            _write_data(table_file, table_size, rng, pool)
+
+    with db_path.joinpath(f'{tables + 5:06}.log').open(mode='wb') as log_file:
+        _write_data(log_file, log_size, rng, pool)
+
+    manifest = b'leveldb.BytewiseComparator' + bytes(range(256)) * 4
+    db_path.joinpath('MANIFEST-000002').write_bytes(manifest)
+    db_path.joinpath('CURRENT').write_bytes(b'MANIFEST-000002\n')
+    db_path.joinpath('LOCK').write_bytes(b'')
+    world_path.joinpath('level.dat').write_bytes(pool[:2048])
+    world_path.joinpath('levelname.txt').write_bytes(b'Benchmark\n')
+
+    return sum(path.stat().st_size for path in world_path.rglob('*')
+               if path.is_file())
+
+
+def _write_data(dest_file: BinaryIO, length: int, rng: Random,
+                pool: bytes) -> None:
+    """
+    Write `length` bytes of about half compressible data.
+
+    Each block is half random bytes (from the pool) and half repeated
+    key-like text.
+    """
+
+    written = 0
+    while written < length:
+        block = min(_BLOCK_SIZE, length - written)
+        random_length = block // 2
+
+        start = rng.randrange(0, len(pool) - random_length)
+        key = f'chunk:{rng.randrange(1 << 20):08x};'.encode()
+        filler = key * (((block - random_length) // len(key)) + 1)
+
+        dest_file.write(pool[start:start + random_length])
+        dest_file.write(filler[:block - random_length])
+        written += block
+
+
+def main() -> None:
+    """
+    Generate a world from command line arguments.
+    """
+
+    parser = ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('world_path', help='world directory', type=Path)
+    parser.add_argument('--files',
+                        default=200,
+                        help='number of files (default: 200)',
+                        type=int)
+    parser.add_argument('--seed',
+                        default=0,
+                        help='random seed (default: 0)',
+                        type=int)
+    parser.add_argument('--size',
+                        default=256,
+                        help='size in MiB (default: 256)',
+                        type=float)
+    args = parser.parse_args()
+
+    total = generate(args.world_path, int(args.size * _MIB), args.files,
+                     args.seed)
+    print(f'Generated {total / _MIB:.1f} MiB in {args.world_path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -5,10 +5,17 @@
 from __future__ import annotations
 
 from argparse import ArgumentParser
-from logging import DEBUG
-from logging import basicConfig as basic_config
+from datetime import datetime
+from pathlib import Path
+from re import IGNORECASE, compile as compyle, error as RegexError
+from sys import exit as sys_exit, stdout
 from typing import TYPE_CHECKING
 
+from .archive_verifier import ArchiveVerifier
+from .async_wrapper import AsyncWrapper
+from .control_server import ControlServer
+from .server_log import ServerLog
+from .supervisor import Supervisor
 from .util import Util
 from .wrapper import Wrapper
 
@@ -25,11 +32,7 @@ def main() -> None:
     """
 
     config = Util.read_config()
-    basic_config(
-        datefmt='%Y-%m-%d %H:%M:%S',
-        format=f'[%(asctime)s %(levelname)s] [{_LOGGING_TAG}] %(message)s',
-        level=(DEBUG if config.debug else None),
-    )
+    Util.configure_logging(config, _LOGGING_TAG)
 
     parser = ArgumentParser(
         description='Wrap Minecraft bedrock server to make proper backups')
@@ -40,6 +43,44 @@ def main() -> None:
 
     cleanup_parser = subparsers.add_parser('cleanup')
     cleanup_parser.set_defaults(func=_cleanup)
+    cleanup_parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='list the backups that would be deleted, without deleting them')
+
+    control_parser = subparsers.add_parser('control')
+    control_parser.set_defaults(func=_control)
+    control_parser.add_argument(
+        'words',
+        help='command for a running gazoo, through its control socket: ' +
+        '"backup now", "list", "send <server command>", or "status"',
+        metavar='command',
+        nargs='+')
+
+    list_parser = subparsers.add_parser('list')
+    list_parser.set_defaults(func=_list)
+
+    logs_parser = subparsers.add_parser('logs')
+    logs_subparsers = logs_parser.add_subparsers(dest='logs_command')
+    logs_subparsers.required = True
+
+    logs_grep_parser = logs_subparsers.add_parser('grep')
+    logs_grep_parser.set_defaults(func=_logs_grep)
+    logs_grep_parser.add_argument(
+        'pattern', help='regular expression to search captured output for')
+    logs_grep_parser.add_argument('-i',
+                                  '--ignore-case',
+                                  action='store_true',
+                                  help='ignore case in the pattern')
+    logs_grep_parser.add_argument(
+        '--since',
+        help='only search output received at or after a time ' +
+        '(e.g. "2024-01-31 18:00")',
+        type=datetime.fromisoformat)
+    logs_grep_parser.add_argument(
+        '--until',
+        help='only search output received at or before a time',
+        type=datetime.fromisoformat)
 
     restore_parser = subparsers.add_parser('restore')
     restore_parser.set_defaults(func=_restore)
@@ -50,21 +91,123 @@ def main() -> None:
         '(starting from 1, going back in time; defaults to 1) ' +
         'or path (absolute or relative) to the backup to restore',
         nargs='?')
+    restore_parser.add_argument(
+        '--at',
+        help='restore the newest backup made at or before a time ' +
+        '(e.g. "2024-01-31 18:00")',
+        type=datetime.fromisoformat)
+
+    supervise_parser = subparsers.add_parser('supervise')
+    supervise_parser.set_defaults(func=_supervise)
+    supervise_parser.add_argument(
+        'roots',
+        help='server root directories (each like the working directory ' +
+        'of a single gazoo)',
+        nargs='*',
+        type=Path)
+    supervise_parser.add_argument(
+        '--roots-file',
+        help='file listing server root directories, one per line',
+        type=Path)
+    supervise_parser.add_argument(
+        '--max-archives',
+        default=1,
+        help='maximum number of backups archived at once (defaults to 1)',
+        type=int)
+
+    verify_parser = subparsers.add_parser('verify')
+    verify_parser.set_defaults(func=_verify)
+    verify_parser.add_argument(
+        '--all',
+        action='store_true',
+        help='also verify backups that did not change since they were ' +
+        'last verified')
 
     args = parser.parse_args()
     args.func(args)
 
 
-def _cleanup(_args: Namespace) -> None:
-    Util.cleanup_archives()
+def _cleanup(args: Namespace) -> None:
+    deleted = Util.cleanup_archives(args.config, args.dry_run)
+
+    if args.dry_run:
+        for name in deleted:
+            print(f'would delete {name}')
+        print(f'{len(deleted)} backups would be deleted')
+
+
+def _control(args: Namespace) -> None:
+    if not args.config.control_socket:
+        sys_exit('control_socket is not configured')
+
+    try:
+        response = ControlServer.request(Path(args.config.control_socket),
+                                         ' '.join(args.words))
+    except OSError as err:
+        sys_exit(f'Could not connect to the control socket: {err}')
+
+    print(response, end='')
+
+    if response.startswith('error: '):
+        sys_exit(1)
+
+
+def _list(_args: Namespace) -> None:
+    for line in Util.list_backups():
+        print(line)
+
+
+def _logs_grep(args: Namespace) -> None:
+    try:
+        pattern = compyle(args.pattern.encode(),
+                          IGNORECASE if args.ignore_case else 0)
+    except RegexError as err:
+        sys_exit(f'Invalid pattern: {err}')
+
+    found = False
+    for line in ServerLog.grep(Util.logs_dir_path(), pattern, args.since,
+                               args.until):
+        stdout.buffer.write(line)
+        found = True
+
+    stdout.buffer.flush()
+
+    if not found:
+        sys_exit(1)
 
 
 def _restore(args: Namespace) -> None:
-    Util.restore_backup(args.num_or_path)
+    Util.restore_backup(str(args.num_or_path), args.at)
+
+
+def _supervise(args: Namespace) -> None:
+    roots = list(args.roots)
+    if args.roots_file is not None:
+        roots.extend(Supervisor.read_roots(args.roots_file))
+
+    Supervisor(roots, args.max_archives).run()
 
 
 def _run(args: Namespace) -> None:
-    Wrapper(args.config).run()
+    if args.config.asyncio:
+        AsyncWrapper(args.config).run()
+    else:
+        Wrapper(args.config).run()
+
+
+def _verify(args: Namespace) -> None:
+    statuses = Util.verify_backups(args.config, args.all)
+
+    damaged = 0
+    for (name, status) in statuses.items():
+        print(f'{status:>8}  {name}')
+        if status != ArchiveVerifier.OK:
+            damaged += 1
+
+    print(f'{len(statuses) - damaged} of {len(statuses)} backups intact')
+
+    if damaged:
+        sys_exit(1)
 
 
 if __name__ == '__main__':
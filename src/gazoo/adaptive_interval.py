@@ -0,0 +1,216 @@
+"""
+Provide class AdaptiveInterval.
+"""
+
+from __future__ import annotations
+
+from logging import info
+from os import stat, walk
+from os.path import join, relpath
+from pathlib import PurePath
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Dict, Final, Iterable, Optional, Type
+
+    from .backup_file import BackupFile
+    from .config import Config
+
+
+class AdaptiveInterval:
+    """
+    Adapt the time between backups to how fast the world changes, and
+    how long backups take.
+
+    Backups are requested every `minimum` seconds (by the schedule), but
+    only made once the adaptive interval passed since the last one.
+    After each backup, the interval is set so that:
+
+    * About `change_target` bytes of world data change between backups
+      (the recovery point), from the change rate between the last two
+      backups.  Changes are estimated from the file lengths reported by
+      the server: a new file, or a file with a new length, counts as
+      changed (world database files are never rewritten in place).
+    * Backups take at most the `io_budget` fraction of the time, from
+      how long the last backup took.
+
+    The interval is kept between `minimum` and `maximum` seconds, which
+    takes precedence over the budget.  With a `maximum` of 0, the
+    interval is not adapted, and every requested backup is made.
+    Times are from `time.monotonic`.
+
+    Since the change rate is only measured at backups, a requested
+    backup is also made before the interval passed once about
+    `change_target` bytes changed on disk since the last one (see
+    `due`), so a burst of changes after a quiet spell is not held back
+    for the long interval of the quiet spell.
+    """
+
+    _MIB: Final[int] = 1024 * 1024
+
+    @classmethod
+    def changed_bytes(cls: Type[AdaptiveInterval], previous: Dict[str, int],
+                      current: Dict[str, int]) -> int:
+        """
+        Estimate the bytes changed between two sets of file lengths (by
+        file name).
+
+        New files count in full, and files with a new length count by
+        how much their length changed.  Removed files do not count.
+        """
+
+        changed = 0
+
+        for (name, length) in current.items():
+            previous_length = previous.get(name)
+
+            if previous_length is None:
+                changed += length
+            else:
+                changed += abs(length - previous_length)
+
+        return changed
+
+    @classmethod
+    def disk_lengths(cls: Type[AdaptiveInterval],
+                     worlds_dir_path: Path) -> Dict[str, int]:
+        """
+        Get the lengths of the files in the worlds directory, from
+        metadata only, by the same names as the files of a backup (see
+        `record`).
+        """
+
+        lengths: Dict[str, int] = {}
+
+        for (dir_path, _dir_names, file_names) in walk(worlds_dir_path):
+            for file_name in file_names:
+                path = join(dir_path, file_name)
+                try:
+                    length = stat(path).st_size
+                except FileNotFoundError:
+                    continue
+
+                lengths[cls._file_key(relpath(path, worlds_dir_path))] = length
+
+        return lengths
+
+    @classmethod
+    def from_config(cls: Type[AdaptiveInterval],
+                    config: Config) -> AdaptiveInterval:
+        """
+        Make an adaptive interval with the limits and targets from
+        config.
+        """
+
+        return cls(minimum=config.backup_interval,
+                   maximum=config.backup_interval_max,
+                   change_target=int(config.backup_change_target * cls._MIB),
+                   io_budget=config.backup_io_budget)
+
+    def __init__(self: AdaptiveInterval, minimum: float, maximum: float,
+                 change_target: int, io_budget: float) -> None:
+        # shortest interval the I/O budget allows
+        self._budget_interval: float = 0.0
+        self._change_target: int = change_target
+        self._io_budget: float = io_budget
+        self._last_start: Optional[float] = None
+        self._lengths: Dict[str, int] = {}
+        self._maximum: float = maximum
+        self._minimum: float = minimum
+
+        self.interval: float = minimum
+
+    @property
+    def enabled(self: AdaptiveInterval) -> bool:
+        """
+        Indicates if the interval is adapted at all.
+        """
+
+        return self._maximum > 0
+
+    def due(self: AdaptiveInterval,
+            now: float,
+            worlds_dir_path: Optional[Path] = None) -> bool:
+        """
+        Check if a backup requested at time `now` should be made.
+
+        Backups are requested every `minimum` seconds, give or take
+        jitter, so the time since the last backup is rounded to the
+        nearest request.
+
+        Before the interval passed, if `worlds_dir_path` is given, the
+        backup is still made if the files in it changed by at least the
+        change target since the last backup (see `disk_lengths`), and
+        the I/O budget allows it.
+        """
+
+        if not self.enabled or self._last_start is None:
+            return True
+
+        elapsed = now - self._last_start + self._minimum / 2
+
+        if elapsed >= self.interval:
+            return True
+
+        if worlds_dir_path is None or elapsed < self._budget_interval:
+            return False
+
+        changed = self.changed_bytes(self._lengths,
+                                     self.disk_lengths(worlds_dir_path))
+        if changed < self._change_target:
+            return False
+
+        info(f'{changed / self._MIB:.1f} MiB changed on disk in ' +
+             f'{now - self._last_start:.0f} seconds; backing up early')
+
+        return True
+
+    def record(self: AdaptiveInterval, backup_files: Iterable[BackupFile],
+               start: float, seconds: float) -> None:
+        """
+        Record a backup saved, with its files (and the lengths reported
+        by the server), the time it started, and how long it took, then
+        adapt the interval.
+        """
+
+        if not self.enabled:
+            return
+
+        lengths = {
+            self._file_key(backup_file.path_fragment): backup_file.length
+            for backup_file in backup_files
+        }
+
+        self._budget_interval = (seconds / self._io_budget
+                                 if self._io_budget > 0 else 0.0)
+
+        interval = self._minimum
+        if self._last_start is not None and start > self._last_start:
+            changed = self.changed_bytes(self._lengths, lengths)
+            rate = changed / (start - self._last_start)
+
+            interval = (self._change_target / rate
+                        if rate > 0 else self._maximum)
+            interval = max(interval, self._budget_interval)
+
+            info(f'{changed / self._MIB:.1f} MiB changed in ' +
+                 f'{start - self._last_start:.0f} seconds, and the backup ' +
+                 f'took {seconds:.1f} seconds')
+
+        self.interval = min(max(interval, self._minimum), self._maximum)
+        self._last_start = start
+        self._lengths = lengths
+
+        info(f'Next backup in about {self.interval:.0f} seconds')
+
+    @classmethod
+    def _file_key(cls: Type[AdaptiveInterval], path_fragment: str) -> str:
+        """
+        Name a file by its world and file name, since the server may
+        leave out the directory within the world (see `BackupFile`).
+        """
+
+        path = PurePath(path_fragment)
+
+        return str(PurePath(path.parts[0], path.name))
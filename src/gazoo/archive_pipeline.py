@@ -0,0 +1,243 @@
+"""
+Provide class ArchivePipeline.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from logging import error
+from typing import TYPE_CHECKING
+from zipfile import ZIP_STORED
+
+from .backup_manifest import BackupManifest
+from .tar_writer import TarWriter
+from .zip_writer import ZipWriter
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, Future
+    from pathlib import Path
+    from typing import (Any, Deque, Dict, Final, Iterator, List, Optional,
+                        Tuple, Type, Union)
+
+
+class ArchivePipeline:
+    """
+    Archive files in three overlapping stages: read, compress, and write.
+
+    Reader threads hash the files (unless the previous manifest already
+    has a hash for them), a pool of processes compresses the files that
+    changed into parts, and the parts are written to the archive in
+    order, in the calling thread.  Each stage runs at most a given number
+    of files ahead of the next one, so reading, compressing, and writing
+    overlap, without hashed files piling up in the page cache or parts
+    piling up on disk while a slower stage catches up.
+
+    Tar archives start with their manifest (see `TarWriter`), so every
+    file is hashed before anything is written to them: reading is not
+    bounded by the read depth, and only overlaps compressing the first
+    files, not writing.  Zip archives have their manifest written last,
+    and overlap all three stages.
+    """
+
+    _READERS: Final[int] = 2
+
+    @classmethod
+    def _hash(cls: Type[ArchivePipeline], source_path: Path, length: int,
+              record: Optional[Dict[str, Any]]) -> Tuple[int, str]:
+        """
+        Get the modification time and hash of a file.
+        """
+
+        mtime_ns = source_path.stat().st_mtime_ns
+
+        if (record is not None and record['length'] == length
+                and record['mtime_ns'] == mtime_ns):
+            return (mtime_ns, record['sha256'])
+
+        return (mtime_ns, BackupManifest.hash_file(source_path, length))
+
+    def __init__(self: ArchivePipeline, writer: Union[TarWriter, ZipWriter],
+                 compression: Union[int, str], level: int,
+                 executor: Executor, parts_dir_path: Path, read_depth: int,
+                 compress_depth: int) -> None:
+        self._compress_depth: int = max(compress_depth, 1)
+        self._compression: Union[int, str] = compression
+        # name, source path, length, part path, and the compression (None
+        # if the writer stores the file itself)
+        self._compressions: Deque[Tuple[str, Path, int, Path,
+                                        Optional[Future[None]]]] = deque()
+        self._executor: Executor = executor
+        self._level: int = level
+        self._manifest_first: bool = isinstance(writer, TarWriter)
+        self._part_count: int = 0
+        self._parts_dir_path: Path = parts_dir_path
+        self._read_depth: int = max(read_depth, 1)
+        # name, source path, length, previous record, and the hashing
+        # (modification time and digest)
+        self._reads: Deque[Tuple[str, Path, int, Optional[Dict[str, Any]],
+                                 Future[Tuple[int, str]]]] = deque()
+        self._stored: bool = (isinstance(writer, ZipWriter)
+                              and compression == ZIP_STORED)
+        self._to_compress: Deque[Tuple[str, Path, int]] = deque()
+        self._writer: Union[TarWriter, ZipWriter] = writer
+
+        self.archived: List[Tuple[str, Path, int]] = []
+        """
+        Name, source path, and length of each file written to the archive
+        """
+
+    def run(self: ArchivePipeline, entries: List[Tuple[str, Path, int]],
+            previous: Optional[BackupManifest], full: bool,
+            manifest: BackupManifest, archive_file_name: str) -> None:
+        """
+        Add entries (name, source path, and length of each file) to a
+        manifest, archive the ones that changed, and write the manifest.
+
+        Hashes are reused from the previous manifest for files with the
+        same length and modification time.  Unless `full`, files with the
+        same hash as before are not archived again; the manifest keeps
+        naming the archive that holds them.
+
+        Files that cannot be found are logged and left out, unless the
+        manifest was already written, in which case `FileNotFoundError`
+        is raised.
+        """
+
+        pending = iter(entries)
+
+        with ThreadPoolExecutor(max_workers=self._READERS,
+                                thread_name_prefix='archive_read') as readers:
+            if self._manifest_first:
+                self._read(readers, pending, previous, len(entries))
+                while self._reads:
+                    self._decide(full, manifest, archive_file_name)
+                    self._compress()
+
+                self._writer.write_bytes(BackupManifest.ENTRY_NAME,
+                                         manifest.to_bytes())
+
+            self._read(readers, pending, previous, self._read_depth)
+            while self._reads or self._to_compress or self._compressions:
+                while self._reads and (len(self._to_compress) +
+                                       len(self._compressions) <
+                                       self._compress_depth):
+                    self._decide(full, manifest, archive_file_name)
+                    self._read(readers, pending, previous, self._read_depth)
+
+                self._compress()
+                if self._compressions:
+                    self._write(manifest)
+
+        if not self._manifest_first:
+            self._writer.write_bytes(BackupManifest.ENTRY_NAME,
+                                     manifest.to_bytes())
+
+    def _compress(self: ArchivePipeline) -> None:
+        """
+        Start compressing changed files, while fewer than the compress
+        depth are waiting to be written.
+        """
+
+        while (self._to_compress
+               and len(self._compressions) < self._compress_depth):
+            (name, source_path, length) = self._to_compress.popleft()
+
+            part_path = self._parts_dir_path.joinpath(
+                f'{self._part_count}.part')
+            self._part_count += 1
+
+            self._compressions.append(
+                (name, source_path, length, part_path,
+                 None if self._stored else self._submit_compression(
+                     name, source_path, length, part_path)))
+
+    def _decide(self: ArchivePipeline, full: bool, manifest: BackupManifest,
+                archive_file_name: str) -> None:
+        """
+        Wait for the next file to be hashed, add it to the manifest, and
+        queue it for compressing if it needs archiving.
+        """
+
+        (name, source_path, length, record, future) = self._reads.popleft()
+
+        try:
+            (mtime_ns, digest) = future.result()
+        except FileNotFoundError as err:
+            error(err)
+            return
+
+        if (not full and record is not None and record['length'] == length
+                and record['sha256'] == digest):
+            manifest.add(name, length, mtime_ns, digest, record['archive'])
+        else:
+            manifest.add(name, length, mtime_ns, digest, archive_file_name)
+            self._to_compress.append((name, source_path, length))
+
+    def _read(self: ArchivePipeline, readers: Executor,
+              pending: Iterator[Tuple[str, Path, int]],
+              previous: Optional[BackupManifest], depth: int) -> None:
+        """
+        Start hashing files, while fewer than `depth` are waiting for
+        `_decide`.
+        """
+
+        while len(self._reads) < depth:
+            entry = next(pending, None)
+            if entry is None:
+                return
+
+            (name, source_path, length) = entry
+            record = None if previous is None else previous.files.get(name)
+
+            self._reads.append((name, source_path, length, record,
+                                readers.submit(self._hash, source_path,
+                                               length, record)))
+
+    def _submit_compression(self: ArchivePipeline, name: str,
+                            source_path: Path, length: int,
+                            part_path: Path) -> Future[None]:
+        """
+        Start compressing a file into a part, in the pool of processes.
+        """
+
+        if isinstance(self._writer, TarWriter):
+            assert isinstance(self._compression, str)
+            return self._executor.submit(TarWriter.compress_entry, name,
+                                         source_path, length,
+                                         self._compression, self._level,
+                                         part_path)
+
+        assert isinstance(self._compression, int)
+        return self._executor.submit(ZipWriter.compress_entry, name,
+                                     source_path, length, self._compression,
+                                     self._level, part_path)
+
+    def _write(self: ArchivePipeline, manifest: BackupManifest) -> None:
+        """
+        Wait for the next file to be compressed, and write it to the
+        archive.
+        """
+
+        (name, source_path, length, part_path,
+         future) = self._compressions.popleft()
+
+        try:
+            if future is None:
+                assert isinstance(self._writer, ZipWriter)
+                self._writer.write_stored(name, source_path, length)
+            else:
+                future.result()
+
+                self._writer.write_part(part_path)
+                part_path.unlink()
+        except FileNotFoundError as err:
+            # the manifest cannot be changed once written
+            if self._manifest_first:
+                raise
+
+            error(err)
+            del manifest.files[name]
+            return
+
+        self.archived.append((name, source_path, length))
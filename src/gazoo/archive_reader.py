@@ -0,0 +1,226 @@
+"""
+Provide class ArchiveReader.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from lzma import LZMAError, LZMAFile
+from shutil import copyfileobj
+from tarfile import TarError
+from tarfile import open as tar_open
+from typing import TYPE_CHECKING
+from zipfile import BadZipFile, ZipFile
+from zlib import error as ZlibError
+
+from .tar_writer import zstandard
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, Future
+    from pathlib import Path
+    from tarfile import TarFile
+    from types import TracebackType
+    from typing import (IO, BinaryIO, Final, Iterator, List, Optional, Set,
+                        Tuple, Type)
+
+
+class ArchiveReader:
+    """
+    Read a backup archive of any supported format.
+
+    The format, zip (see `ZipWriter`) or tar compressed with xz or zstd
+    (see `TarWriter`), is detected from the first bytes of the file, not
+    its name.  Zip archives are read with random access, tar archives as
+    a stream, in one sequential pass.
+    """
+
+    ERRORS: Final[Tuple[Type[Exception], ...]] = (
+        BadZipFile, EOFError, LZMAError, TarError, ValueError, ZlibError,
+        *([] if zstandard is None else [zstandard.ZstdError]))
+    """
+    Exceptions raised when reading a damaged archive
+    """
+
+    FORMATS: Final[List[str]] = ['zip', 'tar.xz', 'tar.zst']
+    """
+    Archive formats, which are also the file name suffixes (after a dot)
+    """
+
+    _CHUNK_SIZE: Final[int] = 1024 * 1024  # 1 MiB
+    _MAGIC_NUMBERS: Final[List[Tuple[bytes, str]]] = [
+        (b'PK', 'zip'),
+        (b'\xfd7zXZ\x00', 'tar.xz'),
+        (b'\x28\xb5\x2f\xfd', 'tar.zst'),
+    ]
+
+    @classmethod
+    def detect_format(cls: Type[ArchiveReader], path: Path) -> str:
+        """
+        Get the format of an archive from its first bytes.
+        """
+
+        file: BinaryIO
+        with path.open(mode='rb') as file:
+            head = file.read(8)
+
+        for (magic_number, archive_format) in cls._MAGIC_NUMBERS:
+            if head.startswith(magic_number):
+                return archive_format
+
+        raise ValueError(f'Unknown archive format: {path}')
+
+    @classmethod
+    def is_archive_name(cls: Type[ArchiveReader], name: str) -> bool:
+        """
+        Tell if a file name has the suffix of an archive format.
+        """
+
+        return any(
+            name.endswith(f'.{archive_format}')
+            for archive_format in cls.FORMATS)
+
+    def __init__(self: ArchiveReader, path: Path) -> None:
+        self.format: str = self.detect_format(path)
+        self.path: Path = path
+        self._zip_file: Optional[ZipFile] = (ZipFile(path) if self.format
+                                             == 'zip' else None)
+
+    def __enter__(self: ArchiveReader) -> ArchiveReader:
+        return self
+
+    def __exit__(self: ArchiveReader,
+                 _exc_type: Optional[Type[BaseException]],
+                 _exc_value: Optional[BaseException],
+                 _traceback: Optional[TracebackType]) -> None:
+        self.close()
+
+    def close(self: ArchiveReader) -> None:
+        """
+        Close the archive.
+        """
+
+        if self._zip_file is not None:
+            self._zip_file.close()
+
+    def entries(self: ArchiveReader) -> Iterator[Tuple[str, IO[bytes]]]:
+        """
+        Iterate over the name and contents of each file in the archive.
+
+        Each file object is only valid until the next one is produced.
+        """
+
+        if self._zip_file is not None:
+            for name in self._zip_file.namelist():
+                if not name.endswith('/'):
+                    with self._zip_file.open(name) as entry_file:
+                        yield (name, entry_file)
+            return
+
+        with self._open_tar() as tar_file:
+            for tar_info in tar_file:
+                tar_entry_file = tar_file.extractfile(tar_info)
+                if tar_entry_file is not None:
+                    yield (tar_info.name, tar_entry_file)
+
+    def extract(self: ArchiveReader, names: Set[str], dest_dir_path: Path,
+                executor: Executor) -> List[Future[None]]:
+        """
+        Extract files (relative to a directory) with an executor.
+
+        Directories for the files must exist.  Zip entries are extracted
+        in parallel, tar archives in one pass.  Return the futures of
+        the work submitted.
+        """
+
+        if self._zip_file is not None:
+            return [
+                executor.submit(self._extract_zip_entry, name,
+                                dest_dir_path) for name in names
+            ]
+
+        return [executor.submit(self._extract_tar, names, dest_dir_path)]
+
+    def names(self: ArchiveReader) -> List[str]:
+        """
+        Get the names of all files in the archive.
+        """
+
+        if self._zip_file is not None:
+            return self._zip_file.namelist()
+
+        with self._open_tar() as tar_file:
+            return tar_file.getnames()
+
+    def read(self: ArchiveReader, name: str) -> Optional[bytes]:
+        """
+        Read a (small) file from the archive, or None if it has none by
+        that name.
+
+        Tar archives are read up to the file, so files near the start
+        are read much faster.
+        """
+
+        if self._zip_file is not None:
+            try:
+                return self._zip_file.read(name)
+            except KeyError:
+                return None
+
+        for (entry_name, entry_file) in self.entries():
+            if entry_name == name:
+                return entry_file.read()
+
+        return None
+
+    def _extract_tar(self: ArchiveReader, names: Set[str],
+                     dest_dir_path: Path) -> None:
+        """
+        Extract files from a tar archive in one pass.
+        """
+
+        dest_file: BinaryIO
+        for (name, entry_file) in self.entries():
+            if name in names:
+                with dest_dir_path.joinpath(name).open(
+                        mode='wb') as dest_file:
+                    copyfileobj(entry_file, dest_file, self._CHUNK_SIZE)
+
+    def _extract_zip_entry(self: ArchiveReader, name: str,
+                           dest_dir_path: Path) -> None:
+        """
+        Extract one entry of a zip archive.
+        """
+
+        assert self._zip_file is not None
+
+        dest_path = dest_dir_path.joinpath(name)
+
+        if name.endswith('/'):
+            dest_path.mkdir(parents=True, exist_ok=True)
+            return
+
+        dest_file: BinaryIO
+        with self._zip_file.open(name) as source_file, \
+                dest_path.open(mode='wb') as dest_file:
+            copyfileobj(source_file, dest_file, self._CHUNK_SIZE)
+
+    @contextmanager
+    def _open_tar(self: ArchiveReader) -> Iterator[TarFile]:
+        """
+        Open the tar archive as a stream, decompressing all of its
+        streams (or frames).
+        """
+
+        source_file: BinaryIO
+        with self.path.open(mode='rb') as source_file:
+            if self.format == 'tar.xz':
+                stream: IO[bytes] = LZMAFile(source_file)
+            elif zstandard is not None:
+                stream = zstandard.ZstdDecompressor().stream_reader(
+                    source_file, read_across_frames=True)
+            else:
+                raise ValueError('Reading tar.zst archives needs the ' +
+                                 f'zstandard package: {self.path}')
+
+            with stream, tar_open(fileobj=stream, mode='r|') as tar_file:
+                yield tar_file
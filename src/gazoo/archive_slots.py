@@ -0,0 +1,84 @@
+"""
+Provide class ArchiveSlots.
+"""
+
+from __future__ import annotations
+
+from os import getpid
+from time import sleep
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from multiprocessing.context import BaseContext
+    from multiprocessing.sharedctypes import SynchronizedArray
+    from typing import Final
+
+
+class ArchiveSlots:
+    """
+    Limit how many processes archive backups at once.
+
+    Each slot holds the pid of the process archiving in it (0 if free),
+    in shared memory, so the process that started the others can free
+    the slots of one that died while archiving (see `free`); a
+    semaphore would stay acquired forever.  Processes waiting for a slot
+    poll for one.
+    """
+
+    _POLL_INTERVAL: Final[float] = 1.0
+
+    def __init__(self: ArchiveSlots, context: BaseContext,
+                 count: int) -> None:
+        self._pids: SynchronizedArray[int] = context.Array('i',
+                                                           max(count, 1))
+
+    def acquire(self: ArchiveSlots, block: bool = True) -> bool:
+        """
+        Take a slot for this process, waiting for one if `block`.
+
+        Return whether a slot was taken.
+        """
+
+        while True:
+            with self._pids.get_lock():
+                for (slot, pid) in enumerate(self._pids[:]):
+                    if pid == 0:
+                        self._pids[slot] = getpid()
+                        return True
+
+            if not block:
+                return False
+
+            sleep(self._POLL_INTERVAL)
+
+    def free(self: ArchiveSlots, pid: int) -> int:
+        """
+        Free the slots of a process that exited.
+
+        Return how many slots it held (it should have held none).
+        """
+
+        freed = 0
+
+        with self._pids.get_lock():
+            for (slot, slot_pid) in enumerate(self._pids[:]):
+                if slot_pid == pid:
+                    self._pids[slot] = 0
+                    freed += 1
+
+        return freed
+
+    def release(self: ArchiveSlots) -> None:
+        """
+        Give back a slot taken by this process.
+        """
+
+        pid = getpid()
+
+        with self._pids.get_lock():
+            for (slot, slot_pid) in enumerate(self._pids[:]):
+                if slot_pid == pid:
+                    self._pids[slot] = 0
+                    return
+
+        raise ValueError('no archive slot held by this process')
@@ -0,0 +1,235 @@
+"""
+Provide class ArchiveVerifier.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+from json import JSONDecodeError
+from logging import error, info
+from threading import Lock
+from time import time
+from typing import TYPE_CHECKING
+
+from .archive_reader import ArchiveReader
+from .backup_manifest import BackupManifest
+
+if TYPE_CHECKING:
+    from os import stat_result
+    from pathlib import Path
+    from typing import IO, Any, Dict, Final, List, Set, Tuple, Type
+
+    from .catalog import Catalog
+    from .repository import Repository
+    from .token_bucket import TokenBucket
+
+
+class ArchiveVerifier:
+    """
+    Check backups against the checksums recorded when they were written.
+
+    Each backup file is hashed and compared with the SHA-256 checksum in
+    the catalog.  Backups without one (recorded before checksums were)
+    have their contents checked instead: every archive entry against its
+    CRC (or the checksum of its xz stream or zstd frame) and the hash in
+    the backup manifest, and for repository
+    manifests, every object against its hash.  If the contents are
+    intact, the checksum is recorded for next time.  The objects of
+    repository backups are always checked, since the manifest only
+    lists them.
+
+    Backups are hashed in parallel by a pool of threads, reading at most
+    as fast as the token bucket allows.  A backup that was verified
+    before is only read again if its size or modification time changed
+    (or if forced).
+    """
+
+    CORRUPT: Final[str] = 'corrupt'
+    """
+    Status of a backup that does not match its checksum
+    """
+
+    MISSING: Final[str] = 'missing'
+    """
+    Status of a backup whose file (or part of it) is missing
+    """
+
+    OK: Final[str] = 'ok'
+    """
+    Status of an intact backup
+    """
+
+    _ARCHIVE_ERRORS: Final[Tuple[Type[BaseException], ...]] = (
+        KeyError, *ArchiveReader.ERRORS)
+    _CHUNK_SIZE: Final[int] = 1024 * 1024  # 1 MiB
+
+    def __init__(self: ArchiveVerifier, catalog: Catalog,
+                 backups_dir_path: Path, repository: Repository,
+                 limiter: TokenBucket, workers: int) -> None:
+        self._backups_dir_path: Path = backups_dir_path
+        self._catalog: Catalog = catalog
+        self._limiter: TokenBucket = limiter
+        self._repository: Repository = repository
+        # objects verified in this run, shared by repository backups
+        self._verified_objects: Set[str] = set()
+        self._verified_objects_lock: Lock = Lock()
+        self._workers: int = max(workers, 1)
+
+    def verify(self: ArchiveVerifier,
+               force: bool = False) -> Dict[str, str]:
+        """
+        Verify all backups in the catalog, and record the outcomes.
+
+        Return the status of every backup (`OK`, `CORRUPT`, or
+        `MISSING`) from the most recent one back, including the ones
+        that were skipped because they did not change since their last
+        verification.  Backups cleaned up meanwhile are left out (see
+        `Catalog.set_verified`).
+        """
+
+        backups = self._catalog.recent()
+        verifications = self._catalog.verifications()
+        statuses: Dict[str, str] = {}
+        pending: List[Tuple[Dict[str, Any], stat_result]] = []
+
+        for backup in backups:
+            name = backup['name']
+
+            try:
+                stat = self._backups_dir_path.joinpath(name).stat()
+            except FileNotFoundError:
+                if self._catalog.set_verified(name, time(), None, None,
+                                              self.MISSING):
+                    error(f'Backup {name} is missing')
+                    statuses[name] = self.MISSING
+                continue
+
+            previous = verifications.get(name)
+            if (not force and previous is not None
+                    and previous['size'] == stat.st_size
+                    and previous['mtime_ns'] == stat.st_mtime_ns):
+                statuses[name] = previous['status']
+            else:
+                pending.append((backup, stat))
+
+        info(f'Verifying {len(pending)} of {len(statuses) + len(pending)} ' +
+             'backups')
+
+        with ThreadPoolExecutor(max_workers=self._workers,
+                                thread_name_prefix='verify') as executor:
+            futures = [(backup, stat,
+                        executor.submit(self._verify_backup, backup))
+                       for (backup, stat) in pending]
+
+            for (backup, stat, future) in futures:
+                status = future.result()
+                if not self._catalog.set_verified(
+                        backup['name'], time(), stat.st_size,
+                        stat.st_mtime_ns, status):
+                    continue
+
+                if status != self.OK:
+                    error(f'Backup {backup["name"]} is {status}')
+                statuses[backup['name']] = status
+
+        return {
+            backup['name']: statuses[backup['name']]
+            for backup in backups if backup['name'] in statuses
+        }
+
+    def _hash(self: ArchiveVerifier, file: IO[bytes]) -> str:
+        """
+        Hash a file from its current position, at the limited rate.
+        """
+
+        hasher = sha256()
+
+        while chunk := file.read(self._CHUNK_SIZE):
+            self._limiter.consume(len(chunk))
+            hasher.update(chunk)
+
+        return hasher.hexdigest()
+
+    def _verify_archive(self: ArchiveVerifier, archive_path: Path) -> str:
+        """
+        Check the entries of an archive against their checksums and, if
+        the archive has a manifest, against their hashes.
+        """
+
+        try:
+            manifest = BackupManifest.from_archive(archive_path)
+
+            with ArchiveReader(archive_path) as archive:
+                # reading an entry to the end checks its checksum
+                for (name, entry_file) in archive.entries():
+                    digest = self._hash(entry_file)
+
+                    record = (None if manifest is None else
+                              manifest.files.get(name))
+                    if record is not None and record['sha256'] != digest:
+                        return self.CORRUPT
+        except self._ARCHIVE_ERRORS:
+            return self.CORRUPT
+
+        return self.OK
+
+    def _verify_backup(self: ArchiveVerifier,
+                       backup: Dict[str, Any]) -> str:
+        """
+        Verify one backup (see `verify`).
+        """
+
+        path = self._backups_dir_path.joinpath(backup['name'])
+
+        try:
+            with path.open(mode='rb') as backup_file:
+                checksum = self._hash(backup_file)
+
+            if backup['checksum'] is not None:
+                if checksum != backup['checksum']:
+                    return self.CORRUPT
+                if ArchiveReader.is_archive_name(path.name):
+                    return self.OK
+
+            if ArchiveReader.is_archive_name(path.name):
+                status = self._verify_archive(path)
+            else:
+                status = self._verify_objects(path)
+        except FileNotFoundError:
+            return self.MISSING
+
+        if status == self.OK and backup['checksum'] is None:
+            self._catalog.set_checksum(backup['name'], checksum)
+
+        return status
+
+    def _verify_objects(self: ArchiveVerifier, manifest_path: Path) -> str:
+        """
+        Check the repository objects of a manifest against their hashes.
+        """
+
+        try:
+            manifest = self._repository.read_manifest(manifest_path)
+        except (JSONDecodeError, UnicodeDecodeError, ValueError):
+            return self.CORRUPT
+
+        for file in manifest['files']:
+            digest = file['sha256']
+
+            with self._verified_objects_lock:
+                if digest in self._verified_objects:
+                    continue
+
+            try:
+                with self._repository.object_path(digest).open(
+                        mode='rb') as object_file:
+                    if self._hash(object_file) != digest:
+                        return self.CORRUPT
+            except FileNotFoundError:
+                return self.MISSING
+
+            with self._verified_objects_lock:
+                self._verified_objects.add(digest)
+
+        return self.OK
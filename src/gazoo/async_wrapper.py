@@ -0,0 +1,297 @@
+"""
+Provide class AsyncWrapper.
+"""
+
+from __future__ import annotations
+
+from asyncio import (Condition, create_subprocess_exec, create_task, gather,
+                     get_running_loop, run, run_coroutine_threadsafe, sleep)
+from logging import exception, info
+from signal import SIGINT
+from subprocess import PIPE
+from sys import stderr, stdout
+from threading import Thread
+from time import time
+from typing import TYPE_CHECKING
+
+from .metrics import Metrics
+from .page_cache import PageCache
+from .server_log import ServerLog
+from .util import Util
+from .wrapper import Wrapper
+
+if TYPE_CHECKING:
+    from asyncio import AbstractEventLoop, Future, StreamWriter, Task
+    from asyncio.subprocess import Process
+    from types import FrameType
+    from typing import Any, BinaryIO, Dict, Final, Optional, Set, Type
+
+    from .config import Config
+    from .scheduled_job import ScheduledJob
+
+
+class AsyncWrapper(Wrapper):
+    """
+    Wrap bedrock server instance with a single asyncio event loop.
+
+    Forwarding of stdout and stderr, and the backup/cleanup/verify
+    schedules all run as tasks in one event loop instead of a thread
+    each.  Schedules follow the same rules as `Scheduler`.  The jobs and
+    workers are those of `Wrapper`: they (and writes to system stdout
+    and stderr, which may block) run in the default executor, and their
+    commands are written to the server by the event loop.  Stdin is read
+    by a thread, like in `Wrapper`, and commands from the control socket
+    (see `ControlServer`) by its threads.
+    """
+
+    _CHUNK_SIZE: Final[int] = 64 * 1024  # 64 KiB
+    _STREAM_LIMIT: Final[int] = 1024 * 1024  # 1 MiB (longest line)
+
+    def __init__(self: AsyncWrapper, config: Config) -> None:
+        super().__init__(config)
+
+        # created by `_main`: before Python 3.10, asyncio primitives are
+        # bound to the event loop that is current when they are created
+        self._finished: Condition
+        self._loop: AbstractEventLoop
+        self._process: Optional[Process] = None
+        self._scheduled: Set[Task[None]] = set()
+        self._work: Dict[Future[Any], ScheduledJob] = {}
+
+    def run(self: AsyncWrapper) -> None:
+        """
+        Start the bedrock server, run the wrapper until it exits.
+        """
+
+        run(self._main())
+
+    def _blocked(self: AsyncWrapper, job: ScheduledJob) -> bool:
+        """
+        Check if a higher priority job is running (see `Scheduler`).
+        """
+
+        return any(running.priority < job.priority
+                   for running in self._work.values())
+
+    async def _forward_stderr(self: AsyncWrapper) -> None:
+        """
+        Forward server stderr to system stderr (and the server log, if
+        there is one).
+        """
+
+        assert self._process is not None
+        assert self._process.stderr is not None
+
+        while chunk := await self._process.stderr.read(self._CHUNK_SIZE):
+            await self._loop.run_in_executor(None, self._write_output,
+                                             stderr.buffer, chunk)
+
+            if self._server_log is not None:
+                self._server_log.write('stderr', chunk)
+
+    async def _forward_stdout(self: AsyncWrapper) -> None:
+        """
+        Forward server stdout, and hand it to the backup worker to scan
+        (see `BackupWorker.scan_chunk`).
+        """
+
+        assert self._backup_worker is not None
+        assert self._process is not None
+        assert self._process.stdout is not None
+
+        while chunk := await self._process.stdout.read(self._CHUNK_SIZE):
+            await self._loop.run_in_executor(None, self._write_output,
+                                             stdout.buffer, chunk)
+
+            self._backup_worker.scan_chunk(chunk)
+
+    async def _main(self: AsyncWrapper) -> None:
+        # pylint: disable=attribute-defined-outside-init
+        self._finished = Condition()
+        self._loop = get_running_loop()
+
+        Metrics.configure(self._config)
+        # for snapshots, which are taken before archiving configures it
+        PageCache.configure(self._config.page_cache_hints)
+
+        await self._loop.run_in_executor(None, Util.ensure_setup)
+
+        if self._config.log_capture:
+            self._server_log = ServerLog.from_config(self._config)
+            self._server_log.start()
+
+        self._process = await create_subprocess_exec(
+            self.server_bin_path(),
+            limit=self._STREAM_LIMIT,
+            stderr=PIPE,
+            stdin=PIPE,
+            stdout=PIPE)
+        self._loop.add_signal_handler(SIGINT, self._signal_sigint, SIGINT,
+                                      None)
+
+        self._start_workers()
+
+        # a daemon thread, like in `Wrapper`: reading stdin in the event
+        # loop would make it non-blocking, and with it stdout and stderr
+        # when they are the same terminal; a thread in the default
+        # executor would keep the event loop from closing until a line
+        # is read
+        Thread(daemon=True, name='stdin', target=self._thread_stdin).start()
+
+        background = [
+            create_task(self._schedule(job), name=f'{job.name}_schedule')
+            for job in self._jobs()
+        ]
+
+        if self._config.control_socket:
+            self._start_control_server()
+
+        try:
+            await gather(self._forward_stdout(), self._forward_stderr())
+            await self._process.wait()
+        finally:
+            self._loop.remove_signal_handler(SIGINT)
+
+            if self._control_server is not None:
+                await self._loop.run_in_executor(None,
+                                                 self._control_server.stop)
+
+            for task in background:
+                task.cancel()
+            await gather(*background, return_exceptions=True)
+
+            # let running backups and cleanups finish
+            await gather(*self._scheduled, *self._work,
+                         return_exceptions=True)
+            await self._loop.run_in_executor(None, Util.shutdown_compression)
+
+            if self._server_log is not None:
+                await self._loop.run_in_executor(None, self._server_log.stop)
+
+    async def _run_job(self: AsyncWrapper, job: ScheduledJob) -> Any:
+        """
+        Run a job in the default executor, once no higher priority job is
+        running.
+
+        Return what the job returns; exceptions are raised to the caller.
+        """
+
+        async with self._finished:
+            await self._finished.wait_for(lambda: not self._blocked(job))
+
+        future = self._loop.run_in_executor(None, job.target)
+        self._work[future] = job
+
+        try:
+            return await future
+        finally:
+            async with self._finished:
+                self._work.pop(future, None)
+                self._finished.notify_all()
+
+    def _run_now(self: AsyncWrapper, job: ScheduledJob) -> Any:
+        """
+        Run a job once, as soon as no higher priority job is running, and
+        get what it returns (see `Scheduler.run_now`).
+
+        Called from the threads of the control socket.
+        """
+
+        return run_coroutine_threadsafe(self._run_job(job),
+                                        self._loop).result()
+
+    async def _schedule(self: AsyncWrapper, job: ScheduledJob) -> None:
+        """
+        Start a job whenever it is due (see `Scheduler`).
+
+        Jobs run as separate tasks, so they are not cancelled along with
+        the schedule when the server exits.
+        """
+
+        run_at = job.next_run(time())
+
+        while True:
+            await sleep(max(run_at - time(), 0.0))
+
+            async with self._finished:
+                await self._finished.wait_for(lambda: not self._blocked(job))
+
+            now = time()
+            due = run_at
+            run_at = job.next_run(max(due, now))
+
+            if not job.should_run(due, now):
+                info(f'{job.name} missed by {now - due:.0f} seconds; ' +
+                     'skipping')
+                continue
+
+            # referenced until done, so it is not garbage collected
+            task = create_task(self._schedule_run(job), name=job.name)
+            self._scheduled.add(task)
+            task.add_done_callback(self._scheduled.discard)
+
+    async def _schedule_run(self: AsyncWrapper, job: ScheduledJob) -> None:
+        """
+        Run a scheduled job, logging its exceptions.
+        """
+
+        try:
+            await self._run_job(job)
+        except Exception as error:  # pylint: disable=broad-except
+            exception(f'{job.name} failed', exc_info=error)
+
+    def _server_running(self: AsyncWrapper) -> bool:
+        """
+        Check if the server is still running.
+        """
+
+        assert self._process is not None
+
+        return self._process.returncode is None
+
+    def _signal_sigint(self: AsyncWrapper, _signum: int,
+                       _frame: Optional[FrameType]) -> None:
+        """
+        Handle sigint by terminating the server and printing a line.
+        """
+
+        if self._process is not None and self._server_running():
+            self._process.terminate()
+        print()
+
+    async def _write(self: AsyncWrapper, data: bytes) -> None:
+        """
+        Write to server stdin, while the server is running.
+
+        Only the event loop writes, so lines are never interleaved.
+        """
+
+        assert self._process is not None
+        assert self._process.stdin is not None
+
+        if self._server_running():
+            server_stdin: StreamWriter = self._process.stdin
+            server_stdin.write(data)
+            await server_stdin.drain()
+
+    def _write_stdin(self: AsyncWrapper, data: bytes) -> None:
+        """
+        Write to server stdin (see `_write`).
+
+        Called from the default executor, the stdin thread, and the
+        threads of the control socket.
+        """
+
+        # stdin may still be read once the server exited
+        if not self._loop.is_closed():
+            run_coroutine_threadsafe(self._write(data), self._loop).result()
+
+    @classmethod
+    def _write_output(cls: Type[AsyncWrapper], stream: BinaryIO,
+                      chunk: bytes) -> None:
+        """
+        Write a chunk to a system stream (in the default executor).
+        """
+
+        stream.write(chunk)
+        stream.flush()
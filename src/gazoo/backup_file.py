@@ -8,6 +8,7 @@ from errno import ENOENT
 from pathlib import Path
 
 from .util import Util
+from .world_index import WorldIndex
 
 
 class BackupFile:
@@ -20,6 +21,24 @@ class BackupFile:
 
         self.length = length
 
+    @property
+    def archive_name(self: BackupFile) -> str:
+        """
+        Get the name of the backup file relative to the worlds directory.
+
+        This is the name used for the file inside backup archives.
+        """
+
+        return str(self.source_path.relative_to(Util.worlds_dir_path()))
+
+    @property
+    def path_fragment(self: BackupFile) -> str:
+        """
+        Get the path of the backup file as given by the bedrock server.
+        """
+
+        return str(self._path)
+
     @property
     def source_path(self: BackupFile) -> Path:
         """
@@ -27,10 +46,11 @@ class BackupFile:
 
         The bedrock server gives paths that can can be missing a
         directory (specifically, the `db` subdirectory in the world
-        directory), so attempt to figure out the right file.
+        directory), so attempt to figure out the right file.  Files are
+        looked up in the index shared by all files of the world.
         """
 
-        found = list(self._world_dir_path.glob(f'**/{self._path.name}'))
+        found = self.world_index.find(self._path.name)
 
         if len(found) == 0:
             raise OSError(ENOENT, 'Matching file not found', self._path)
@@ -41,6 +61,14 @@ class BackupFile:
 
         return found[0]
 
+    @property
+    def world_index(self: BackupFile) -> WorldIndex:
+        """
+        Get the file index for the world directory of this backup file.
+        """
+
+        return WorldIndex.for_world(self._world_dir_path)
+
     @property
     def world_dir_name(self: BackupFile) -> str:
         """
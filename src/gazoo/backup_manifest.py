@@ -0,0 +1,154 @@
+"""
+Provide class BackupManifest.
+"""
+
+from __future__ import annotations
+
+from hashlib import sha256
+from json import dumps, loads
+from typing import TYPE_CHECKING
+
+from .archive_reader import ArchiveReader
+from .io_throttle import IoThrottle
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Any, BinaryIO, Dict, Final, Optional, Set, Type
+
+    from .catalog import Catalog
+
+
+class BackupManifest:
+    """
+    List the files of an archive backup, and which archive holds each
+    one.
+
+    A full backup holds all of its files.  An incremental backup only
+    holds the files that changed since the previous backup; for every
+    other file, the manifest names the earlier archive (in the same
+    chain, back to the last full backup) that holds it.  Restoring any
+    backup therefore only needs its own manifest.
+
+    The manifest is stored as an entry named `ENTRY_NAME` in the archive
+    it describes (first, in tar archives, so it is read without reading
+    the whole archive).
+    """
+
+    ENTRY_NAME: Final[str] = 'gazoo-manifest.json'
+    """
+    Name of the archive entry holding the manifest
+    """
+
+    _CHUNK_SIZE: Final[int] = 1024 * 1024  # 1 MiB
+    _VERSION: Final[int] = 1
+
+    @classmethod
+    def from_archive(cls: Type[BackupManifest],
+                     archive_path: Path) -> Optional[BackupManifest]:
+        """
+        Read the manifest of an archive (of any format), if it has one.
+        """
+
+        with ArchiveReader(archive_path) as reader:
+            entry = reader.read(cls.ENTRY_NAME)
+
+        if entry is None:
+            return None
+
+        data: Dict[str, Any] = loads(entry)
+        if data.get('version') != cls._VERSION:
+            raise ValueError(f'Unsupported manifest: {archive_path}')
+
+        return cls(data['world'], data['runs'], {
+            file['name']: file
+            for file in data['files']
+        })
+
+    @classmethod
+    def hash_file(cls: Type[BackupManifest], path: Path, length: int) -> str:
+        """
+        Hash the first `length` bytes of a file.
+
+        Reads count against the read limit (see `IoThrottle`), like the
+        reads of files being archived.
+        """
+
+        hasher = sha256()
+        remaining = length
+
+        source_file: BinaryIO
+        with path.open(mode='rb') as source_file:
+            while remaining > 0:
+                chunk = source_file.read(min(remaining, cls._CHUNK_SIZE))
+                if not chunk:
+                    break
+                IoThrottle.read(len(chunk))
+                hasher.update(chunk)
+                remaining -= len(chunk)
+
+        return hasher.hexdigest()
+
+    @classmethod
+    def latest(cls: Type[BackupManifest], catalog: Catalog,
+               backups_dir_path: Path,
+               world_dir_name: str) -> Optional[BackupManifest]:
+        """
+        Read the manifest of the newest archive backup of a world in the
+        catalog.
+
+        Return None if there is no such backup, it is missing, or it has
+        no manifest (e.g. it was made before manifests were added).
+        """
+
+        for backup in catalog.recent(world_dir_name):
+            if ArchiveReader.is_archive_name(backup['name']):
+                try:
+                    return cls.from_archive(
+                        backups_dir_path.joinpath(backup['name']))
+                except FileNotFoundError:
+                    return None
+
+        return None
+
+    def __init__(self: BackupManifest,
+                 world_dir_name: str,
+                 runs: int,
+                 files: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        # file name -> record (name, length, mtime, sha256, archive)
+        self.files: Dict[str, Dict[str, Any]] = files or {}
+        # number of incremental backups since the last full backup
+        self.runs: int = runs
+        self.world_dir_name: str = world_dir_name
+
+    def add(self: BackupManifest, name: str, length: int, mtime_ns: int,
+            digest: str, archive_name: str) -> None:
+        """
+        Add a file, held by the archive named `archive_name`.
+        """
+
+        self.files[name] = {
+            'name': name,
+            'length': length,
+            'mtime_ns': mtime_ns,
+            'sha256': digest,
+            'archive': archive_name,
+        }
+
+    def archive_names(self: BackupManifest) -> Set[str]:
+        """
+        Get the names of all archives holding files of this backup.
+        """
+
+        return {file['archive'] for file in self.files.values()}
+
+    def to_bytes(self: BackupManifest) -> bytes:
+        """
+        Serialize the manifest for storing in an archive.
+        """
+
+        return dumps({
+            'version': self._VERSION,
+            'world': self.world_dir_name,
+            'runs': self.runs,
+            'files': list(self.files.values()),
+        }).encode()
@@ -4,102 +4,253 @@ Provide class BackupWorker.
 
 from __future__ import annotations
 
-from logging import warning
-from time import sleep
+from logging import info, warning
+from sys import stdout
+from threading import Condition
+from time import monotonic
 from typing import TYPE_CHECKING
 
+from .adaptive_interval import AdaptiveInterval
 from .backup_file import BackupFile
+from .metrics import Metrics
 from .util import Util
 from .worker_status import WorkerStatus
+from .world_activity import WorldActivity
 
 if TYPE_CHECKING:
-    from subprocess import Popen
-    from typing import Final, List
+    from typing import Callable, Final, List, Optional, Tuple, Type
+
+    from .config import Config
+    from .server_log import ServerLog
 
 
 class BackupWorker:
     """
     Provide a class to do the heavy lifting of the backup process.
+
+    The worker talks to the server through a function writing to server
+    stdin, and is handed chunks of server stdout (see `scan_chunk`), so
+    it can be driven by `Wrapper` and `AsyncWrapper` alike.
     """
 
-    _QUERY_STRING: Final[str] = ('Data saved. Files are now ready to be ' +
-                                 'copied.\n')
+    _QUERY_RETRY_MAX: Final[float] = 1.0
+    _QUERY_RETRY_MIN: Final[float] = 0.05
+    _QUERY_STRING: Final[bytes] = (b'Data saved. Files are now ready to be ' +
+                                   b'copied.')
+    _SCANNED_STATUSES: Final[List[WorkerStatus]] = [
+        WorkerStatus.QUERY,
+        WorkerStatus.INFO,
+    ]
 
-    def __init__(self: BackupWorker, proc: 'Popen[str]') -> None:
+    def __init__(self: BackupWorker,
+                 write_stdin: Callable[[bytes], None],
+                 config: Config,
+                 server_log: Optional[ServerLog] = None) -> None:
         self._backup_files: List[BackupFile] = []
-        self._proc: 'Popen[str]' = proc
+        self._config: Config = config
+        self._pending: bytes = b''
+        self._ready: Condition = Condition()
+        self._server_log: Optional[ServerLog] = server_log
+        self._write_stdin: Callable[[bytes], None] = write_stdin
+        self.activity: WorldActivity = WorldActivity()
+        self.interval: AdaptiveInterval = AdaptiveInterval.from_config(config)
         self.status: WorkerStatus = WorkerStatus.IDLE
 
-    def backup(self: BackupWorker) -> None:
+    def backup(self: BackupWorker) -> bool:
         """
         Make a backup of the current world.
 
         The approach for this is:
 
         * Send 'save hold' to server stdin.
-        * Send 'save query' to server stdin once every second.
-            * Stop when _QUERY_STRING is found from server stdout.
-        * Parse file names and lengths from server stdout.
-        * Copy files to temporary directory.
-        * Truncate files to correct length.
+        * Send 'save query' to server stdin, backing off from
+          _QUERY_RETRY_MIN to _QUERY_RETRY_MAX seconds between retries.
+            * Stop when _QUERY_STRING is found from server stdout and
+              the file names and lengths after it are parsed (signaled
+              by scan_chunk).
+            * Give up (raising `RuntimeError`) after the configured
+              save query timeout.
+        * Snapshot files to temporary directory, truncated to correct
+          length.
+        * Send 'save resume' to server stdin.
         * Create zip archive in temporary directory with files copied
-          previously.
-        * Copy zip archive to backups directory.
+          previously (or, with the repository backend, store the files
+          in the repository and write a manifest).
+        * Copy zip archive (or manifest) to backups directory.
+
+        Only the snapshot is taken while the server holds saving; the
+        (much slower) archive is built after saving has resumed.  The
+        fingerprint of the worlds directory (see `WorldActivity`) is
+        taken right before saving is held: a change made after it is in
+        the backup, but still makes the next one run.
+
+        Return whether a backup was made (not if one is already running).
         """
 
-        if self.status is not WorkerStatus.IDLE:
-            warning('Previous save not completed; not starting a new one')
-            return
+        with self._ready:
+            if self.status is not WorkerStatus.IDLE:
+                warning('Previous save not completed; not starting a new one')
+                return False
+
+            self.status = WorkerStatus.QUERY
 
-        self._command('save hold')
-        self.status = WorkerStatus.QUERY
+        fingerprint = WorldActivity.fingerprint(Util.worlds_dir_path())
+        hold_start = monotonic()
+        self.activity.backup_started()
 
-        while self.status is not WorkerStatus.READY:
-            self._command('save query')
-            sleep(1)
+        try:
+            self.command('save hold')
+            queries = self._wait_for_query()
+            query_end = monotonic()
 
-        self.status = WorkerStatus.WORKING
-        Util.archive_files(self._backup_files)
+            with self._ready:
+                self.status = WorkerStatus.WORKING
+            snapshot_dir_path = Util.snapshot_files(self._backup_files)
+        except Exception:
+            with self._ready:
+                self.status = WorkerStatus.IDLE
+            self.activity.backup_failed()
+            Metrics.record_failure('backup')
+            raise
+        finally:
+            self.command('save resume')
+            hold_end = monotonic()
+            info(f'Save hold released after {hold_end - hold_start:.3f} ' +
+                 'seconds')
 
-        self._command('save resume')
-        self.status = WorkerStatus.IDLE
+        try:
+            Util.save_snapshot(self._backup_files, self._config,
+                               snapshot_dir_path)
+        except Exception:
+            self.activity.backup_failed()
+            Metrics.record_failure('backup')
+            raise
+        finally:
+            with self._ready:
+                self.status = WorkerStatus.IDLE
 
-    def thread_stdout(self: BackupWorker) -> None:
+        end = monotonic()
+        self.activity.backup_finished(fingerprint)
+        info(f'Backup saved after {end - hold_start:.3f} seconds')
+        self.interval.record(self._backup_files, hold_start, end - hold_start)
+
+        Metrics.record_backup(
+            queries, {
+                'query': query_end - hold_start,
+                'snapshot': hold_end - query_end,
+                'archive': end - hold_end,
+            })
+
+        return True
+
+    def command(self: BackupWorker, string: str) -> None:
         """
-        Forward server stdout and scan for important information.
+        Echo command to stdout and send it to server stdin.
+
+        The echo is written to the binary buffer of stdout, like the
+        forwarded server output, so the two are not reordered.
+        """
+
+        data = f'{string}\n'.encode()
+
+        stdout.buffer.write(data)
+        stdout.buffer.flush()
+        self._write_stdin(data)
+
+    def scan_chunk(self: BackupWorker, chunk: bytes) -> None:
+        """
+        Scan a chunk of server stdout for important information.
 
         Lines are scanned for confirmation that files were saved
-        successfully and names/lengths of those files.
+        successfully and names/lengths of those files, and for players
+        connecting and disconnecting (see `activity`).  Chunks are only
+        split into lines while a save query is in progress, or if a
+        chunk may mention players.  Chunks are also handed to the server
+        log, if there is one.
         """
 
-        assert self._proc is not None
-        assert self._proc.stdout is not None
+        Metrics.record_output(chunk)
+
+        if self._server_log is not None:
+            self._server_log.write('stdout', chunk)
+
+        (lines, self._pending) = Util.split_lines(
+            self._pending, chunk, self.status in self._SCANNED_STATUSES
+            or WorldActivity.mentions_players(self._pending, chunk))
 
-        line: str
-        for line in self._proc.stdout:
-            print(line, end='')
+        for line in lines:
+            self.activity.scan_line(line)
 
-            if (self.status is WorkerStatus.QUERY
-                    and line == self._QUERY_STRING):
-                self.status = WorkerStatus.INFO
-            elif self.status is WorkerStatus.INFO:
-                self._backup_files = []
+            with self._ready:
+                (status, backup_files) = self.scan_line(self.status, line)
 
-                files: List[str] = line.rstrip().split(', ')
-                for file in files:
-                    (loc, length) = file.split(':')
-                    self._backup_files.append(BackupFile(loc, int(length)))
+                if status is WorkerStatus.READY:
+                    self._backup_files = backup_files
+                    self._ready.notify_all()
 
-                self.status = WorkerStatus.READY
+                self.status = status
 
-    def _command(self: BackupWorker, string: str) -> None:
+    @classmethod
+    def scan_line(cls: Type[BackupWorker], status: WorkerStatus,
+                  line: bytes) -> Tuple[WorkerStatus, List[BackupFile]]:
         """
-        Echo command to stdout and send it to server stdin.
+        Get the worker status after a line of server output.
+
+        The line is given as bytes, without its line ending.  Return the
+        new status and, if the line was the payload of metadata about
+        the save files, the backup files parsed from it (an empty list
+        otherwise).
+        """
+
+        if status is WorkerStatus.QUERY and line == cls._QUERY_STRING:
+            return (WorkerStatus.INFO, [])
+
+        if status is WorkerStatus.INFO:
+            backup_files: List[BackupFile] = []
+
+            files: List[str] = line.decode().rstrip().split(', ')
+            for file in files:
+                (loc, length) = file.split(':')
+                backup_files.append(BackupFile(loc, int(length)))
+
+            return (WorkerStatus.READY, backup_files)
+
+        return (status, [])
+
+    def _wait_for_query(self: BackupWorker) -> int:
+        """
+        Send 'save query' until the server reports the saved files.
+
+        Rather than polling, wait to be notified by scan_chunk, which
+        has to see the response to a query before it can be repeated.
+
+        Return the number of queries sent.
         """
 
-        assert self._proc is not None
-        assert self._proc.stdin is not None
+        deadline = monotonic() + self._config.save_query_timeout
+        delay = self._QUERY_RETRY_MIN
+        queries = 0
+
+        while True:
+            with self._ready:
+                if self.status is WorkerStatus.READY:
+                    break
+                query = self.status is WorkerStatus.QUERY
+
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                raise RuntimeError('Timed out waiting for save query')
+
+            # not holding the lock: scan_chunk may have to see output
+            # before the command can be written
+            if query:
+                self.command('save query')
+                queries += 1
+
+            with self._ready:
+                self._ready.wait_for(
+                    lambda: self.status is WorkerStatus.READY,
+                    min(delay, remaining))
+            delay = min(delay * 2, self._QUERY_RETRY_MAX)
 
-        if not self._proc.poll():
-            print(string)
-            self._proc.stdin.write(string + '\n')
+        return queries
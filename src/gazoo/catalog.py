@@ -0,0 +1,302 @@
+"""
+Provide class Catalog.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import datetime
+from json import load
+from logging import warning
+from os import scandir
+from pathlib import Path
+from re import compile as compyle
+from sqlite3 import Row, connect
+from threading import Lock
+from typing import TYPE_CHECKING
+
+from .archive_reader import ArchiveReader
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+    from typing import (Any, ClassVar, Dict, Final, Iterator, List, Optional,
+                        Tuple, Type)
+
+
+class Catalog:
+    """
+    Keep an index of all backups in an SQLite database.
+
+    Each backup (archive or repository manifest) is recorded when it
+    is written, with its world, creation time, size, number of entries,
+    and SHA-256 checksum.  Listing, selecting (by number or time), and
+    cleaning up backups then never needs to scan the backups directory.
+    The outcome of the last verification of each backup (see
+    `ArchiveVerifier`) is recorded as well.
+
+    If the database does not exist yet, it is created and filled with
+    the backups already in the backups directory (without checksums).
+    The import is recorded along with the backups, in one transaction,
+    so an interrupted import is started over, and files that cannot be
+    read as backups are left out rather than stopping it.
+
+    One catalog is shared per database file; use `for_path` to get it.
+    """
+
+    _IMPORT_ERRORS: Final[Tuple[Type[BaseException], ...]] = (
+        KeyError, OSError, TypeError, *ArchiveReader.ERRORS)
+    _NAME_PATTERN: Final[str] = (r'^(?P<world>.+) ' +
+                                 r'(?P<created>\d{4}-\d{2}-\d{2} ' +
+                                 r'\d{2}-\d{2}-\d{2})' +
+                                 r'\.(zip|tar\.xz|tar\.zst|json)$')
+    _NAME_TIME_FORMAT: Final[str] = '%Y-%m-%d %H-%M-%S'
+
+    _SCHEMA: Final[List[str]] = [
+        '''CREATE TABLE IF NOT EXISTS backups (
+            name TEXT PRIMARY KEY,
+            world TEXT NOT NULL,
+            created REAL NOT NULL,
+            size INTEGER NOT NULL,
+            entries INTEGER NOT NULL,
+            checksum TEXT
+        )''',
+        'CREATE INDEX IF NOT EXISTS backups_created ON backups (created)',
+        '''CREATE TABLE IF NOT EXISTS verifications (
+            name TEXT PRIMARY KEY,
+            verified REAL NOT NULL,
+            size INTEGER,
+            mtime_ns INTEGER,
+            status TEXT NOT NULL
+        )''',
+        '''CREATE TABLE IF NOT EXISTS imports (
+            backups_dir TEXT PRIMARY KEY,
+            imported REAL NOT NULL
+        )''',
+    ]
+
+    _catalogs: ClassVar[Dict[Path, Catalog]] = {}
+    _catalogs_lock: ClassVar[Lock] = Lock()
+
+    @classmethod
+    def for_path(cls: Type[Catalog], path: Path,
+                 backups_dir_path: Path) -> Catalog:
+        """
+        Get the shared catalog for a database file.
+
+        `backups_dir_path` is only scanned if no import of it completed
+        yet (see `import_dir`).
+        """
+
+        with cls._catalogs_lock:
+            catalog = cls._catalogs.get(path)
+
+            if catalog is None:
+                catalog = cls(path)
+
+                if not catalog._imported(backups_dir_path):
+                    catalog.import_dir(backups_dir_path)
+
+                cls._catalogs[path] = catalog
+
+            return catalog
+
+    def __init__(self: Catalog, path: Path) -> None:
+        self._path: Path = path
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._connect() as connection:
+            for statement in self._SCHEMA:
+                connection.execute(statement)
+
+    def add(self: Catalog,
+            name: str,
+            world_dir_name: str,
+            created: float,
+            size: int,
+            entries: int,
+            checksum: Optional[str] = None) -> None:
+        """
+        Record a backup (replacing any record with the same name).
+        """
+
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO backups VALUES (?, ?, ?, ?, ?, ?)',
+                (name, world_dir_name, created, size, entries, checksum))
+
+    def find_at(self: Catalog, time: float) -> Optional[Dict[str, Any]]:
+        """
+        Get the newest backup made at or before a time (a timestamp).
+        """
+
+        with self._connect() as connection:
+            row = connection.execute(
+                'SELECT * FROM backups WHERE created <= ? ' +
+                'ORDER BY created DESC LIMIT 1', (time, )).fetchone()
+
+        return None if row is None else dict(row)
+
+    def find_recent(self: Catalog, num: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the `num`th most recent backup (starting from 1).
+        """
+
+        with self._connect() as connection:
+            row = connection.execute(
+                'SELECT * FROM backups ORDER BY created DESC LIMIT 1 ' +
+                'OFFSET ?', (num - 1, )).fetchone()
+
+        return None if row is None else dict(row)
+
+    def import_dir(self: Catalog, backups_dir_path: Path) -> None:
+        """
+        Record all backups found in a backups directory, along with the
+        import itself, in one transaction.
+
+        Files that are not named like backups are ignored, and ones that
+        cannot be read as backups are logged and skipped.  Backups
+        already recorded are kept as they are (with their checksums).
+        """
+
+        pattern = compyle(self._NAME_PATTERN)
+        rows: List[Tuple[str, str, float, int, int]] = []
+
+        if backups_dir_path.is_dir():
+            with scandir(backups_dir_path) as itr:
+                for entry in itr:
+                    match = pattern.match(entry.name)
+                    if match is None or not entry.is_file():
+                        continue
+
+                    try:
+                        created = datetime.strptime(match.group('created'),
+                                                    self._NAME_TIME_FORMAT)
+                        rows.append((entry.name, match.group('world'),
+                                     created.timestamp(),
+                                     entry.stat().st_size,
+                                     self._count_entries(Path(entry.path))))
+                    except self._IMPORT_ERRORS as err:
+                        warning(f'Skipping backup {entry.name}: {err!r}')
+
+        with self._connect() as connection:
+            connection.executemany(
+                'INSERT OR IGNORE INTO backups VALUES (?, ?, ?, ?, ?, NULL)',
+                rows)
+            connection.execute('INSERT OR REPLACE INTO imports VALUES (?, ?)',
+                               (str(backups_dir_path.resolve()),
+                                datetime.now().timestamp()))
+
+    def recent(self: Catalog,
+               world_dir_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get all backups (of a world, if given), from the most recent one
+        back.
+        """
+
+        with self._connect() as connection:
+            if world_dir_name is None:
+                rows = connection.execute(
+                    'SELECT * FROM backups ORDER BY created DESC').fetchall()
+            else:
+                rows = connection.execute(
+                    'SELECT * FROM backups WHERE world = ? ' +
+                    'ORDER BY created DESC', (world_dir_name, )).fetchall()
+
+        return [dict(row) for row in rows]
+
+    def remove(self: Catalog, name: str) -> None:
+        """
+        Forget a backup.
+        """
+
+        with self._connect() as connection:
+            connection.execute('DELETE FROM backups WHERE name = ?',
+                               (name, ))
+            connection.execute('DELETE FROM verifications WHERE name = ?',
+                               (name, ))
+
+    def set_checksum(self: Catalog, name: str, checksum: str) -> None:
+        """
+        Record the checksum of a backup that was recorded without one.
+        """
+
+        with self._connect() as connection:
+            connection.execute(
+                'UPDATE backups SET checksum = ? WHERE name = ?',
+                (checksum, name))
+
+    def set_verified(self: Catalog, name: str, verified: float,
+                     size: Optional[int], mtime_ns: Optional[int],
+                     status: str) -> bool:
+        """
+        Record a verification of a backup, with the size and
+        modification time of the backup file (None if it is missing).
+
+        Return False, recording nothing, if the backup is no longer in
+        the catalog (e.g. it was cleaned up while it was verified).
+        """
+
+        with self._connect() as connection:
+            cursor = connection.execute(
+                'INSERT OR REPLACE INTO verifications ' +
+                'SELECT ?, ?, ?, ?, ? ' +
+                'WHERE EXISTS (SELECT 1 FROM backups WHERE name = ?)',
+                (name, verified, size, mtime_ns, status, name))
+
+        return cursor.rowcount > 0
+
+    def verifications(self: Catalog) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the last verification of each backup, by name.
+        """
+
+        with self._connect() as connection:
+            rows = connection.execute(
+                'SELECT * FROM verifications').fetchall()
+
+        return {row['name']: dict(row) for row in rows}
+
+    @contextmanager
+    def _connect(self: Catalog) -> Iterator[Connection]:
+        """
+        Open a connection that commits (or rolls back) and closes when
+        done.
+
+        A connection per use keeps the catalog safe to use from any
+        thread.
+        """
+
+        connection = connect(self._path)
+        connection.row_factory = Row
+
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    @classmethod
+    def _count_entries(cls: Type[Catalog], path: Path) -> int:
+        """
+        Count the files in a backup (an archive or repository manifest).
+        """
+
+        if path.suffix == '.json':
+            with path.open(encoding='utf-8') as manifest_file:
+                return len(load(manifest_file)['files'])
+
+        with ArchiveReader(path) as reader:
+            return len(reader.names())
+
+    def _imported(self: Catalog, backups_dir_path: Path) -> bool:
+        """
+        Check whether an import of a backups directory completed.
+        """
+
+        with self._connect() as connection:
+            row = connection.execute(
+                'SELECT 1 FROM imports WHERE backups_dir = ?',
+                (str(backups_dir_path.resolve()), )).fetchone()
+
+        return row is not None
@@ -5,17 +5,24 @@ Provide class CleanupWorker.
 from __future__ import annotations
 
 from logging import warning
+from time import monotonic
+from typing import TYPE_CHECKING
 
+from .metrics import Metrics
 from .util import Util
 from .worker_status import WorkerStatus
 
+if TYPE_CHECKING:
+    from .config import Config
+
 class CleanupWorker:
     """
     Provide a class to do the heavy lifting of the cleanup process.
     """
 
-    def __init__(self: CleanupWorker) -> None:
+    def __init__(self: CleanupWorker, config: Config) -> None:
         self.status: WorkerStatus = WorkerStatus.IDLE
+        self._config: Config = config
 
     def cleanup(self: CleanupWorker) -> None:
         """
@@ -27,7 +34,14 @@ class CleanupWorker:
             return
 
         self.status = WorkerStatus.WORKING
+        start = monotonic()
 
-        Util.cleanup_archives()
+        try:
+            Util.cleanup_archives(self._config)
+        except Exception:
+            Metrics.record_failure('cleanup')
+            raise
+        finally:
+            self.status = WorkerStatus.IDLE
 
-        self.status = WorkerStatus.IDLE
+        Metrics.record_cleanup(monotonic() - start)
@@ -5,10 +5,16 @@ Provide class Config.
 from __future__ import annotations
 
 from configparser import DEFAULTSECT, ConfigParser
+from os import cpu_count
 from typing import TYPE_CHECKING
+from zipfile import ZIP_BZIP2, ZIP_DEFLATED, ZIP_LZMA, ZIP_STORED
+
+from .cron_expression import CronExpression
+from .scheduled_job import ScheduledJob
+from .tar_writer import TarWriter
 
 if TYPE_CHECKING:
-    from typing import Final
+    from typing import Dict, Final, List, Optional
 
 
 class Config:
@@ -21,16 +27,103 @@ class Config:
     configuration files are provided for external use.
     """
 
+    _DEFAULT_ARCHIVE_FORMAT: Final[str] = 'zip'
+    _DEFAULT_ARCHIVE_IO_IDLE: Final[bool] = False
+    _DEFAULT_ARCHIVE_READ_RATE: Final[float] = 0.0 # no limit
+    _DEFAULT_ARCHIVE_WRITE_RATE: Final[float] = 0.0 # no limit
+    _DEFAULT_ASYNCIO: Final[bool] = False
+    _DEFAULT_BACKUP_BACKEND: Final[str] = 'zip'
+    _DEFAULT_BACKUP_CHANGE_TARGET: Final[float] = 64.0
     _DEFAULT_BACKUP_INTERVAL: Final[int] = 10 * 60 # 10 minutes
+    _DEFAULT_BACKUP_INTERVAL_MAX: Final[int] = 0 # not adaptive
+    _DEFAULT_BACKUP_IO_BUDGET: Final[float] = 0.05
+    _DEFAULT_BACKUP_SCHEDULE: Final[str] = '' # use backup_interval
     _DEFAULT_CLEANUP_INTERVAL: Final[int] = 24 * 60 * 60 # 24 hours
+    _DEFAULT_CLEANUP_SCHEDULE: Final[str] = '' # use cleanup_interval
+    _DEFAULT_COMPRESS_QUEUE_DEPTH: Final[int] = 0 # twice the workers
+    _DEFAULT_COMPRESSION: Final[str] = 'deflate'
+    _DEFAULT_COMPRESSION_LEVEL: Final[int] = 6
+    _DEFAULT_COMPRESSION_WORKERS: Final[int] = 0 # one per CPU
+    _DEFAULT_CONTROL_SOCKET: Final[str] = '' # none
     _DEFAULT_DEBUG: Final[bool] = False
+    _DEFAULT_FULL_BACKUP_EVERY: Final[int] = 1 # every backup is full
+    _DEFAULT_KEEP_DAILY: Final[int] = 14
+    _DEFAULT_KEEP_HOURLY: Final[int] = 24
+    _DEFAULT_KEEP_MONTHLY: Final[int] = 12
+    _DEFAULT_KEEP_WEEKLY: Final[int] = 8
+    _DEFAULT_LOG_CAPTURE: Final[bool] = True
+    _DEFAULT_LOG_KEEP_DAYS: Final[int] = 28 # 4 weeks
+    _DEFAULT_LOG_ROTATE_INTERVAL: Final[int] = 24 * 60 * 60 # 24 hours
+    _DEFAULT_LOG_ROTATE_SIZE: Final[float] = 16.0
+    _DEFAULT_METRICS_FILE: Final[str] = '' # none
+    _DEFAULT_METRICS_PORT: Final[int] = 0 # no endpoint
+    _DEFAULT_MISFIRE_GRACE: Final[int] = 60 # 1 minute
+    _DEFAULT_MISFIRE_POLICY: Final[str] = 'coalesce'
+    _DEFAULT_PAGE_CACHE_HINTS: Final[bool] = True
+    _DEFAULT_READ_QUEUE_DEPTH: Final[int] = 0 # twice the workers
+    _DEFAULT_SAVE_QUERY_TIMEOUT: Final[int] = 60 # 1 minute
+    _DEFAULT_SCHEDULE_JITTER: Final[int] = 0
+    _DEFAULT_SKIP_IDLE_BACKUPS: Final[bool] = True
+    _DEFAULT_VERIFY_INTERVAL: Final[int] = 24 * 60 * 60 # 24 hours
+    _DEFAULT_VERIFY_RATE: Final[float] = 16.0 # MiB per second
+    _DEFAULT_VERIFY_SCHEDULE: Final[str] = '' # use verify_interval
+    _DEFAULT_VERIFY_WORKERS: Final[int] = 2
+
+    _ARCHIVE_FORMATS: Final[List[str]] = ['zip'] + [
+        f'tar.{compression}' for compression in TarWriter.COMPRESSIONS
+    ]
+    _BACKUP_BACKENDS: Final[List[str]] = ['zip', 'repository']
+    _COMPRESSION_METHODS: Final[Dict[str, int]] = {
+        'stored': ZIP_STORED,
+        'deflate': ZIP_DEFLATED,
+        'bzip2': ZIP_BZIP2,
+        'lzma': ZIP_LZMA,
+    }
 
     _SECTION_NAME: Final[str] = 'gazoo'
 
     DEFAULTS_STRING: Final[str] = (
-        f'''backup_interval={_DEFAULT_BACKUP_INTERVAL}
+        f'''archive_format={_DEFAULT_ARCHIVE_FORMAT}
+archive_io_idle={str(_DEFAULT_ARCHIVE_IO_IDLE).lower()}
+archive_read_rate={_DEFAULT_ARCHIVE_READ_RATE}
+archive_write_rate={_DEFAULT_ARCHIVE_WRITE_RATE}
+asyncio={str(_DEFAULT_ASYNCIO).lower()}
+backup_backend={_DEFAULT_BACKUP_BACKEND}
+backup_change_target={_DEFAULT_BACKUP_CHANGE_TARGET}
+backup_interval={_DEFAULT_BACKUP_INTERVAL}
+backup_interval_max={_DEFAULT_BACKUP_INTERVAL_MAX}
+backup_io_budget={_DEFAULT_BACKUP_IO_BUDGET}
+backup_schedule={_DEFAULT_BACKUP_SCHEDULE}
 cleanup_interval={_DEFAULT_CLEANUP_INTERVAL}
+cleanup_schedule={_DEFAULT_CLEANUP_SCHEDULE}
+compress_queue_depth={_DEFAULT_COMPRESS_QUEUE_DEPTH}
+compression={_DEFAULT_COMPRESSION}
+compression_level={_DEFAULT_COMPRESSION_LEVEL}
+compression_workers={_DEFAULT_COMPRESSION_WORKERS}
+control_socket={_DEFAULT_CONTROL_SOCKET}
 debug={str(_DEFAULT_DEBUG).lower()}
+full_backup_every={_DEFAULT_FULL_BACKUP_EVERY}
+keep_daily={_DEFAULT_KEEP_DAILY}
+keep_hourly={_DEFAULT_KEEP_HOURLY}
+keep_monthly={_DEFAULT_KEEP_MONTHLY}
+keep_weekly={_DEFAULT_KEEP_WEEKLY}
+log_capture={str(_DEFAULT_LOG_CAPTURE).lower()}
+log_keep_days={_DEFAULT_LOG_KEEP_DAYS}
+log_rotate_interval={_DEFAULT_LOG_ROTATE_INTERVAL}
+log_rotate_size={_DEFAULT_LOG_ROTATE_SIZE}
+metrics_file={_DEFAULT_METRICS_FILE}
+metrics_port={_DEFAULT_METRICS_PORT}
+misfire_grace={_DEFAULT_MISFIRE_GRACE}
+misfire_policy={_DEFAULT_MISFIRE_POLICY}
+page_cache_hints={str(_DEFAULT_PAGE_CACHE_HINTS).lower()}
+read_queue_depth={_DEFAULT_READ_QUEUE_DEPTH}
+save_query_timeout={_DEFAULT_SAVE_QUERY_TIMEOUT}
+schedule_jitter={_DEFAULT_SCHEDULE_JITTER}
+skip_idle_backups={str(_DEFAULT_SKIP_IDLE_BACKUPS).lower()}
+verify_interval={_DEFAULT_VERIFY_INTERVAL}
+verify_rate={_DEFAULT_VERIFY_RATE}
+verify_schedule={_DEFAULT_VERIFY_SCHEDULE}
+verify_workers={_DEFAULT_VERIFY_WORKERS}
 ''')
     """
     String of default settings for the config file
@@ -51,14 +144,142 @@ debug={str(_DEFAULT_DEBUG).lower()}
     def __init__(self: 'Config', config: ConfigParser) -> None:
         self._config: ConfigParser = config
 
+    @property
+    def archive_format(self: 'Config') -> str:
+        """
+        Format of backup archives (for the `zip` backup backend)
+
+        Either `zip`, `tar.xz`, or `tar.zst` (only if the `zstandard`
+        package is installed).  The `compression` method only applies to
+        zip archives.
+        """
+
+        archive_format = self._config.get(self._SECTION_NAME,
+                                          'archive_format').lower()
+
+        if archive_format not in self._ARCHIVE_FORMATS:
+            raise ValueError(f'Unknown archive format: {archive_format}')
+
+        return archive_format
+
+    @property
+    def archive_io_idle(self: 'Config') -> bool:
+        """
+        Indicates if archiving gets the idle I/O scheduling class
+
+        The disk then only serves archiving when nothing else (e.g. the
+        server) uses it.  Only supported on Linux.
+        """
+
+        return self._config.getboolean(self._SECTION_NAME, 'archive_io_idle')
+
+    @property
+    def archive_read_rate(self: 'Config') -> float:
+        """
+        Maximum rate at which saved files are read to archive them (in
+        MiB/s)
+
+        Copying the files while the server holds saving is never
+        limited.  A value of 0 in the config file means no limit.
+        """
+
+        return self._config.getfloat(self._SECTION_NAME, 'archive_read_rate')
+
+    @property
+    def archive_write_rate(self: 'Config') -> float:
+        """
+        Maximum rate at which backups are written (in MiB/s)
+
+        A value of 0 in the config file means no limit.
+        """
+
+        return self._config.getfloat(self._SECTION_NAME,
+                                     'archive_write_rate')
+
+    @property
+    def asyncio(self: 'Config') -> bool:
+        """
+        Indicates if the server is wrapped by a single asyncio event loop
+
+        Otherwise, a thread is used for each stream and timer.
+        """
+
+        return self._config.getboolean(self._SECTION_NAME, 'asyncio')
+
+    @property
+    def backup_backend(self: 'Config') -> str:
+        """
+        Where backups are stored
+
+        Either `zip` (an archive per backup) or `repository` (files are
+        stored once by content, with a manifest per backup).
+        """
+
+        backend = self._config.get(self._SECTION_NAME,
+                                   'backup_backend').lower()
+
+        if backend not in self._BACKUP_BACKENDS:
+            raise ValueError(f'Unknown backup backend: {backend}')
+
+        return backend
+
+    @property
+    def backup_change_target(self: 'Config') -> float:
+        """
+        World data to let change between adaptive backups (in MiB)
+
+        Only used if `backup_interval_max` is set (see
+        `AdaptiveInterval`).
+        """
+
+        return self._config.getfloat(self._SECTION_NAME,
+                                     'backup_change_target')
+
     @property
     def backup_interval(self: 'Config') -> int:
         """
         Time between backups (in seconds)
+
+        If `backup_interval_max` is set, this is the shortest time
+        between backups instead.
         """
 
         return self._config.getint(self._SECTION_NAME, 'backup_interval')
 
+    @property
+    def backup_interval_max(self: 'Config') -> int:
+        """
+        Longest time between adaptive backups (in seconds)
+
+        The time between backups is then adapted to how fast the world
+        changes and how long backups take (see `AdaptiveInterval`).  A
+        value of 0 in the config file means backups are not adaptive.
+        """
+
+        return self._config.getint(self._SECTION_NAME, 'backup_interval_max')
+
+    @property
+    def backup_io_budget(self: 'Config') -> float:
+        """
+        Largest fraction of the time spent on adaptive backups
+
+        Only used if `backup_interval_max` is set (see
+        `AdaptiveInterval`).  A value of 0 in the config file means no
+        limit.
+        """
+
+        return self._config.getfloat(self._SECTION_NAME, 'backup_io_budget')
+
+    @property
+    def backup_schedule(self: 'Config') -> Optional[CronExpression]:
+        """
+        Cron expression for when to make backups
+
+        If empty in the config file, `backup_interval` is used instead.
+        """
+
+        return self._get_cron('backup_schedule')
+
     @property
     def cleanup_interval(self: 'Config') -> int:
         """
@@ -67,6 +288,86 @@ debug={str(_DEFAULT_DEBUG).lower()}
 
         return self._config.getint(self._SECTION_NAME, 'cleanup_interval')
 
+    @property
+    def cleanup_schedule(self: 'Config') -> Optional[CronExpression]:
+        """
+        Cron expression for when to clean up backups
+
+        If empty in the config file, `cleanup_interval` is used instead.
+        """
+
+        return self._get_cron('cleanup_schedule')
+
+    @property
+    def compress_queue_depth(self: 'Config') -> int:
+        """
+        Number of files compressed ahead of writing them to an archive
+
+        A value of 0 in the config file means twice `compression_workers`.
+        """
+
+        depth = self._config.getint(self._SECTION_NAME,
+                                    'compress_queue_depth')
+
+        if depth < 1:
+            depth = 2 * self.compression_workers
+
+        return depth
+
+    @property
+    def compression(self: 'Config') -> int:
+        """
+        Compression method for backup archives (a `zipfile` constant)
+
+        One of `stored`, `deflate`, `bzip2`, or `lzma` in the config file.
+        """
+
+        name = self._config.get(self._SECTION_NAME, 'compression')
+
+        try:
+            return self._COMPRESSION_METHODS[name.lower()]
+        except KeyError as err:
+            raise ValueError(f'Unknown compression method: {name}') from err
+
+    @property
+    def compression_level(self: 'Config') -> int:
+        """
+        Compression level for backup archives
+
+        Ignored for the `stored` and `lzma` compression methods.  For tar
+        archives, the xz preset (0 to 9) or zstd level (1 to 22).
+        """
+
+        return self._config.getint(self._SECTION_NAME, 'compression_level')
+
+    @property
+    def compression_workers(self: 'Config') -> int:
+        """
+        Number of processes used to compress backup archives
+
+        A value of 0 in the config file means one process per CPU.
+        """
+
+        workers = self._config.getint(self._SECTION_NAME,
+                                      'compression_workers')
+
+        if workers < 1:
+            workers = cpu_count() or 1
+
+        return workers
+
+    @property
+    def control_socket(self: 'Config') -> str:
+        """
+        Path of the Unix socket to control gazoo through (see
+        `ControlServer`)
+
+        Relative paths are relative to the server directory.  An empty
+        value opens no control socket.
+        """
+
+        return self._config.get(self._SECTION_NAME, 'control_socket').strip()
+
     @property
     def debug(self: 'Config') -> bool:
         """
@@ -74,3 +375,232 @@ debug={str(_DEFAULT_DEBUG).lower()}
         """
 
         return self._config.getboolean(self._SECTION_NAME, 'debug')
+
+    @property
+    def full_backup_every(self: 'Config') -> int:
+        """
+        Number of zip backups per full backup
+
+        The backups in between only hold files that changed since the
+        previous backup.  A value of 1 makes every backup a full backup.
+        """
+
+        return max(
+            self._config.getint(self._SECTION_NAME, 'full_backup_every'), 1)
+
+    @property
+    def keep_daily(self: 'Config') -> int:
+        """
+        Number of days to keep the most recent backup of
+        """
+
+        return self._config.getint(self._SECTION_NAME, 'keep_daily')
+
+    @property
+    def keep_hourly(self: 'Config') -> int:
+        """
+        Number of hours to keep the most recent backup of
+        """
+
+        return self._config.getint(self._SECTION_NAME, 'keep_hourly')
+
+    @property
+    def keep_monthly(self: 'Config') -> int:
+        """
+        Number of months to keep the most recent backup of
+        """
+
+        return self._config.getint(self._SECTION_NAME, 'keep_monthly')
+
+    @property
+    def keep_weekly(self: 'Config') -> int:
+        """
+        Number of weeks to keep the most recent backup of
+        """
+
+        return self._config.getint(self._SECTION_NAME, 'keep_weekly')
+
+    @property
+    def log_capture(self: 'Config') -> bool:
+        """
+        Indicates if server output is captured in the logs directory
+
+        See `ServerLog`.
+        """
+
+        return self._config.getboolean(self._SECTION_NAME, 'log_capture')
+
+    @property
+    def log_keep_days(self: 'Config') -> int:
+        """
+        Number of days to keep captured server output for
+
+        A value of 0 in the config file means it is kept forever.
+        """
+
+        return self._config.getint(self._SECTION_NAME, 'log_keep_days')
+
+    @property
+    def log_rotate_interval(self: 'Config') -> int:
+        """
+        Longest time server output is captured in one log segment (in
+        seconds)
+        """
+
+        return self._config.getint(self._SECTION_NAME, 'log_rotate_interval')
+
+    @property
+    def log_rotate_size(self: 'Config') -> float:
+        """
+        Largest size of a log segment of server output before it is
+        compressed (in MiB)
+        """
+
+        return self._config.getfloat(self._SECTION_NAME, 'log_rotate_size')
+
+    @property
+    def metrics_file(self: 'Config') -> str:
+        """
+        Path to write metrics to, in the Prometheus text format
+
+        Relative paths are relative to the server directory.  An empty
+        value writes no metrics file.
+        """
+
+        return self._config.get(self._SECTION_NAME, 'metrics_file').strip()
+
+    @property
+    def metrics_port(self: 'Config') -> int:
+        """
+        Local port to serve metrics on over HTTP (0 for none)
+        """
+
+        return self._config.getint(self._SECTION_NAME, 'metrics_port')
+
+    @property
+    def misfire_grace(self: 'Config') -> int:
+        """
+        Time a backup or cleanup may start late (in seconds)
+
+        Later runs are handled according to `misfire_policy`.
+        """
+
+        return self._config.getint(self._SECTION_NAME, 'misfire_grace')
+
+    @property
+    def misfire_policy(self: 'Config') -> str:
+        """
+        What to do with runs that start too late
+
+        Either `coalesce` (run once for all missed runs) or `skip` (wait
+        for the next run).
+        """
+
+        policy = self._config.get(self._SECTION_NAME,
+                                  'misfire_policy').lower()
+
+        if policy not in ScheduledJob.MISFIRE_POLICIES:
+            raise ValueError(f'Unknown misfire policy: {policy}')
+
+        return policy
+
+    @property
+    def page_cache_hints(self: 'Config') -> bool:
+        """
+        Indicates if backups give the kernel page cache hints
+
+        Saved files are then read sequentially, and pages the server did
+        not have cached before, and of written backups, are dropped from
+        the page cache afterwards.
+        """
+
+        return self._config.getboolean(self._SECTION_NAME,
+                                       'page_cache_hints')
+
+    @property
+    def read_queue_depth(self: 'Config') -> int:
+        """
+        Number of files read (and hashed) ahead of compressing them
+
+        A value of 0 in the config file means twice `compression_workers`.
+        """
+
+        depth = self._config.getint(self._SECTION_NAME, 'read_queue_depth')
+
+        if depth < 1:
+            depth = 2 * self.compression_workers
+
+        return depth
+
+    @property
+    def save_query_timeout(self: 'Config') -> int:
+        """
+        Time to wait for the server to finish saving (in seconds)
+        """
+
+        return self._config.getint(self._SECTION_NAME, 'save_query_timeout')
+
+    @property
+    def schedule_jitter(self: 'Config') -> int:
+        """
+        Maximum random delay added to each backup and cleanup (in seconds)
+        """
+
+        return self._config.getint(self._SECTION_NAME, 'schedule_jitter')
+
+    @property
+    def skip_idle_backups(self: 'Config') -> bool:
+        """
+        Indicates if scheduled backups are skipped while worlds are idle
+
+        A world is idle if no player was online since the last backup,
+        and none of its files changed (see `WorldActivity`).
+        """
+
+        return self._config.getboolean(self._SECTION_NAME,
+                                       'skip_idle_backups')
+
+    @property
+    def verify_interval(self: 'Config') -> int:
+        """
+        Time between verifications of backups (in seconds)
+        """
+
+        return self._config.getint(self._SECTION_NAME, 'verify_interval')
+
+    @property
+    def verify_rate(self: 'Config') -> float:
+        """
+        Maximum rate at which backups are read to verify them (in MiB/s)
+
+        A value of 0 in the config file means no limit.
+        """
+
+        return self._config.getfloat(self._SECTION_NAME, 'verify_rate')
+
+    @property
+    def verify_schedule(self: 'Config') -> Optional[CronExpression]:
+        """
+        Cron expression for when to verify backups
+
+        If empty in the config file, `verify_interval` is used instead.
+        """
+
+        return self._get_cron('verify_schedule')
+
+    @property
+    def verify_workers(self: 'Config') -> int:
+        """
+        Number of backups verified at once
+        """
+
+        return max(
+            self._config.getint(self._SECTION_NAME, 'verify_workers'), 1)
+
+    def _get_cron(self: 'Config', option: str) -> Optional[CronExpression]:
+        expression = self._config.get(self._SECTION_NAME, option).strip()
+
+        if not expression:
+            return None
+
+        return CronExpression(expression)
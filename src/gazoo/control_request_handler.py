@@ -0,0 +1,41 @@
+"""
+Provide class ControlRequestHandler.
+"""
+
+from __future__ import annotations
+
+from logging import debug
+from socketserver import StreamRequestHandler
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Final
+
+
+class ControlRequestHandler(StreamRequestHandler):
+    """
+    Answer a command sent to the control socket (see `ControlServer`).
+
+    A client sends one line and reads the response until the connection
+    is closed.  Responses are made by the `respond` callable given when
+    the handler is made.
+    """
+
+    _MAX_LINE: Final[int] = 4096
+
+    def __init__(self: ControlRequestHandler, *args: Any,
+                 respond: Callable[[str], str], **kwargs: Any) -> None:
+        # `handle` already runs within the base initializer
+        self._respond: Callable[[str], str] = respond
+
+        super().__init__(*args, **kwargs)
+
+    def handle(self: ControlRequestHandler) -> None:
+        """
+        Read a command and write the response.
+        """
+
+        line = self.rfile.readline(self._MAX_LINE).decode(errors='replace')
+        debug(f'control: {line.strip()}')
+
+        self.wfile.write(self._respond(line).encode())
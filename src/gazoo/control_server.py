@@ -0,0 +1,205 @@
+"""
+Provide class ControlServer.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from functools import partial
+from logging import error, info
+from os import chmod, rename
+from pathlib import Path
+from socket import AF_UNIX, SHUT_WR, socket
+from tempfile import TemporaryDirectory
+from threading import Thread
+from typing import TYPE_CHECKING
+
+from .control_request_handler import ControlRequestHandler
+from .metrics import Metrics
+from .util import Util
+
+if TYPE_CHECKING:
+    from socketserver import ThreadingUnixStreamServer
+    from typing import Callable, Dict, Final, List, Optional, Tuple, Type
+
+    from .worker_status import WorkerStatus
+
+
+class ControlServer:
+    """
+    Serve commands on a Unix socket, so gazoo can be driven by other
+    programs (e.g. to take a backup right before maintenance).
+
+    A client connects, sends one command per connection as a line, and
+    reads the response until the connection is closed.  Responses are
+    lines of text; a failed command gets a single line starting with
+    `error: `.  The commands are:
+
+    * `backup now`
+        * Make a backup and respond once it is saved (or with an error
+          if it failed, or a backup is already running).
+    * `list`
+        * List the backups, as `gazoo list` does.
+    * `send <server command>`
+        * Send a command to the server, taking turns with the forwarded
+          stdin.
+    * `status`
+        * Respond with the status of each worker (see `WorkerStatus`)
+          and stats of the last backup, as `name: value` lines.
+
+    The socket can only be used by the user running gazoo: it is made in
+    a directory only that user can enter, and moved into place once its
+    mode is set.  Unix sockets are not supported on Windows.
+    """
+
+    COMMANDS: Final[List[str]] = ['backup now', 'list', 'send', 'status']
+    """
+    Commands understood by the control socket
+    """
+
+    OK: Final[str] = 'ok\n'
+    """
+    Response to a command that succeeded without anything to report
+    """
+
+    _CHUNK_SIZE: Final[int] = 64 * 1024  # 64 KiB
+    _MAX_RESPONSE: Final[int] = 1024 * 1024  # 1 MiB
+    _MODE: Final[int] = 0o600
+
+    @classmethod
+    def error(cls: Type[ControlServer], message: str) -> str:
+        """
+        Get the response to a command that failed.
+        """
+
+        return f'error: {message}\n'
+
+    @classmethod
+    def parse(cls: Type[ControlServer], line: str) -> Tuple[str, str]:
+        """
+        Split a command line into the command and its argument (the
+        server command for `send`, empty otherwise).
+
+        Raise `ValueError` for an unknown command or missing argument.
+        """
+
+        words = line.strip().split(maxsplit=1)
+        if words and words[0] == 'send':
+            if len(words) < 2:
+                raise ValueError('send needs a server command')
+            return ('send', words[1])
+
+        command = ' '.join(line.split())
+        if command not in cls.COMMANDS:
+            raise ValueError(f'unknown command: {command}')
+
+        return (command, '')
+
+    @classmethod
+    def request(cls: Type[ControlServer], path: Path, line: str) -> str:
+        """
+        Send a command to a control socket, and get the response.
+        """
+
+        with socket(AF_UNIX) as client:
+            client.connect(str(path))
+            client.sendall(f'{line}\n'.encode())
+            client.shutdown(SHUT_WR)
+
+            chunks: List[bytes] = []
+            length = 0
+            while length < cls._MAX_RESPONSE:
+                chunk = client.recv(cls._CHUNK_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                length += len(chunk)
+
+        return b''.join(chunks).decode(errors='replace')
+
+    @classmethod
+    def status(cls: Type[ControlServer],
+               statuses: Dict[str, WorkerStatus]) -> str:
+        """
+        Get the response to `status`, from the status of each worker (by
+        job name), the catalog, and metrics.
+        """
+
+        lines = [
+            f'{job}: {status.name.lower()}'
+            for (job, status) in statuses.items()
+        ]
+
+        backups = Util.catalog().recent()
+        if backups:
+            created = datetime.fromtimestamp(backups[0]['created'])
+            lines.extend([
+                f'last_backup: {backups[0]["name"]}',
+                f'last_backup_created: {created:%Y-%m-%d %H:%M:%S}',
+                f'last_backup_size: {backups[0]["size"]}',
+                f'last_backup_entries: {backups[0]["entries"]}',
+            ])
+
+        for (stat, value) in Metrics.last_backup().items():
+            if stat != 'timestamp':
+                lines.append(f'last_backup_{stat}: {value:.15g}')
+
+        return '\n'.join(lines) + '\n'
+
+    def __init__(self: ControlServer, path: Path,
+                 respond: Callable[[str], str]) -> None:
+        self._path: Path = path
+        self._respond: Callable[[str], str] = respond
+        self._server: Optional[ThreadingUnixStreamServer] = None
+
+    def start(self: ControlServer) -> None:
+        """
+        Start serving in a thread.
+
+        A socket left behind by an earlier run is replaced.  Errors are
+        logged rather than raised, so they never stop the server.
+        """
+
+        try:
+            # pylint: disable=import-outside-toplevel
+            from socketserver import ThreadingUnixStreamServer
+        except ImportError:  # not available on Windows
+            error('Control sockets are not supported on this platform')
+            return
+
+        try:
+            # made with mode 0700, next to the socket (to be renamed)
+            with TemporaryDirectory(dir=self._path.parent) as bind_dir:
+                bind_path = Path(bind_dir, self._path.name)
+                self._server = ThreadingUnixStreamServer(
+                    str(bind_path),
+                    partial(ControlRequestHandler, respond=self._respond))
+                chmod(bind_path, self._MODE)
+                rename(bind_path, self._path)
+        except OSError as err:
+            error(f'Could not open control socket: {err}')
+            if self._server is not None:
+                self._server.server_close()
+                self._server = None
+            return
+
+        self._server.daemon_threads = True
+        Thread(daemon=True,
+               name='control',
+               target=self._server.serve_forever).start()
+
+        info(f'Listening for commands on {self._path}')
+
+    def stop(self: ControlServer) -> None:
+        """
+        Stop serving and remove the socket.
+        """
+
+        if self._server is None:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+
+        self._path.unlink(missing_ok=True)
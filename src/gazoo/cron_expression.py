@@ -0,0 +1,120 @@
+"""
+Provide class CronExpression.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Final, FrozenSet, List, Tuple
+
+
+class CronExpression:
+    """
+    Match times against a standard five-field cron expression.
+
+    The fields are minute, hour, day of month, month, and day of week
+    (0-7, where both 0 and 7 are Sunday).  Each field is `*` or a comma
+    separated list of numbers and ranges (`a-b`), optionally with a
+    step (`*/n`, `a-b/n`).  As in cron, if both day fields are
+    restricted, a time matches if either of them does.
+    """
+
+    _FIELD_RANGES: Final[List[Tuple[int, int]]] = [
+        (0, 59),  # minute
+        (0, 23),  # hour
+        (1, 31),  # day of month
+        (1, 12),  # month
+        (0, 7),  # day of week
+    ]
+
+    _MAX_YEARS: Final[int] = 5
+
+    def __init__(self: CronExpression, expression: str) -> None:
+        fields = expression.split()
+
+        if len(fields) != len(self._FIELD_RANGES):
+            raise ValueError(f'Cron expression needs 5 fields: {expression}')
+
+        parsed = [
+            self._parse_field(field, low, high)
+            for (field, (low, high)) in zip(fields, self._FIELD_RANGES)
+        ]
+
+        self._expression: str = expression
+        self._minutes: FrozenSet[int] = parsed[0]
+        self._hours: FrozenSet[int] = parsed[1]
+        self._days: FrozenSet[int] = parsed[2]
+        self._months: FrozenSet[int] = parsed[3]
+        # cron counts from Sunday, datetime.weekday() from Monday
+        self._weekdays: FrozenSet[int] = frozenset(
+            (day - 1) % 7 for day in parsed[4])
+
+        self._days_restricted: bool = fields[2] != '*'
+        self._weekdays_restricted: bool = fields[4] != '*'
+
+    def __str__(self: CronExpression) -> str:
+        return self._expression
+
+    def next_after(self: CronExpression, after: datetime) -> datetime:
+        """
+        Get the first matching time (to the minute) after a given time.
+        """
+
+        time = (after + timedelta(minutes=1)).replace(second=0,
+                                                      microsecond=0)
+        limit = time + timedelta(days=366 * self._MAX_YEARS)
+
+        while time < limit:
+            if time.month not in self._months:
+                time = (time.replace(day=1, hour=0, minute=0) +
+                        timedelta(days=32)).replace(day=1)
+            elif not self._matches_day(time):
+                time = time.replace(hour=0, minute=0) + timedelta(days=1)
+            elif time.hour not in self._hours:
+                time = time.replace(minute=0) + timedelta(hours=1)
+            elif time.minute not in self._minutes:
+                time += timedelta(minutes=1)
+            else:
+                return time
+
+        raise ValueError(f'Cron expression never matches: {self}')
+
+    def _matches_day(self: CronExpression, time: datetime) -> bool:
+        day_matches = time.day in self._days
+        weekday_matches = time.weekday() in self._weekdays
+
+        if self._days_restricted and self._weekdays_restricted:
+            return day_matches or weekday_matches
+
+        return day_matches and weekday_matches
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> FrozenSet[int]:
+        """
+        Get the set of values matched by one field.
+        """
+
+        values: List[int] = []
+
+        for part in field.split(','):
+            (range_string, _slash, step_string) = part.partition('/')
+            step = int(step_string) if step_string else 1
+
+            if range_string == '*':
+                (start, end) = (low, high)
+            elif '-' in range_string:
+                (start_string, end_string) = range_string.split('-', 1)
+                (start, end) = (int(start_string), int(end_string))
+            else:
+                start = int(range_string)
+                end = high if step_string else start
+
+            if step < 1 or start < low or end > high or start > end:
+                raise ValueError(f'Invalid cron field: {field}')
+
+            values.extend(range(start, end + 1, step))
+
+        return frozenset(values)
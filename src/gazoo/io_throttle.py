@@ -0,0 +1,152 @@
+"""
+Provide class IoThrottle.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from logging import debug
+from platform import machine
+from typing import TYPE_CHECKING
+
+from .token_bucket import TokenBucket
+
+if TYPE_CHECKING:
+    from typing import ClassVar, Dict, Final, Iterator, Optional, Tuple, Type
+
+
+class IoThrottle:
+    """
+    Limit the disk bandwidth used by archiving in the background.
+
+    Reads of saved files and writes of backups are counted against a
+    read and a write token bucket (see `TokenBucket`) in each process.
+    There are no limits until they are set, so code that archives can
+    count its I/O unconditionally: only the archive phase of a backup is
+    limited (see `limit`), never the snapshot taken while the server
+    holds saving.
+
+    Optionally, the archiving threads (and compression processes) also
+    get the idle I/O scheduling class, so the disk only serves them when
+    nothing else (e.g. the server) wants it.  This is only supported on
+    Linux.
+    """
+
+    _IOPRIO_CLASS_IDLE: Final[int] = 3
+    _IOPRIO_CLASS_SHIFT: Final[int] = 13
+    _IOPRIO_WHO_PROCESS: Final[int] = 1
+    # system call numbers of ioprio_get and ioprio_set, by architecture
+    _IOPRIO_SYSCALLS: Final[Dict[str, Tuple[int, int]]] = {
+        'aarch64': (31, 30),
+        'armv7l': (315, 314),
+        'i686': (290, 289),
+        'x86_64': (252, 251),
+    }
+
+    _read_bucket: ClassVar[Optional[TokenBucket]] = None
+    _write_bucket: ClassVar[Optional[TokenBucket]] = None
+
+    @classmethod
+    def configure(cls: Type[IoThrottle], read_rate: float, write_rate: float,
+                  idle: bool) -> None:
+        """
+        Set the limits (in bytes per second, 0 for no limit) for this
+        process and, if `idle`, give the calling thread the idle I/O
+        scheduling class.
+
+        This is also the initializer of compression processes.
+        """
+
+        cls._read_bucket = TokenBucket(read_rate) if read_rate > 0 else None
+        cls._write_bucket = (TokenBucket(write_rate)
+                             if write_rate > 0 else None)
+
+        if idle:
+            cls._set_priority(
+                cls._IOPRIO_CLASS_IDLE << cls._IOPRIO_CLASS_SHIFT)
+
+    @classmethod
+    @contextmanager
+    def limit(cls: Type[IoThrottle], read_rate: float, write_rate: float,
+              idle: bool) -> Iterator[None]:
+        """
+        Limit I/O in this process (see `configure`) until the context
+        exits, then lift the limits and restore the I/O priority of the
+        calling thread.
+        """
+
+        priority = cls._get_priority() if idle else None
+
+        cls.configure(read_rate, write_rate, idle)
+        try:
+            yield
+        finally:
+            cls.configure(0, 0, False)
+
+            if priority is not None:
+                cls._set_priority(priority)
+
+    @classmethod
+    def read(cls: Type[IoThrottle], amount: int) -> None:
+        """
+        Count bytes read, waiting if reading too fast.
+        """
+
+        bucket = cls._read_bucket
+        if bucket is not None:
+            bucket.consume(amount)
+
+    @classmethod
+    def write(cls: Type[IoThrottle], amount: int) -> None:
+        """
+        Count bytes written, waiting if writing too fast.
+        """
+
+        bucket = cls._write_bucket
+        if bucket is not None:
+            bucket.consume(amount)
+
+    @classmethod
+    def _get_priority(cls: Type[IoThrottle]) -> Optional[int]:
+        """
+        Get the I/O priority of the calling thread, or None if that is
+        not supported.
+        """
+
+        priority = cls._ioprio(0)
+        return None if priority is None or priority < 0 else priority
+
+    @classmethod
+    def _ioprio(cls: Type[IoThrottle], index: int,
+                *args: int) -> Optional[int]:
+        """
+        Call ioprio_get (`index` 0) or ioprio_set (1) for the calling
+        thread.
+
+        Return the result, or None if the call is not supported.
+        """
+
+        syscalls = cls._IOPRIO_SYSCALLS.get(machine())
+        if syscalls is None:
+            debug(f'I/O priorities are not supported on {machine()}')
+            return None
+
+        try:
+            # pylint: disable=import-outside-toplevel
+            from ctypes import CDLL
+            result: int = CDLL(None).syscall(syscalls[index],
+                                             cls._IOPRIO_WHO_PROCESS, 0,
+                                             *args)
+            return result
+        except (AttributeError, ImportError, OSError) as err:
+            debug(f'I/O priorities are not supported: {err}')
+            return None
+
+    @classmethod
+    def _set_priority(cls: Type[IoThrottle], priority: int) -> None:
+        """
+        Set the I/O priority of the calling thread, if supported.
+        """
+
+        if cls._ioprio(1, priority) not in [0, None]:
+            debug('Could not set the I/O priority')
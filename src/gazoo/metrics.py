@@ -0,0 +1,348 @@
+"""
+Provide class Metrics.
+"""
+
+from __future__ import annotations
+
+from functools import partial
+from http.server import ThreadingHTTPServer
+from logging import error, info
+from os import replace
+from pathlib import Path
+from threading import Lock, Thread
+from time import time
+from typing import TYPE_CHECKING
+
+from .metrics_request_handler import MetricsRequestHandler
+
+if TYPE_CHECKING:
+    from typing import ClassVar, Dict, Final, List, Optional, Tuple, Type
+
+    from .config import Config
+
+    # metric name, sample suffix, and labels
+    _Key = Tuple[str, str, Tuple[Tuple[str, str], ...]]
+
+
+class Metrics:
+    """
+    Collect metrics about backups, cleanups, verifications, and server
+    output.
+
+    Metrics are kept per process and rendered in the Prometheus text
+    format.  As configured, they are written to a file after every
+    backup, cleanup, and verification (for the textfile collector of the
+    node exporter), and served over HTTP on the loopback interface.
+
+    Durations are summaries (a sum and a count, for rates and averages,
+    plus the most recent value as a `_last` gauge, for alerting on slow
+    backups).
+    """
+
+    _DEFINITIONS: Final[Dict[str, Tuple[str, str]]] = {
+        'gazoo_backup_compression_ratio':
+        ('gauge', 'Size of the last archive relative to the data read'),
+        'gazoo_backup_hold_seconds':
+        ('summary', 'Time the server held saving for a backup'),
+        'gazoo_backup_idle_skips_total':
+        ('counter', 'Scheduled backups skipped because the world was idle'),
+        'gazoo_backup_phase_seconds':
+        ('summary', 'Time spent in each phase of a backup'),
+        'gazoo_backup_query_round_trips':
+        ('summary', 'Save queries sent per backup'),
+        'gazoo_backup_read_bytes': ('summary', 'Bytes read per backup'),
+        'gazoo_backup_seconds': ('summary', 'Total time taken per backup'),
+        'gazoo_backup_written_bytes':
+        ('summary', 'Bytes written per archive backup'),
+        'gazoo_cleanup_seconds': ('summary', 'Time taken per cleanup'),
+        'gazoo_damaged_backups':
+        ('gauge', 'Backups found corrupt or missing by the last verification'),
+        'gazoo_failures_total':
+        ('counter', 'Backups, cleanups, and verifications failed'),
+        'gazoo_last_backup_timestamp_seconds':
+        ('gauge', 'Time the last backup was saved'),
+        'gazoo_server_log_dropped_bytes_total':
+        ('counter', 'Bytes of server output not captured, the buffer full'),
+        'gazoo_server_stdout_bytes_total':
+        ('counter', 'Bytes of server output'),
+        'gazoo_server_stdout_lines_total':
+        ('counter', 'Lines of server output'),
+        'gazoo_skipped_total':
+        ('counter', 'Runs skipped because the previous one was running'),
+        'gazoo_verify_seconds': ('summary', 'Time taken per verification'),
+    }
+    _LISTEN_ADDRESS: Final[str] = '127.0.0.1'
+
+    _file_path: ClassVar[Optional[Path]] = None
+    _lock: ClassVar[Lock] = Lock()
+    _server: ClassVar[Optional[ThreadingHTTPServer]] = None
+    _values: ClassVar[Dict[_Key, float]] = {}
+
+    @classmethod
+    def configure(cls: Type[Metrics], config: Config) -> None:
+        """
+        Set where metrics are exposed (see `Config.metrics_file` and
+        `Config.metrics_port`).
+        """
+
+        metrics_file = config.metrics_file
+        cls._file_path = (Path(metrics_file).resolve()
+                          if metrics_file else None)
+
+        if config.metrics_port > 0 and cls._server is None:
+            cls._server = ThreadingHTTPServer(
+                (cls._LISTEN_ADDRESS, config.metrics_port),
+                partial(MetricsRequestHandler, render=cls.render))
+            Thread(daemon=True,
+                   name='metrics',
+                   target=cls._server.serve_forever).start()
+
+            info(f'Serving metrics on http://{cls._LISTEN_ADDRESS}:' +
+                 f'{config.metrics_port}/metrics')
+
+    @classmethod
+    def flush(cls: Type[Metrics]) -> None:
+        """
+        Write metrics to the metrics file, if there is one.
+
+        The file is replaced atomically, so it is never read half
+        written.  Errors are logged rather than raised, so they never
+        fail a backup.
+        """
+
+        file_path = cls._file_path
+        if file_path is None:
+            return
+
+        temp_path = file_path.with_name(f'.{file_path.name}.tmp')
+
+        try:
+            temp_path.write_text(cls.render())
+            replace(temp_path, file_path)
+        except OSError as err:
+            error(f'Could not write metrics: {err}')
+
+    @classmethod
+    def last_backup(cls: Type[Metrics]) -> Dict[str, float]:
+        """
+        Get the stats of the last backup recorded by this process: its
+        time (`timestamp`), `seconds`, `hold_seconds`, `read_bytes`, and
+        `written_bytes` (the latter for archive backups only).
+
+        Stats that were not recorded are left out.
+        """
+
+        keys = {
+            'timestamp': ('gazoo_last_backup_timestamp_seconds', ''),
+            'seconds': ('gazoo_backup_seconds', '_last'),
+            'hold_seconds': ('gazoo_backup_hold_seconds', '_last'),
+            'read_bytes': ('gazoo_backup_read_bytes', '_last'),
+            'written_bytes': ('gazoo_backup_written_bytes', '_last'),
+        }
+
+        with cls._lock:
+            return {
+                stat: cls._values[cls._key(name, suffix, {})]
+                for (stat, (name, suffix)) in keys.items()
+                if cls._key(name, suffix, {}) in cls._values
+            }
+
+    @classmethod
+    def record_archive(cls: Type[Metrics], read_bytes: int,
+                       written_bytes: Optional[int]) -> None:
+        """
+        Record the bytes read for a backup and, for archive backups, the
+        bytes written.
+        """
+
+        with cls._lock:
+            cls._observe('gazoo_backup_read_bytes', read_bytes)
+
+            if written_bytes is not None:
+                cls._observe('gazoo_backup_written_bytes', written_bytes)
+                cls._set('gazoo_backup_compression_ratio',
+                         written_bytes / read_bytes if read_bytes else 1.0)
+
+    @classmethod
+    def record_backup(cls: Type[Metrics], queries: int,
+                      phases: Dict[str, float]) -> None:
+        """
+        Record a saved backup, with the number of save queries sent and
+        the time taken by each phase (in seconds).
+
+        Saving is held during the `query` and `snapshot` phases.
+        """
+
+        with cls._lock:
+            cls._observe('gazoo_backup_query_round_trips', queries)
+            cls._observe('gazoo_backup_hold_seconds',
+                         phases['query'] + phases['snapshot'])
+            cls._observe('gazoo_backup_seconds', sum(phases.values()))
+            cls._set('gazoo_last_backup_timestamp_seconds', time())
+
+            for (phase, seconds) in phases.items():
+                cls._observe('gazoo_backup_phase_seconds', seconds,
+                             phase=phase)
+
+        cls.flush()
+
+    @classmethod
+    def record_cleanup(cls: Type[Metrics], seconds: float) -> None:
+        """
+        Record a finished cleanup and the time it took.
+        """
+
+        with cls._lock:
+            cls._observe('gazoo_cleanup_seconds', seconds)
+
+        cls.flush()
+
+    @classmethod
+    def record_failure(cls: Type[Metrics], job: str) -> None:
+        """
+        Record a failed backup, cleanup, or verification.
+        """
+
+        with cls._lock:
+            cls._inc('gazoo_failures_total', job=job)
+
+        cls.flush()
+
+    @classmethod
+    def record_idle_skip(cls: Type[Metrics]) -> None:
+        """
+        Record a scheduled backup skipped because the world was idle (see
+        `WorldActivity`).
+        """
+
+        with cls._lock:
+            cls._inc('gazoo_backup_idle_skips_total')
+
+        cls.flush()
+
+    @classmethod
+    def record_log_drop(cls: Type[Metrics], dropped: int) -> None:
+        """
+        Record bytes of server output dropped because the buffer of the
+        server log was full (see `ServerLog`).
+        """
+
+        with cls._lock:
+            cls._inc('gazoo_server_log_dropped_bytes_total', dropped)
+
+        cls.flush()
+
+    @classmethod
+    def record_output(cls: Type[Metrics], chunk: bytes) -> None:
+        """
+        Record a chunk of server output.
+
+        Only newlines are counted; chunks are not split into lines.
+        """
+
+        with cls._lock:
+            cls._inc('gazoo_server_stdout_bytes_total', len(chunk))
+            cls._inc('gazoo_server_stdout_lines_total', chunk.count(b'\n'))
+
+    @classmethod
+    def record_skip(cls: Type[Metrics], job: str) -> None:
+        """
+        Record a run skipped while the previous one is still running.
+        """
+
+        with cls._lock:
+            cls._inc('gazoo_skipped_total', job=job)
+
+        cls.flush()
+
+    @classmethod
+    def record_verify(cls: Type[Metrics], seconds: float,
+                      damaged: int) -> None:
+        """
+        Record a finished verification, the time it took, and the number
+        of backups found corrupt or missing.
+        """
+
+        with cls._lock:
+            cls._observe('gazoo_verify_seconds', seconds)
+            cls._set('gazoo_damaged_backups', damaged)
+
+        cls.flush()
+
+    @classmethod
+    def render(cls: Type[Metrics]) -> str:
+        """
+        Get all metrics in the Prometheus text format.
+        """
+
+        with cls._lock:
+            values = sorted(cls._values.items())
+
+        lines: List[str] = []
+
+        for (name, (kind, description)) in cls._DEFINITIONS.items():
+            samples = [(suffix, labels, value)
+                       for ((sample_name, suffix, labels), value) in values
+                       if sample_name == name]
+
+            if not samples and kind != 'summary':
+                samples = [('', (), 0.0)]
+
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(f'{name}{suffix}{cls._labels(labels)} {value:.15g}'
+                         for (suffix, labels, value) in samples
+                         if suffix != '_last')
+
+            if kind == 'summary':
+                lines.append(f'# HELP {name}_last {description} (last)')
+                lines.append(f'# TYPE {name}_last gauge')
+                lines.extend(
+                    f'{name}{suffix}{cls._labels(labels)} {value:.15g}'
+                    for (suffix, labels, value) in samples
+                    if suffix == '_last')
+
+        return '\n'.join(lines) + '\n'
+
+    @classmethod
+    def reset(cls: Type[Metrics]) -> None:
+        """
+        Forget all recorded values.
+        """
+
+        with cls._lock:
+            cls._values.clear()
+
+    @classmethod
+    def _inc(cls: Type[Metrics],
+             name: str,
+             value: float = 1,
+             suffix: str = '',
+             **labels: str) -> None:
+        key = cls._key(name, suffix, labels)
+        cls._values[key] = cls._values.get(key, 0.0) + value
+
+    @classmethod
+    def _key(cls: Type[Metrics], name: str, suffix: str,
+             labels: Dict[str, str]) -> _Key:
+        return (name, suffix, tuple(sorted(labels.items())))
+
+    @classmethod
+    def _labels(cls: Type[Metrics],
+                labels: Tuple[Tuple[str, str], ...]) -> str:
+        if not labels:
+            return ''
+
+        return '{' + ','.join(f'{name}="{value}"'
+                              for (name, value) in labels) + '}'
+
+    @classmethod
+    def _observe(cls: Type[Metrics], name: str, value: float,
+                 **labels: str) -> None:
+        cls._inc(name, 1, '_count', **labels)
+        cls._inc(name, value, '_sum', **labels)
+        cls._values[cls._key(name, '_last', labels)] = value
+
+    @classmethod
+    def _set(cls: Type[Metrics], name: str, value: float) -> None:
+        cls._values[cls._key(name, '', {})] = value
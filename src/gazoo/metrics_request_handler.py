@@ -0,0 +1,57 @@
+"""
+Provide class MetricsRequestHandler.
+"""
+
+from __future__ import annotations
+
+from http.server import BaseHTTPRequestHandler
+from logging import debug
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Final
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serve metrics in the Prometheus text format at `/metrics`.
+
+    Metrics are rendered by the `render` callable given when the handler
+    is made (see `Metrics.configure`).
+    """
+
+    _CONTENT_TYPE: Final[str] = 'text/plain; version=0.0.4; charset=utf-8'
+    _PATH: Final[str] = '/metrics'
+
+    def __init__(self: MetricsRequestHandler, *args: Any,
+                 render: Callable[[], str], **kwargs: Any) -> None:
+        # needed by `do_GET`, which is called before `__init__` returns
+        self._render: Callable[[], str] = render
+
+        super().__init__(*args, **kwargs)
+
+    def do_GET(  # pylint: disable=invalid-name
+            self: MetricsRequestHandler) -> None:
+        """
+        Respond with the metrics, or 404 for any other path.
+        """
+
+        if self.path.split('?')[0] != self._PATH:
+            self.send_error(404)
+            return
+
+        body = self._render().encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', self._CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(  # pylint: disable=redefined-builtin
+            self: MetricsRequestHandler, format: str, *args: Any) -> None:
+        """
+        Log requests at debug level instead of to stderr.
+        """
+
+        debug(f'metrics: {format % args}')
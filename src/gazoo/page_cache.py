@@ -0,0 +1,182 @@
+"""
+Provide class PageCache.
+"""
+
+from __future__ import annotations
+
+from mmap import ACCESS_COPY, PAGESIZE, mmap
+from os import fsync
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import BinaryIO, ClassVar, Dict, List, Optional, Tuple, Type
+
+
+class PageCache:
+    """
+    Keep backups from pushing the server's data out of the page cache.
+
+    Reading a whole world and writing an archive of it would otherwise
+    fill the page cache with pages that are never read again, evicting
+    the ones the server reads all the time.  Instead, the kernel is told
+    (`posix_fadvise`) that sources are read sequentially, and once a
+    backup is written, that its pages, and the pages of the live world
+    files that were not cached before they were copied or read (found
+    with `mincore`), are not needed.  Pages the server had cached are
+    left alone.
+
+    Hints are on unless turned off (see `configure`), and silently
+    skipped where they are not supported.
+    """
+
+    _enabled: ClassVar[bool] = True
+
+    @classmethod
+    def configure(cls: Type[PageCache], enabled: bool) -> None:
+        """
+        Turn hints on or off for this process.
+
+        This is also called by the initializer of compression processes.
+        """
+
+        cls._enabled = enabled
+
+    @classmethod
+    def advise_sequential(cls: Type[PageCache], file: BinaryIO,
+                          length: int) -> None:
+        """
+        Tell the kernel the first `length` bytes of a file will be read
+        sequentially (so it reads ahead further).
+        """
+
+        if cls._enabled:
+            cls._advise(file, 0, length, 'sequential')
+
+    @classmethod
+    def cached_pages(
+            cls: Type[PageCache],
+            files: List[Tuple[Path, int]]) -> Dict[Path, bytes]:
+        """
+        Get which pages of files (given as tuples of the path and the
+        length to read) are in the page cache (see `resident_pages`),
+        for `drop_uncached` once they are read.
+
+        Files for which that cannot be found out are left out.
+        """
+
+        if not cls._enabled:
+            return {}
+
+        cached: Dict[Path, bytes] = {}
+        file: BinaryIO
+        for (path, length) in files:
+            try:
+                with path.open(mode='rb') as file:
+                    resident = cls.resident_pages(file, length)
+            except OSError:
+                continue
+
+            if resident is not None:
+                cached[path] = resident
+
+        return cached
+
+    @classmethod
+    def drop_uncached(cls: Type[PageCache], cached: Dict[Path,
+                                                         bytes]) -> None:
+        """
+        Drop the pages of files that were not cached before they were
+        read (see `cached_pages`).
+        """
+
+        file: BinaryIO
+        for (path, resident) in cached.items():
+            try:
+                with path.open(mode='rb') as file:
+                    start: Optional[int] = None
+                    for (index, page) in enumerate([*resident, 1]):
+                        if page & 1 == 0 and start is None:
+                            start = index
+                        elif page & 1 != 0 and start is not None:
+                            cls._advise(file, start * PAGESIZE,
+                                        (index - start) * PAGESIZE,
+                                        'dontneed')
+                            start = None
+            except OSError:
+                continue
+
+    @classmethod
+    def drop_written(cls: Type[PageCache], path: Path) -> None:
+        """
+        Write a file out to disk and drop its pages from the page cache.
+
+        Dirty pages cannot be dropped, so the file is synced first.
+        """
+
+        if not cls._enabled:
+            return
+
+        file: BinaryIO
+        with path.open(mode='rb') as file:
+            fsync(file.fileno())
+            cls._advise(file, 0, 0, 'dontneed')
+
+    @classmethod
+    def resident_pages(cls: Type[PageCache], file: BinaryIO,
+                       length: int) -> Optional[bytes]:
+        """
+        Get which pages of the first `length` bytes of a file are in the
+        page cache: a byte per page, with the lowest bit set if cached.
+
+        Return None if that cannot be found out.
+        """
+
+        if length <= 0:
+            return b''
+
+        try:
+            # pylint: disable=import-outside-toplevel
+            from ctypes import (CDLL, addressof, c_char, c_size_t, c_void_p,
+                                create_string_buffer)
+            mincore = CDLL(None).mincore
+        except (AttributeError, ImportError, OSError):
+            return None
+
+        pages = create_string_buffer((length + PAGESIZE - 1) // PAGESIZE)
+
+        try:
+            # a private mapping, since ctypes needs a writable buffer
+            with mmap(file.fileno(), length, access=ACCESS_COPY) as file_map:
+                anchor = c_char.from_buffer(file_map)
+                try:
+                    result = mincore(c_void_p(addressof(anchor)),
+                                     c_size_t(length), pages)
+                finally:
+                    del anchor
+        except (OSError, ValueError):
+            return None
+
+        return pages.raw if result == 0 else None
+
+    @classmethod
+    def _advise(cls: Type[PageCache], file: BinaryIO, offset: int,
+                length: int, advice: str) -> None:
+        """
+        Give the kernel advice (`sequential` or `dontneed`) about a range
+        of a file, if supported.
+        """
+
+        try:
+            # pylint: disable=import-outside-toplevel
+            from os import (POSIX_FADV_DONTNEED, POSIX_FADV_SEQUENTIAL,
+                            posix_fadvise)
+        except ImportError:  # not available on macOS or Windows
+            return
+
+        try:
+            posix_fadvise(
+                file.fileno(), offset, length, POSIX_FADV_SEQUENTIAL
+                if advice == 'sequential' else POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
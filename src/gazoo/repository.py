@@ -0,0 +1,277 @@
+"""
+Provide class Repository.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+from json import dump, load
+from logging import error
+from os import link, replace, scandir
+from pathlib import Path
+from shutil import copyfile
+from threading import Lock
+from typing import TYPE_CHECKING
+
+from .io_throttle import IoThrottle
+
+if TYPE_CHECKING:
+    from typing import (Any, BinaryIO, ClassVar, Dict, Final, List, Set,
+                        Tuple, Type)
+
+
+class Repository:
+    """
+    Store backups as content-addressed files plus a manifest per backup.
+
+    Every file is stored once as an object named after the SHA-256 hash
+    of its contents, so files that did not change between backups (like
+    the `.ldb` files of LevelDB worlds, which are never modified once
+    written) take no additional space and are not written again.  Each
+    backup is a small JSON manifest that lists the name, length, and
+    hash of its files.
+
+    One repository is shared per directory; use `for_dir` to get it.
+    """
+
+    MANIFEST_SUFFIX: Final[str] = '.json'
+    """
+    File name suffix for manifests
+    """
+
+    _CHUNK_SIZE: Final[int] = 1024 * 1024  # 1 MiB
+    _MANIFEST_VERSION: Final[int] = 1
+    _OBJECTS_DIR_NAME: Final[str] = 'objects'
+
+    _repositories: ClassVar[Dict[Path, Repository]] = {}
+    _repositories_lock: ClassVar[Lock] = Lock()
+
+    @classmethod
+    def for_dir(cls: Type[Repository], dir_path: Path) -> Repository:
+        """
+        Get the shared repository for a directory.
+        """
+
+        with cls._repositories_lock:
+            repository = cls._repositories.get(dir_path)
+
+            if repository is None:
+                repository = cls(dir_path)
+                cls._repositories[dir_path] = repository
+
+            return repository
+
+    @classmethod
+    def read_manifest(cls: Type[Repository],
+                      manifest_path: Path) -> Dict[str, Any]:
+        """
+        Read and check a manifest.
+        """
+
+        with manifest_path.open() as manifest_file:
+            manifest: Dict[str, Any] = load(manifest_file)
+
+        if manifest.get('version') != cls._MANIFEST_VERSION:
+            raise ValueError(f'Unsupported manifest: {manifest_path}')
+
+        return manifest
+
+    def __init__(self: Repository, dir_path: Path) -> None:
+        self._dir_path: Path = dir_path
+        self._lock: Lock = Lock()
+        # file name -> (length, mtime, inode, hash) of last stored version
+        self._hashes: Dict[str, Tuple[int, int, int, str]] = {}
+
+    def object_path(self: Repository, digest: str) -> Path:
+        """
+        Get the path to the object with a hash.
+        """
+
+        return self._dir_path.joinpath(self._OBJECTS_DIR_NAME, digest[:2],
+                                       digest)
+
+    def prune(self: Repository, manifests_dir_path: Path) -> None:
+        """
+        Delete objects that are not referenced by any manifest in a
+        directory.
+
+        Manifests are listed while holding the lock `store` holds, so
+        the objects of a backup stored meanwhile are always kept.  If a
+        manifest cannot be read, nothing is deleted.
+        """
+
+        objects_dir_path = self._dir_path.joinpath(self._OBJECTS_DIR_NAME)
+        if not objects_dir_path.is_dir():
+            return
+
+        with self._lock:
+            referenced: Set[str] = set()
+            for manifest_path in manifests_dir_path.glob(
+                    f'*{self.MANIFEST_SUFFIX}'):
+                try:
+                    manifest = self.read_manifest(manifest_path)
+                except FileNotFoundError:
+                    continue
+                except (OSError, ValueError) as err:
+                    error(f'Not pruning the repository: {err}')
+                    return
+
+                referenced.update(file['sha256']
+                                  for file in manifest['files'])
+
+            with scandir(objects_dir_path) as prefix_itr:
+                for prefix_entry in prefix_itr:
+                    kept = 0
+                    with scandir(prefix_entry.path) as itr:
+                        for entry in itr:
+                            if entry.name in referenced:
+                                kept += 1
+                            else:
+                                Path(entry.path).unlink()
+
+                    if kept == 0:
+                        Path(prefix_entry.path).rmdir()
+
+    def restore(self: Repository, manifest_path: Path,
+                worlds_dir_path: Path) -> None:
+        """
+        Copy the files listed in a manifest into the worlds directory.
+
+        Files are copied in parallel by a pool of threads.
+        """
+
+        manifest = self.read_manifest(manifest_path)
+
+        for file in manifest['files']:
+            worlds_dir_path.joinpath(file['name']).parent.mkdir(
+                parents=True, exist_ok=True)
+
+        with ThreadPoolExecutor() as executor:
+            futures = [
+                executor.submit(copyfile, self.object_path(file['sha256']),
+                                worlds_dir_path.joinpath(file['name']))
+                for file in manifest['files']
+            ]
+
+            for future in futures:
+                future.result()
+
+    def store(self: Repository, files: List[Tuple[str, Path, int]],
+              world_dir_name: str, manifest_path: Path,
+              temp_dir_path: Path) -> int:
+        """
+        Store files and write a manifest listing them.
+
+        Each file is given as a tuple of its name (relative to the
+        worlds directory), the path to read it from, and its length.
+        Only objects that are not in the repository yet are written.
+        Source files should not be modified afterwards, because they may
+        be hard linked into the repository.
+
+        The manifest is written in `temp_dir_path` and then moved to
+        `manifest_path`, so it only shows up once it is complete.
+
+        Return the number of files in the manifest.
+        """
+
+        with self._lock:
+            manifest_files: List[Dict[str, Any]] = []
+            for (name, source_path, length) in files:
+                try:
+                    digest = self._hash(name, source_path, length)
+
+                    object_path = self.object_path(digest)
+                    if not object_path.exists():
+                        self._write_object(source_path, length, object_path)
+                except (FileNotFoundError, ValueError) as err:
+                    error(err)
+                    continue
+
+                manifest_files.append({
+                    'name': name,
+                    'length': length,
+                    'sha256': digest,
+                })
+
+            temp_manifest_path = temp_dir_path.joinpath(manifest_path.name)
+            with temp_manifest_path.open(mode='w') as manifest_file:
+                dump(
+                    {
+                        'version': self._MANIFEST_VERSION,
+                        'world': world_dir_name,
+                        'files': manifest_files,
+                    }, manifest_file)
+
+            replace(temp_manifest_path, manifest_path)
+
+            return len(manifest_files)
+
+    def _hash(self: Repository, name: str, source_path: Path,
+              length: int) -> str:
+        """
+        Hash the first `length` bytes of a file.
+
+        The hash from the previous backup is reused if the file is the
+        same one (same inode and modification time) as back then.
+        """
+
+        stat_result = source_path.stat()
+        key = (length, stat_result.st_mtime_ns, stat_result.st_ino)
+
+        cached = self._hashes.get(name)
+        if cached is not None and cached[:3] == key:
+            return cached[3]
+
+        hasher = sha256()
+        remaining = length
+
+        source_file: BinaryIO
+        with source_path.open(mode='rb') as source_file:
+            while remaining > 0:
+                chunk = source_file.read(min(remaining, self._CHUNK_SIZE))
+                if not chunk:
+                    break
+                IoThrottle.read(len(chunk))
+                hasher.update(chunk)
+                remaining -= len(chunk)
+
+        if remaining > 0:
+            raise ValueError(f'File shorter than {length} bytes: ' +
+                             str(source_path))
+
+        digest = hasher.hexdigest()
+        self._hashes[name] = (*key, digest)
+
+        return digest
+
+    def _write_object(self: Repository, source_path: Path, length: int,
+                      object_path: Path) -> None:
+        """
+        Write an object, linking to the source file if possible.
+        """
+
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_object_path = object_path.with_name(object_path.name + '.tmp')
+        temp_object_path.unlink(missing_ok=True)
+
+        try:
+            if source_path.stat().st_size != length:
+                raise OSError('Source file needs truncating')
+            link(source_path, temp_object_path)
+        except OSError:
+            source_file: BinaryIO
+            temp_object_file: BinaryIO
+            with source_path.open(mode='rb') as source_file, \
+                    temp_object_path.open(mode='wb') as temp_object_file:
+                remaining = length
+                while remaining > 0:
+                    chunk = source_file.read(min(remaining,
+                                                 self._CHUNK_SIZE))
+                    if not chunk:
+                        break
+                    IoThrottle.write(len(chunk))
+                    temp_object_file.write(chunk)
+                    remaining -= len(chunk)
+
+        replace(temp_object_path, object_path)
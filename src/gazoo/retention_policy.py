@@ -0,0 +1,91 @@
+"""
+Provide class RetentionPolicy.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import (Any, Callable, Dict, Final, Hashable, Iterable, List,
+                        Optional, Set, Tuple, Type)
+
+    from .config import Config
+
+
+class RetentionPolicy:
+    """
+    Decide which backups to keep, grandfather-father-son style.
+
+    The most recent backup of each of the last `hourly` hours (that have
+    backups) is kept, and likewise for days, (ISO) weeks, and months.
+    A backup may count for several periods at once.  The most recent
+    backup is always kept.
+    """
+
+    _PERIODS: Final[List[Tuple[str, Callable[[datetime], Hashable]]]] = [
+        ('hourly', lambda time: (time.date(), time.hour)),
+        ('daily', lambda time: time.date()),
+        ('weekly', lambda time: time.isocalendar()[:2]),
+        ('monthly', lambda time: (time.year, time.month)),
+    ]
+
+    @classmethod
+    def from_config(cls: Type[RetentionPolicy],
+                    config: Config) -> RetentionPolicy:
+        """
+        Make a policy with the numbers of backups to keep from config.
+        """
+
+        policy: RetentionPolicy = cls(hourly=config.keep_hourly,
+                                      daily=config.keep_daily,
+                                      weekly=config.keep_weekly,
+                                      monthly=config.keep_monthly)
+
+        return policy
+
+    def __init__(self: RetentionPolicy, hourly: int, daily: int, weekly: int,
+                 monthly: int) -> None:
+        self._limits: Dict[str, int] = {
+            'hourly': hourly,
+            'daily': daily,
+            'weekly': weekly,
+            'monthly': monthly,
+        }
+
+    def keep(self: RetentionPolicy,
+             backups: Iterable[Dict[str, Any]]) -> Set[str]:
+        """
+        Get the names of the backups to keep.
+
+        Backups (catalog records, see `Catalog`) must be sorted from the
+        most recent one back.  They are planned in a single pass: a
+        backup is kept if it is the first one seen in a period, and
+        fewer periods of that kind than the limit have been seen.
+        """
+
+        kept: Set[str] = set()
+        counts: Dict[str, int] = {name: 0 for (name, _key) in self._PERIODS}
+        last_keys: Dict[str, Optional[Hashable]] = {
+            name: None
+            for (name, _key) in self._PERIODS
+        }
+
+        for backup in backups:
+            if not kept:
+                kept.add(backup['name'])
+
+            time = datetime.fromtimestamp(backup['created'])
+
+            for (name, key_of) in self._PERIODS:
+                key = key_of(time)
+                if key == last_keys[name]:
+                    continue
+
+                last_keys[name] = key
+                if counts[name] < self._limits[name]:
+                    counts[name] += 1
+                    kept.add(backup['name'])
+
+        return kept
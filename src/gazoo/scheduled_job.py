@@ -0,0 +1,120 @@
+"""
+Provide class ScheduledJob.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from math import floor
+from random import uniform
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Final, List, Optional, Type
+
+    from .config import Config
+    from .cron_expression import CronExpression
+
+
+class ScheduledJob:
+    """
+    Describe when and how a job runs.
+
+    A job runs either every `interval` seconds or whenever `cron`
+    matches.  Each run is delayed by a random amount of up to `jitter`
+    seconds, so instances sharing a host do not all start at once.
+
+    A run is missed if it starts more than `misfire_grace` seconds late
+    (e.g. the host was suspended or a higher priority job was running).
+    The misfire policy decides what happens then: `coalesce` runs the
+    job once for all missed runs, `skip` waits for the next run.  Either
+    way, missed runs never pile up.
+
+    Lower `priority` values run first.  The target is a function without
+    arguments.
+    """
+
+    MISFIRE_POLICIES: Final[List[str]] = ['coalesce', 'skip']
+    """
+    Valid misfire policies
+    """
+
+    def __init__(self: ScheduledJob,
+                 name: str,
+                 target: Callable[[], Any],
+                 priority: int,
+                 interval: float,
+                 cron: Optional[CronExpression] = None,
+                 jitter: float = 0.0,
+                 misfire_policy: str = 'coalesce',
+                 misfire_grace: float = 0.0) -> None:
+        if misfire_policy not in self.MISFIRE_POLICIES:
+            raise ValueError(f'Unknown misfire policy: {misfire_policy}')
+
+        self._anchor: Optional[float] = None
+        self.cron: Optional[CronExpression] = cron
+        self.interval: float = interval
+        self.jitter: float = jitter
+        self.misfire_grace: float = misfire_grace
+        self.misfire_policy: str = misfire_policy
+        self.name: str = name
+        self.priority: int = priority
+        self.target: Callable[[], Any] = target
+
+    @classmethod
+    def from_config(cls: Type[ScheduledJob],
+                    name: str,
+                    target: Callable[[], Any],
+                    priority: int,
+                    interval: float,
+                    cron: Optional[CronExpression],
+                    config: Config) -> ScheduledJob:
+        """
+        Make a job with the jitter and misfire settings from the config.
+        """
+
+        job: ScheduledJob = cls(name,
+                                target,
+                                priority,
+                                interval,
+                                cron=cron,
+                                jitter=config.schedule_jitter,
+                                misfire_policy=config.misfire_policy,
+                                misfire_grace=config.misfire_grace)
+
+        return job
+
+    def is_missed(self: ScheduledJob, run_at: float, now: float) -> bool:
+        """
+        Check if a run that was due at `run_at` is missed at `now`.
+        """
+
+        return now - run_at > self.misfire_grace
+
+    def next_run(self: ScheduledJob, after: float) -> float:
+        """
+        Get the time (as a timestamp) of the first run after `after`.
+
+        The time includes jitter.  Interval runs stay on the grid that
+        started with the first call, so jitter does not accumulate.
+        """
+
+        if self.cron is not None:
+            nominal = self.cron.next_after(
+                datetime.fromtimestamp(after)).timestamp()
+        else:
+            if self._anchor is None:
+                self._anchor = after
+
+            intervals = floor((after - self._anchor) / self.interval) + 1
+            nominal = self._anchor + intervals * self.interval
+
+        return nominal + uniform(0.0, self.jitter)
+
+    def should_run(self: ScheduledJob, run_at: float, now: float) -> bool:
+        """
+        Check if a run that was due at `run_at` should start at `now`.
+        """
+
+        return (not self.is_missed(run_at, now)
+                or self.misfire_policy == 'coalesce')
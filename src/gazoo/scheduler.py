@@ -0,0 +1,154 @@
+"""
+Provide class Scheduler.
+"""
+
+from __future__ import annotations
+
+from heapq import heapify, heappush
+from itertools import count
+from logging import exception, info
+from threading import Condition, Thread, current_thread
+from time import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+    from .scheduled_job import ScheduledJob
+
+    # time, job priority, insertion order, and job
+    _Run = Tuple[float, int, int, ScheduledJob]
+
+
+class Scheduler:
+    """
+    Run scheduled jobs from a single thread.
+
+    Upcoming runs are kept in a priority queue ordered by time, then job
+    priority.  Each run starts in a thread of its own (named after the
+    job) so long jobs do not hold up the schedule.  While a job is
+    running, due runs of lower priority jobs wait for it to finish;
+    other due runs start meanwhile.
+    """
+
+    def __init__(self: Scheduler) -> None:
+        self._condition: Condition = Condition()
+        self._counter: Iterator[int] = count()
+        self._queue: List[_Run] = []
+        self._running: Dict[Thread, ScheduledJob] = {}
+        self._stopped: bool = False
+        self._thread: Thread = Thread(name='scheduler', target=self._run)
+
+    def add(self: Scheduler, job: ScheduledJob) -> None:
+        """
+        Schedule a job, starting with its first run from now.
+        """
+
+        with self._condition:
+            self._push(job.next_run(time()), job)
+            self._condition.notify_all()
+
+    def run_now(self: Scheduler, job: ScheduledJob) -> Any:
+        """
+        Run a job once, in the calling thread, as soon as no higher
+        priority job is running (e.g. a backup requested through the
+        control socket).
+
+        Due runs of lower priority jobs wait for it, as for a scheduled
+        run.  Return what the job returns; exceptions are raised to the
+        caller.
+        """
+
+        thread = current_thread()
+
+        with self._condition:
+            self._condition.wait_for(lambda: not self._blocked(job))
+            self._running[thread] = job
+
+        try:
+            return job.target()
+        finally:
+            with self._condition:
+                self._running.pop(thread, None)
+                self._condition.notify_all()
+
+    def start(self: Scheduler) -> None:
+        """
+        Start the scheduler thread.
+        """
+
+        self._thread.start()
+
+    def stop(self: Scheduler) -> None:
+        """
+        Stop scheduling runs and wait for running jobs to finish.
+        """
+
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+        if self._thread.is_alive():
+            self._thread.join()
+
+        for thread in list(self._running):
+            thread.join()
+
+    def _blocked(self: Scheduler, job: ScheduledJob) -> bool:
+        """
+        Check if a job has to wait for a higher priority job.
+        """
+
+        return any(running.priority < job.priority
+                   for running in self._running.values())
+
+    def _next_due(self: Scheduler, now: float) -> Optional[_Run]:
+        """
+        Get the earliest due run of a job that is not blocked, if any.
+        """
+
+        return min((run for run in self._queue
+                    if run[0] <= now and not self._blocked(run[3])),
+                   default=None)
+
+    def _push(self: Scheduler, run_at: float, job: ScheduledJob) -> None:
+        heappush(self._queue, (run_at, job.priority, next(self._counter), job))
+
+    def _run(self: Scheduler) -> None:
+        with self._condition:
+            while not self._stopped:
+                now = time()
+                due = self._next_due(now)
+
+                if due is None:
+                    # blocked runs are woken up when the blocking job ends
+                    upcoming = [run[0] for run in self._queue if run[0] > now]
+                    self._condition.wait(
+                        min(upcoming) - now if upcoming else None)
+                    continue
+
+                (run_at, _priority, _count, job) = due
+                self._queue.remove(due)
+                heapify(self._queue)
+                self._push(job.next_run(max(run_at, now)), job)
+
+                if not job.should_run(run_at, now):
+                    info(f'{job.name} missed by {now - run_at:.0f} ' +
+                         'seconds; skipping')
+                    continue
+
+                thread = Thread(name=job.name,
+                                target=self._run_job,
+                                args=[job])
+                self._running[thread] = job
+                thread.start()
+
+    def _run_job(self: Scheduler, job: ScheduledJob) -> None:
+        try:
+            job.target()
+        except Exception as error:  # pylint: disable=broad-except
+            exception(f'{job.name} failed', exc_info=error)
+        finally:
+            with self._condition:
+                self._running.pop(current_thread(), None)
+                self._condition.notify_all()
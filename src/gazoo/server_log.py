@@ -0,0 +1,416 @@
+"""
+Provide class ServerLog.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from gzip import compress, decompress
+from json import dumps, loads
+from logging import error, warning
+from os import replace
+from threading import Condition, Thread
+from time import time
+from typing import TYPE_CHECKING
+
+from .metrics import Metrics
+from .util import Util
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import (BinaryIO, Dict, Final, Iterator, List, Optional,
+                        Pattern, Tuple, Type)
+
+    from .config import Config
+
+    # offset and length of a gzip member, and times of its first and
+    # last lines
+    _Block = Tuple[int, int, str, str]
+    # stream name, time received, and data
+    _Chunk = Tuple[str, float, bytes]
+
+
+class ServerLog:
+    """
+    Capture server output in rotating, compressed log segments, to be
+    searched later (see `grep`).
+
+    Chunks of output are handed over (see `write`) by the threads or
+    coroutines forwarding the server streams, which never wait for the
+    disk: chunks are buffered in memory, and written by a thread of
+    their own.  If the buffer is full (e.g. while the disk stalls),
+    chunks are dropped and counted (see `Metrics.record_log_drop`).
+
+    Each line is prefixed with the (local) time it was received and its
+    stream, e.g. `2024-01-31 18:00:00.000 stdout `.  The current segment
+    is plain text.  Once it is `rotate_size` bytes long or
+    `rotate_interval` seconds old, it is closed and compressed into gzip
+    members of about `_BLOCK_SIZE` bytes (of lines) each, so it can
+    still be read with `zcat`.  An index of the times of the first and
+    last line of each member is kept next to it, so searching a time
+    range only decompresses the members in range.  Closed segments
+    older than `keep_days` days are deleted.
+    """
+
+    _BLOCK_SIZE: Final[int] = 256 * 1024  # 256 KiB
+    _COMPRESS_LEVEL: Final[int] = 6
+    _FLUSH_INTERVAL: Final[float] = 1.0
+    _GZIP_SUFFIX: Final[str] = '.gz'
+    _INDEX_SUFFIX: Final[str] = '.idx'
+    _MAX_BUFFERED: Final[int] = 8 * 1024 * 1024  # 8 MiB
+    _MIB: Final[int] = 1024 * 1024
+    _NAME_FORMAT: Final[str] = 'server-%Y%m%d-%H%M%S-%f.log'
+    _NAME_PATTERN: Final[str] = 'server-*.log'
+    _SECONDS_PER_DAY: Final[int] = 24 * 60 * 60
+    _TIME_FORMAT: Final[str] = '%Y-%m-%d %H:%M:%S.%f'
+    _TIME_LENGTH: Final[int] = len('2024-01-31 18:00:00.000')
+
+    @classmethod
+    def compress_segment(cls: Type[ServerLog], segment_path: Path) -> None:
+        """
+        Compress a closed segment into gzip members, index them, and
+        remove the plain segment.
+        """
+
+        gzip_path = cls._gzip_path(segment_path)
+        temp_path = gzip_path.with_name(f'.{gzip_path.name}.tmp')
+        index: List[_Block] = []
+
+        with segment_path.open('rb') as source, temp_path.open('wb') as dest:
+            lines: List[bytes] = []
+            length = 0
+
+            for line in source:
+                lines.append(line)
+                length += len(line)
+
+                if length >= cls._BLOCK_SIZE:
+                    cls._write_block(dest, lines, index)
+                    lines = []
+                    length = 0
+
+            if lines:
+                cls._write_block(dest, lines, index)
+
+        # the index is replaced first, so it always matches the segment
+        cls._index_path(segment_path).write_text(dumps(index))
+        replace(temp_path, gzip_path)
+        segment_path.unlink()
+
+    @classmethod
+    def from_config(cls: Type[ServerLog], config: Config) -> ServerLog:
+        """
+        Make a server log in the logs directory, rotated and kept as
+        configured.
+        """
+
+        return cls(Util.logs_dir_path(),
+                   rotate_size=int(config.log_rotate_size * cls._MIB),
+                   rotate_interval=config.log_rotate_interval,
+                   keep_days=config.log_keep_days)
+
+    @classmethod
+    def grep(cls: Type[ServerLog],
+             logs_dir_path: Path,
+             pattern: Pattern[bytes],
+             since: Optional[datetime] = None,
+             until: Optional[datetime] = None) -> Iterator[bytes]:
+        """
+        Find the captured lines (with their prefix and line ending) that
+        match a pattern, oldest first, optionally only those received in
+        a time range.
+
+        Compressed segments are only decompressed where their index
+        shows lines in range.
+        """
+
+        lower = None if since is None else cls._format_time(since).encode()
+        upper = None if until is None else cls._format_time(until).encode()
+
+        segment_names = sorted({
+            path.name[:-len(cls._GZIP_SUFFIX)]
+            if path.name.endswith(cls._GZIP_SUFFIX) else path.name
+            for path in logs_dir_path.glob(f'{cls._NAME_PATTERN}*')
+            if not path.name.endswith(cls._INDEX_SUFFIX)
+        })
+
+        for segment_name in segment_names:
+            segment_path = logs_dir_path.joinpath(segment_name)
+
+            for data in cls._read_blocks(segment_path, lower, upper):
+                # only `\n` ends lines (server output may hold `\r`)
+                for line in data.split(b'\n'):
+                    if not line:
+                        continue
+
+                    line += b'\n'
+                    line_time = line[:cls._TIME_LENGTH]
+
+                    if ((lower is None or line_time >= lower)
+                            and (upper is None or line_time <= upper)
+                            and pattern.search(line)):
+                        yield line
+
+    def __init__(self: ServerLog, logs_dir_path: Path, rotate_size: int,
+                 rotate_interval: float, keep_days: int) -> None:
+        self._buffered: int = 0
+        self._chunks: List[_Chunk] = []
+        self._dropped: int = 0
+        self._failed: bool = False
+        self._keep_days: int = keep_days
+        self._logs_dir_path: Path = logs_dir_path
+        self._pending: Dict[str, bytes] = {}
+        self._rotate_interval: float = rotate_interval
+        self._rotate_size: int = rotate_size
+        self._segment: Optional[BinaryIO] = None
+        self._segment_path: Optional[Path] = None
+        self._segment_size: int = 0
+        self._segment_start: float = 0.0
+        self._stopping: bool = False
+        self._thread: Optional[Thread] = None
+        self._wake: Condition = Condition()
+
+    def start(self: ServerLog) -> None:
+        """
+        Start writing in a thread.
+
+        Plain segments left behind by an earlier run are compressed
+        first.  Errors are logged rather than raised, and stop the
+        capture, so they never stop the server.
+        """
+
+        self._thread = Thread(daemon=True, name='server_log', target=self._run)
+        self._thread.start()
+
+    def stop(self: ServerLog) -> None:
+        """
+        Write what is buffered, then close and compress the current
+        segment.
+        """
+
+        if self._thread is None:
+            return
+
+        with self._wake:
+            self._stopping = True
+            self._wake.notify()
+
+        self._thread.join()
+        self._thread = None
+
+    def write(self: ServerLog, stream: str, chunk: bytes) -> None:
+        """
+        Hand over a chunk of output of a server stream (`stdout` or
+        `stderr`), without waiting for it to be written.
+        """
+
+        with self._wake:
+            if self._failed or self._stopping:
+                return
+
+            if self._buffered + len(chunk) > self._MAX_BUFFERED:
+                self._dropped += len(chunk)
+                return
+
+            self._chunks.append((stream, time(), chunk))
+            self._buffered += len(chunk)
+
+            if self._buffered >= self._MAX_BUFFERED // 2:
+                self._wake.notify()
+
+    @classmethod
+    def _format_time(cls: Type[ServerLog], when: datetime) -> str:
+        return when.strftime(cls._TIME_FORMAT)[:cls._TIME_LENGTH]
+
+    @classmethod
+    def _gzip_path(cls: Type[ServerLog], segment_path: Path) -> Path:
+        return segment_path.with_name(segment_path.name + cls._GZIP_SUFFIX)
+
+    @classmethod
+    def _index_path(cls: Type[ServerLog], segment_path: Path) -> Path:
+        return segment_path.with_name(segment_path.name + cls._INDEX_SUFFIX)
+
+    @classmethod
+    def _read_blocks(cls: Type[ServerLog], segment_path: Path,
+                     lower: Optional[bytes],
+                     upper: Optional[bytes]) -> Iterator[bytes]:
+        """
+        Read the parts of a segment that may hold lines in a time range.
+
+        A plain segment is read whole, and so is a compressed segment
+        without a usable index.
+        """
+
+        gzip_path = cls._gzip_path(segment_path)
+        if not gzip_path.exists():
+            yield segment_path.read_bytes()
+            return
+
+        try:
+            index: List[_Block] = loads(
+                cls._index_path(segment_path).read_text())
+        except (OSError, ValueError):
+            yield decompress(gzip_path.read_bytes())
+            return
+
+        with gzip_path.open('rb') as source:
+            for (offset, length, first, last) in index:
+                if upper is not None and first.encode() > upper:
+                    break
+                if lower is not None and last.encode() < lower:
+                    continue
+
+                source.seek(offset)
+                yield decompress(source.read(length))
+
+    @classmethod
+    def _write_block(cls: Type[ServerLog], dest: BinaryIO, lines: List[bytes],
+                     index: List[_Block]) -> None:
+        member = compress(b''.join(lines), cls._COMPRESS_LEVEL)
+
+        index.append((dest.tell(), len(member),
+                      lines[0][:cls._TIME_LENGTH].decode(errors='replace'),
+                      lines[-1][:cls._TIME_LENGTH].decode(errors='replace')))
+        dest.write(member)
+
+    def _close_segment(self: ServerLog) -> None:
+        """
+        Close and compress the current segment, if there is one, and
+        delete expired segments.
+        """
+
+        if self._segment is None:
+            return
+
+        assert self._segment_path is not None
+
+        self._segment.close()
+        self._segment = None
+
+        self.compress_segment(self._segment_path)
+        self._delete_expired()
+
+    def _delete_expired(self: ServerLog) -> None:
+        """
+        Delete compressed segments last written more than `keep_days`
+        days ago (none if 0).
+        """
+
+        if self._keep_days <= 0:
+            return
+
+        cutoff = time() - self._keep_days * self._SECONDS_PER_DAY
+
+        for gzip_path in self._logs_dir_path.glob(
+                self._NAME_PATTERN + self._GZIP_SUFFIX):
+            if gzip_path.stat().st_mtime < cutoff:
+                segment_path = gzip_path.with_suffix('')
+                self._index_path(segment_path).unlink(missing_ok=True)
+                gzip_path.unlink()
+
+    def _open_segment(self: ServerLog) -> BinaryIO:
+        """
+        Get the current segment, starting a new one if needed.
+        """
+
+        if self._segment is None:
+            self._logs_dir_path.mkdir(parents=True, exist_ok=True)
+
+            self._segment_path = self._logs_dir_path.joinpath(
+                datetime.now().strftime(self._NAME_FORMAT))
+            self._segment = self._segment_path.open('ab')
+            self._segment_size = 0
+            self._segment_start = time()
+
+        return self._segment
+
+    def _run(self: ServerLog) -> None:
+        """
+        Write buffered chunks every `_FLUSH_INTERVAL` seconds (or once
+        the buffer is half full), rotating segments as they grow.
+        """
+
+        try:
+            if self._logs_dir_path.exists():
+                for segment_path in sorted(
+                        self._logs_dir_path.glob(self._NAME_PATTERN)):
+                    self.compress_segment(segment_path)
+                self._delete_expired()
+
+            while True:
+                with self._wake:
+                    if (not self._stopping
+                            and self._buffered < self._MAX_BUFFERED // 2):
+                        self._wake.wait(self._FLUSH_INTERVAL)
+
+                    (chunks, self._chunks) = (self._chunks, [])
+                    (dropped, self._dropped) = (self._dropped, 0)
+                    self._buffered = 0
+                    stopping = self._stopping
+
+                if dropped:
+                    warning(f'Server log buffer full; dropped {dropped} ' +
+                            'bytes of output')
+                    Metrics.record_log_drop(dropped)
+
+                self._write_chunks(chunks, stopping)
+
+                if stopping:
+                    self._close_segment()
+                    return
+
+                if self._segment is not None and (
+                        self._segment_size >= self._rotate_size
+                        or time() - self._segment_start >=
+                        self._rotate_interval):
+                    self._close_segment()
+        except OSError as err:
+            error(f'Could not capture server output: {err}')
+
+            with self._wake:
+                self._failed = True
+                self._chunks = []
+                self._buffered = 0
+
+    def _write_chunks(self: ServerLog, chunks: List[_Chunk],
+                      final: bool) -> None:
+        """
+        Write the complete lines of chunks to the current segment, with
+        their prefix.
+
+        An incomplete line is kept for the next chunk of its stream,
+        unless it is the `final` write, or the line is very long.
+        """
+
+        lines: List[bytes] = []
+
+        for (stream, received, chunk) in chunks:
+            received_time = self._format_time(datetime.fromtimestamp(received))
+            prefix = f'{received_time} {stream} '.encode()
+
+            parts = (self._pending.pop(stream, b'') + chunk).split(b'\n')
+            pending = parts.pop()
+
+            lines.extend(prefix + part + b'\n' for part in parts)
+
+            if len(pending) >= self._BLOCK_SIZE:
+                lines.append(prefix + pending + b'\n')
+            elif pending:
+                self._pending[stream] = pending
+
+        if final:
+            prefix_time = self._format_time(datetime.now())
+            lines.extend(f'{prefix_time} {stream} '.encode() + pending + b'\n'
+                         for (stream, pending) in self._pending.items())
+            self._pending.clear()
+
+        if not lines:
+            return
+
+        data = b''.join(lines)
+
+        segment = self._open_segment()
+        segment.write(data)
+        segment.flush()
+
+        self._segment_size += len(data)
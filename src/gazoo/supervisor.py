@@ -0,0 +1,137 @@
+"""
+Provide class Supervisor.
+"""
+
+from __future__ import annotations
+
+from logging import error, info, warning
+from multiprocessing import get_context
+from multiprocessing.connection import wait
+from os import chdir, kill
+from pathlib import Path
+from signal import SIG_IGN, SIGINT, SIGTERM, signal
+from typing import TYPE_CHECKING
+
+from .archive_slots import ArchiveSlots
+from .async_wrapper import AsyncWrapper
+from .util import Util
+from .wrapper import Wrapper
+
+if TYPE_CHECKING:
+    from multiprocessing.context import SpawnProcess
+    from types import FrameType
+    from typing import Final, List, Optional, Type
+
+
+class Supervisor:
+    """
+    Wrap several bedrock server instances from one gazoo command.
+
+    Each server root (a directory with a `bedrock_server` binary, as for
+    a single gazoo) is wrapped by a process of its own, working in that
+    directory with its own config, so a crash only affects one server.
+    Each process archives its own backups, rather than handing them to
+    one pool shared by all servers, but they share slots that limit how
+    many backups are archived at once across the host (see
+    `ArchiveSlots`).  The slots of a process that dies are freed when it
+    exits.
+
+    Interrupting the supervisor (or terminating it) stops all servers.
+    """
+
+    _ROOT_COMMENT: Final[str] = '#'
+
+    @classmethod
+    def read_roots(cls: Type[Supervisor], roots_file_path: Path) -> List[Path]:
+        """
+        Read server roots from a file, one per line.
+
+        Empty lines and lines starting with `#` are skipped.  Relative
+        roots are relative to the directory of the file.
+        """
+
+        roots: List[Path] = []
+        with roots_file_path.open() as roots_file:
+            for line in roots_file:
+                line = line.strip()
+                if line and not line.startswith(cls._ROOT_COMMENT):
+                    roots.append(roots_file_path.parent.joinpath(line))
+
+        return roots
+
+    @staticmethod
+    def run_instance(root: str, archive_slots: ArchiveSlots) -> None:
+        """
+        Wrap the server in a root (in a process started by `run`).
+        """
+
+        chdir(root)
+
+        Util.limit_archives(archive_slots)
+
+        config = Util.read_config()
+        Util.configure_logging(config, f'gazoo {Path(root).name}')
+
+        if config.asyncio:
+            AsyncWrapper(config).run()
+        else:
+            Wrapper(config).run()
+
+    def __init__(self: Supervisor, roots: List[Path],
+                 max_archives: int) -> None:
+        self._max_archives: int = max(max_archives, 1)
+        self._processes: List[SpawnProcess] = []
+        self._roots: List[Path] = [root.resolve() for root in roots]
+
+    def run(self: Supervisor) -> None:
+        """
+        Start a process for each server, wait until all of them exit.
+        """
+
+        # a fresh interpreter per server, as if started in its root
+        context = get_context('spawn')
+        archive_slots = ArchiveSlots(context, self._max_archives)
+
+        for root in self._roots:
+            process = context.Process(name=root.name,
+                                      target=self.run_instance,
+                                      args=[str(root), archive_slots])
+            process.start()
+            self._processes.append(process)
+
+            info(f'Started {root} (pid {process.pid})')
+
+        # interrupts reach the servers directly (same process group)
+        signal(SIGINT, SIG_IGN)
+        signal(SIGTERM, self._signal_sigterm)
+
+        running = list(self._processes)
+        while running:
+            wait([process.sentinel for process in running])
+
+            for process in [
+                    process for process in running if not process.is_alive()
+            ]:
+                running.remove(process)
+                process.join()
+
+                if process.exitcode == 0:
+                    info(f'{process.name} exited')
+                else:
+                    error(f'{process.name} exited with code ' +
+                          f'{process.exitcode}')
+
+                assert process.pid is not None
+                if archive_slots.free(process.pid):
+                    warning(f'{process.name} exited while archiving; ' +
+                            'freed its archive slot')
+
+    def _signal_sigterm(self: Supervisor, _signum: int,
+                        _frame: Optional[FrameType]) -> None:
+        """
+        Handle sigterm by interrupting each server process.
+        """
+
+        for process in self._processes:
+            if process.pid is not None and process.is_alive():
+                kill(process.pid, SIGINT)
@@ -0,0 +1,189 @@
+"""
+Provide class TarWriter.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from lzma import LZMACompressor
+from os import SEEK_END
+from tarfile import BLOCKSIZE, NUL, PAX_FORMAT, REGTYPE, TarInfo
+from time import time
+from typing import TYPE_CHECKING
+
+from .io_throttle import IoThrottle
+from .page_cache import PageCache
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from types import ModuleType, TracebackType
+    from typing import Any, BinaryIO, Final, List, Optional, Type
+
+# optional (see `COMPRESSIONS`), and typed as a module, so the code is
+# type checked the same whether it is installed or not
+zstandard: Optional[ModuleType]
+try:
+    zstandard = import_module('zstandard')
+except ImportError:
+    zstandard = None
+
+
+class TarWriter:
+    """
+    Write a compressed tar archive in one sequential pass.
+
+    Like with `ZipWriter`, entries are compressed elsewhere, in parallel:
+    `compress_entry` compresses the tar header, data, and padding of an
+    entry into a part, which is a complete xz stream (or zstd frame) of
+    its own.  Concatenated streams (or frames) decompress as one, so the
+    parts are simply appended to the archive, followed by a compressed
+    end-of-archive marker.  The archive is never seeked, so it is
+    written (and read) in one sequential pass.  Source files read and
+    parts appended are counted by `IoThrottle`.
+    """
+
+    COMPRESSIONS: Final[List[str]] = ['xz'] + ([] if zstandard is None
+                                               else ['zst'])
+    """
+    Available compressions (`zst` needs the `zstandard` package)
+    """
+
+    _CHUNK_SIZE: Final[int] = 1024 * 1024  # 1 MiB
+    _DEFAULT_MODE: Final[int] = 0o600
+
+    @classmethod
+    def compress_entry(cls: Type[TarWriter], name: str, source_path: Path,
+                       length: int, compression: str, level: int,
+                       part_path: Path) -> None:
+        """
+        Compress the first `length` bytes of a file into a part.
+
+        The part, a compressed tar entry, is written to `part_path`.
+        """
+
+        source_file: BinaryIO
+        part_file: BinaryIO
+        with source_path.open(mode='rb') as source_file, \
+                part_path.open(mode='wb') as part_file:
+            length = min(length, source_file.seek(0, SEEK_END))
+            source_file.seek(0)
+            PageCache.advise_sequential(source_file, length)
+
+            compressor = cls._compressor(compression, level)
+            part_file.write(compressor.compress(cls._header(name, length)))
+
+            remaining = length
+            while remaining > 0:
+                chunk = source_file.read(min(remaining, cls._CHUNK_SIZE))
+                if not chunk:
+                    raise EOFError(f'{source_path} shrank while archiving')
+                IoThrottle.read(len(chunk))
+                part_file.write(compressor.compress(chunk))
+                remaining -= len(chunk)
+
+            part_file.write(compressor.compress(cls._padding(length)))
+            part_file.write(compressor.flush())
+
+    def __init__(self: TarWriter, path: Path, compression: str,
+                 level: int) -> None:
+        self._compression: str = compression
+        self._entry_count: int = 0
+        self._file: BinaryIO = path.open(mode='wb')
+        self._level: int = level
+
+    def __enter__(self: TarWriter) -> TarWriter:
+        return self
+
+    def __exit__(self: TarWriter, _exc_type: Optional[Type[BaseException]],
+                 _exc_value: Optional[BaseException],
+                 _traceback: Optional[TracebackType]) -> None:
+        self.close()
+
+    @property
+    def entry_count(self: TarWriter) -> int:
+        """
+        Number of entries written so far
+        """
+
+        return self._entry_count
+
+    def close(self: TarWriter) -> None:
+        """
+        Write the end-of-archive marker and close the archive.
+        """
+
+        if self._file.closed:
+            return
+
+        compressor = self._compressor(self._compression, self._level)
+        self._file.write(compressor.compress(NUL * (BLOCKSIZE * 2)))
+        self._file.write(compressor.flush())
+
+        self._file.close()
+
+    def write_bytes(self: TarWriter, name: str, data: bytes) -> None:
+        """
+        Write a (small) entry from memory.
+        """
+
+        compressor = self._compressor(self._compression, self._level)
+        self._file.write(
+            compressor.compress(
+                self._header(name, len(data)) + data +
+                self._padding(len(data))))
+        self._file.write(compressor.flush())
+
+        self._entry_count += 1
+
+    def write_part(self: TarWriter, part_path: Path) -> None:
+        """
+        Append the entry of a part made by `compress_entry` to the
+        archive.
+        """
+
+        part_file: BinaryIO
+        with part_path.open(mode='rb') as part_file:
+            while chunk := part_file.read(self._CHUNK_SIZE):
+                IoThrottle.write(len(chunk))
+                self._file.write(chunk)
+
+        self._entry_count += 1
+
+    @classmethod
+    def _compressor(cls: Type[TarWriter], compression: str,
+                    level: int) -> Any:
+        """
+        Make a compressor that writes a complete stream (or frame) when
+        flushed.
+        """
+
+        if compression == 'xz':
+            return LZMACompressor(preset=level)
+
+        if compression == 'zst' and zstandard is not None:
+            return zstandard.ZstdCompressor(
+                level=level, write_checksum=True).compressobj()
+
+        raise ValueError(f'Unavailable compression: {compression}')
+
+    @classmethod
+    def _header(cls: Type[TarWriter], name: str, length: int) -> bytes:
+        """
+        Make the (pax) tar header of a regular file.
+        """
+
+        tar_info = TarInfo(name)
+        tar_info.mode = cls._DEFAULT_MODE
+        tar_info.mtime = int(time())
+        tar_info.size = length
+        tar_info.type = REGTYPE
+
+        return tar_info.tobuf(format=PAX_FORMAT)
+
+    @classmethod
+    def _padding(cls: Type[TarWriter], length: int) -> bytes:
+        """
+        Get the padding after `length` bytes of data, up to a block.
+        """
+
+        return NUL * (-length % BLOCKSIZE)
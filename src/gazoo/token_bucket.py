@@ -0,0 +1,52 @@
+"""
+Provide class TokenBucket.
+"""
+
+from __future__ import annotations
+
+from threading import Lock
+from time import monotonic, sleep
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Optional
+
+
+class TokenBucket:
+    """
+    Limit the rate of some work (e.g. bytes read), shared by threads.
+
+    Tokens accrue at `rate` per second, up to `burst` (one second worth
+    by default).  Taking more tokens than there are puts the bucket in
+    debt, and the taker sleeps until the debt is paid, so a big amount
+    is never starved by small ones.  A rate of 0 means no limit.
+    """
+
+    def __init__(self: TokenBucket,
+                 rate: float,
+                 burst: Optional[float] = None) -> None:
+        self._burst: float = rate if burst is None else burst
+        self._lock: Lock = Lock()
+        self._rate: float = rate
+        self._tokens: float = self._burst
+        self._updated: float = monotonic()
+
+    def consume(self: TokenBucket, amount: float) -> None:
+        """
+        Take tokens, waiting until they are available.
+        """
+
+        if self._rate <= 0:
+            return
+
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(
+                self._tokens + (now - self._updated) * self._rate,
+                self._burst) - amount
+            self._updated = now
+
+            delay = -self._tokens / self._rate
+
+        if delay > 0:
+            sleep(delay)
@@ -4,77 +4,201 @@ Provide class Util.
 
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from configparser import ConfigParser
+from ctypes import CDLL, get_errno
 from datetime import datetime
-from logging import error, info
-from os import remove, rename, scandir
-from os.path import basename, dirname, exists, isabs
+from errno import EINVAL, ENOSYS
+from logging import DEBUG, error, info
+from logging import basicConfig as basic_config
+from multiprocessing import get_context
+from os import (O_RDONLY, close, fsync, link, rename, stat, strerror,
+                truncate, utime, walk)
+from os import open as os_open
+from os.path import basename, dirname, exists, isabs, join
 from pathlib import Path
-from re import compile as compyle
-from shutil import copyfileobj, rmtree
+from shutil import rmtree
+from tempfile import mkdtemp
+from threading import Lock
 from typing import TYPE_CHECKING
-from zipfile import ZipFile
 
+from .archive_pipeline import ArchivePipeline
+from .archive_reader import ArchiveReader
+from .archive_verifier import ArchiveVerifier
+from .backup_manifest import BackupManifest
+from .catalog import Catalog
 from .config import Config
+from .io_throttle import IoThrottle
+from .metrics import Metrics
+from .page_cache import PageCache
+from .repository import Repository
+from .retention_policy import RetentionPolicy
+from .tar_writer import TarWriter
+from .token_bucket import TokenBucket
+from .zip_writer import ZipWriter
 
 if TYPE_CHECKING:
-    from os import PathLike
-    from typing import BinaryIO, Dict, Final, List, Type
+    from concurrent.futures import Future
+    from typing import (IO, BinaryIO, Callable, ClassVar, Dict, Final, List,
+                        Optional, Set, Tuple, Type, Union)
 
+    from .archive_slots import ArchiveSlots
     from .backup_file import BackupFile
 
 
 class Util:
     """
     Provide stateless utility functions for paths, config, setup, etc.
+
+    The only state is the optional limit on concurrent archives (see
+    `limit_archives`), and the pool of compression processes, which
+    lasts from the first archive to `shutdown_compression`.
     """
 
+    _AT_FDCWD: Final[int] = -100  # from linux/fcntl.h
     _BACKUPS_DIR_NAME: Final[str] = 'backups'
     _BASE_DIR_NAME: Final[str] = 'gazoo'
+    _CATALOG_FILE_NAME: Final[str] = 'catalog.sqlite3'
     _CONFIG_FILE_NAME: Final[str] = 'gazoo.cfg'
+    _COPY_CHUNK_SIZE: Final[int] = 1024 * 1024  # 1 MiB
+    _FORWARD_CHUNK_SIZE: Final[int] = 64 * 1024  # 64 KiB
+    _FICLONE: Final[int] = 0x40049409  # ioctl request from linux/fs.h
+    _IMMUTABLE_SUFFIXES: Final[List[str]] = ['.ldb']
+    _LOGS_DIR_NAME: Final[str] = 'logs'
+    _MIB: Final[int] = 1024 * 1024
+    _PARTS_DIR_NAME: Final[str] = 'parts'
+    _RENAME_EXCHANGE: Final[int] = 2  # flag from linux/fs.h
+    _REPOSITORY_DIR_NAME: Final[str] = 'repository'
+    _RESTORE_DIR_NAME: Final[str] = 'restore'
+    _SNAPSHOT_DIR_NAME: Final[str] = 'snapshot'
     _TEMP_DIR_NAME: Final[str] = '.tmp'
     _WORLDS_DIR_NAME: Final[str] = 'worlds'
 
+    _archive_slots: ClassVar[Optional[ArchiveSlots]] = None
+    _compression_pool: ClassVar[Optional[ProcessPoolExecutor]] = None
+    _compression_pool_args: ClassVar[Tuple[int, float, bool, bool]]
+    _compression_pool_lock: ClassVar[Lock] = Lock()
+
     @classmethod
-    def archive_files(cls: Type[Util], backup_files: List[BackupFile]) -> None:
+    def archive_files(cls: Type[Util],
+                      backup_files: List[BackupFile],
+                      config: Config,
+                      source_dir_path: Optional[Path] = None) -> None:
         """
         Copy saved files to backup archive.
+
+        The archive is a zip archive, or a tar archive compressed with
+        xz or zstd, as configured (see `ZipWriter` and `TarWriter`).
+        Entries are read, compressed in parallel by a pool of processes
+        (as configured, and kept for later archives), and written to the
+        archive in the order given, with the stages overlapping (see
+        `ArchivePipeline`).  Each entry is streamed in chunks, capped at
+        its reported length, so memory use does not grow with the size
+        of the world.
+
+        Unless a full backup is due (see `Config.full_backup_every`),
+        only files that changed since the previous backup are archived
+        (see `BackupManifest`).  A file is unchanged if its length and
+        modification time are, or else if its hash is.
+
+        Afterwards, the archive and the pages of files that were not
+        cached before are dropped from the page cache (see `PageCache`).
+
+        If `source_dir_path` is given, files are read from there (laid
+        out like the worlds directory, as made by `snapshot_files`)
+        instead of from the live world.  The snapshot is deleted
+        afterwards (and its pages with it), and the pages of the live
+        world were already taken care of by `snapshot_files`.
         """
 
-        cls.ensure_temp_dir()
+        if source_dir_path is None:
+            cls.ensure_temp_dir()
 
         world_dir_name = backup_files[0].world_dir_name
+        created = datetime.now().timestamp()
+        archive_format = config.archive_format
+        archive_file_name = (f'{cls.backup_name(world_dir_name)}.' +
+                             archive_format)
+
+        archive_path = cls.temp_dir_path().joinpath(archive_file_name)
+
+        previous = BackupManifest.latest(cls.catalog(),
+                                         cls.backups_dir_path(),
+                                         world_dir_name)
+        full = (previous is None
+                or previous.runs + 1 >= config.full_backup_every)
+        manifest = BackupManifest(world_dir_name,
+                                  0 if previous is None or full else
+                                  previous.runs + 1)
+
+        entries = cls._backup_entries(backup_files, source_dir_path)
+        # before hashing, which reads the changed files
+        cached: Dict[Path, bytes] = {}
+        if source_dir_path is None:
+            cached = PageCache.cached_pages([(source_path, length)
+                                             for (_name, source_path,
+                                                  length) in entries])
+
+        parts_dir_path = cls.temp_dir_path().joinpath(cls._PARTS_DIR_NAME)
+        parts_dir_path.mkdir(exist_ok=True)
+
+        executor = cls._compression_executor(config)
+
+        writer: Union[TarWriter, ZipWriter]
+        compression: Union[int, str]
+        if archive_format == 'zip':
+            writer = ZipWriter(archive_path)
+            compression = config.compression
+        else:
+            compression = archive_format.split('.')[1]
+            writer = TarWriter(archive_path, compression,
+                               config.compression_level)
 
-        datetime_string = datetime.now().strftime('%Y-%m-%d %H-%M-%S')
-        zip_file_name = f'{world_dir_name} {datetime_string}.zip'
+        pipeline = ArchivePipeline(writer, compression,
+                                   config.compression_level, executor,
+                                   parts_dir_path, config.read_queue_depth,
+                                   config.compress_queue_depth)
 
-        zip_file_path = cls.temp_dir_path().joinpath(zip_file_name)
-        zip_file = ZipFile(zip_file_path, 'w')
+        try:
+            with writer:
+                pipeline.run(entries, previous, full, manifest,
+                             archive_file_name)
+                entry_count = writer.entry_count
+        except BrokenProcessPool:
+            # a compression process died: start over with the next backup
+            cls.shutdown_compression()
+            raise
 
-        for backup_file in backup_files:
-            if world_dir_name != backup_file.world_dir_name:
-                error(('world_dir_name mismatch: ' +
-                       '{world_dir_name} {loc.parts[0]}'))
+        info(f'Archived {len(pipeline.archived)} of ' +
+             f'{len(manifest.files)} files' +
+             (' (full backup)' if full else ''))
 
-            try:
-                source_file: BinaryIO
-                with backup_file.source_path.open(mode='rb') as source_file:
-                    # yapf: disable
-                    zip_file.writestr(
-                        str(backup_file.source_path.relative_to(
-                            cls.worlds_dir_path(),
-                        )),
-                        source_file.read(backup_file.length),
-                    )
-                    # yapf: enable
-            except FileNotFoundError as err:
-                error(err)
+        final_dest_path = cls.backups_dir_path().joinpath(archive_file_name)
+        rename(archive_path, final_dest_path)
 
-        final_dest_path = cls.backups_dir_path().joinpath(zip_file_name)
-        rename(zip_file_path, final_dest_path)
+        cls._catalog_backup(final_dest_path, world_dir_name, created,
+                            entry_count)
+
+        Metrics.record_archive(
+            sum(length for (_name, _path, length) in pipeline.archived),
+            final_dest_path.stat().st_size)
+
+        PageCache.drop_written(final_dest_path)
+        PageCache.drop_uncached(cached)
 
         cls.ensure_temp_dir()
 
+    @classmethod
+    def backup_name(cls: Type[Util], world_dir_name: str) -> str:
+        """
+        Get the name (without extension) for a new backup of a world.
+        """
+
+        datetime_string = datetime.now().strftime('%Y-%m-%d %H-%M-%S')
+
+        return f'{world_dir_name} {datetime_string}'
+
     @classmethod
     def backups_dir_path(cls: Type[Util]) -> Path:
         """
@@ -92,28 +216,67 @@ class Util:
         return Path.cwd().joinpath(cls._BASE_DIR_NAME)
 
     @classmethod
-    def cleanup_archives(cls: Type[Util]) -> None:
+    def catalog(cls: Type[Util]) -> Catalog:
+        """
+        Get the catalog of backups.
+        """
+
+        return Catalog.for_path(cls.catalog_file_path(),
+                                cls.backups_dir_path())
+
+    @classmethod
+    def catalog_file_path(cls: Type[Util]) -> Path:
+        """
+        Get the path to the backup catalog database.
+        """
+
+        return cls.base_dir_path().joinpath(cls._CATALOG_FILE_NAME)
+
+    @classmethod
+    def cleanup_archives(cls: Type[Util],
+                         config: Config,
+                         dry_run: bool = False) -> List[str]:
         """
         Clean up the archives created during backup.
+
+        Backups are kept according to the retention policy (see
+        `RetentionPolicy`), along with the archives they need (if they
+        are incremental).  Objects in the repository that are no longer
+        referenced by any backup are deleted as well.
+
+        Backups are taken from the catalog; other files in the backups
+        directory are left alone.  Each backup is removed from the
+        catalog once its file is deleted, so an interrupted cleanup
+        never leaves files the catalog does not know about.
+
+        Return the names of the deleted backups (or, if `dry_run` is
+        true, the backups that would be deleted, without deleting them).
         """
 
-        with scandir(cls.backups_dir_path()) as itr:
-            keep: Dict[str, str] = {}
-            pattern = compyle(r'(?P<date>\d{4}-\d{2}-\d{2}) \d{2}-\d{2}-\d{2}\.zip$')
+        catalog = cls.catalog()
+        backups = catalog.recent()
+
+        kept = RetentionPolicy.from_config(config).keep(backups)
+
+        # incremental backups need the archives holding their files
+        for name in list(kept):
+            if ArchiveReader.is_archive_name(name):
+                manifest = BackupManifest.from_archive(
+                    cls.backups_dir_path().joinpath(name))
+                if manifest is not None:
+                    kept.update(manifest.archive_names())
 
-            files = sorted(itr, key=lambda f : f.name)
-            for file in files:
-                match = pattern.search(file.name)
-                assert match is not None
+        deleted = [
+            backup['name'] for backup in backups
+            if backup['name'] not in kept
+        ]
 
-                keep[match.group('date')] = file.path
+        if dry_run:
+            return deleted
 
-            for file in files:
-                match = pattern.search(file.name)
-                assert match is not None
+        cls._delete_backups(deleted)
 
-                if keep[match.group('date')] != file.path:
-                    remove(file.path)
+        return deleted
 
     @classmethod
     def config_file_path(cls: Type[Util]) -> Path:
@@ -123,6 +286,74 @@ class Util:
 
         return cls.base_dir_path().joinpath(cls._CONFIG_FILE_NAME)
 
+    @classmethod
+    def configure_logging(cls: Type[Util], config: Config, tag: str) -> None:
+        """
+        Set up logging, with messages tagged (e.g. with the app name).
+        """
+
+        basic_config(
+            datefmt='%Y-%m-%d %H:%M:%S',
+            format=f'[%(asctime)s %(levelname)s] [{tag}] %(message)s',
+            level=(DEBUG if config.debug else None),
+        )
+
+    @classmethod
+    def copy_file(cls: Type[Util], source_path: Path, dest_path: Path,
+                  length: int) -> None:
+        """
+        Copy the first `length` bytes of a file as cheaply as possible.
+
+        In order of preference, the file is hard linked (only for files
+        that are never modified in place and need no truncation), cloned
+        (reflink), or copied in the kernel (`copy_file_range`), falling
+        back to a regular copy.
+        """
+
+        if (source_path.suffix in cls._IMMUTABLE_SUFFIXES
+                and source_path.stat().st_size == length):
+            try:
+                link(source_path, dest_path)
+                return
+            except OSError:
+                pass
+
+        source_file: BinaryIO
+        dest_file: BinaryIO
+        with source_path.open(mode='rb') as source_file, \
+                dest_path.open(mode='wb') as dest_file:
+            try:
+                # pylint: disable=import-outside-toplevel
+                from fcntl import ioctl
+                ioctl(dest_file.fileno(), cls._FICLONE, source_file.fileno())
+                truncate(dest_file.fileno(), length)
+                return
+            except (ImportError, OSError):
+                pass
+
+            remaining = length
+            try:
+                # pylint: disable=import-outside-toplevel
+                from os import copy_file_range
+                while remaining > 0:
+                    copied = copy_file_range(source_file.fileno(),
+                                             dest_file.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                return
+            except (ImportError, OSError):
+                pass
+
+            source_file.seek(length - remaining)
+            dest_file.seek(length - remaining)
+            while remaining > 0:
+                chunk = source_file.read(min(remaining, cls._COPY_CHUNK_SIZE))
+                if not chunk:
+                    break
+                dest_file.write(chunk)
+                remaining -= len(chunk)
+
     @classmethod
     def ensure_backups_dir(cls: Type[Util]) -> None:
         """
@@ -214,6 +445,60 @@ class Util:
             else:
                 found.unlink()
 
+    @classmethod
+    def forward_stream(cls: Type[Util],
+                       source: IO[bytes],
+                       dest: IO[bytes],
+                       scan: Optional[Callable[[bytes], None]] = None) -> None:
+        """
+        Forward a binary stream until it ends.
+
+        Whatever is available from the source (up to a limit) is read at
+        once, written with a single write, and flushed.  Output is
+        therefore batched when the source is busy but still forwarded
+        right away when it is quiet.  If `scan` is given, it is called
+        with each chunk after it has been forwarded.
+
+        Buffered sources (like server pipes) are read with `read1`, and
+        raw sources with `read`, which both return what is available.
+        """
+
+        read: Callable[[int], bytes] = getattr(source, 'read1', source.read)
+
+        chunk: bytes
+        while chunk := read(cls._FORWARD_CHUNK_SIZE):
+            dest.write(chunk)
+            dest.flush()
+
+            if scan is not None:
+                scan(chunk)
+
+    @classmethod
+    def limit_archives(cls: Type[Util], slots: ArchiveSlots) -> None:
+        """
+        Limit concurrent archives to the slots shared by several
+        processes (see `Supervisor`), so the limit holds across all of
+        them.
+        """
+
+        cls._archive_slots = slots
+
+    @classmethod
+    def list_backups(cls: Type[Util]) -> List[str]:
+        """
+        Describe the backups in the catalog, newest first, one line each
+        (numbered as for `restore_backup`).
+        """
+
+        lines: List[str] = []
+        for (num, backup) in enumerate(cls.catalog().recent(), start=1):
+            created = datetime.fromtimestamp(backup['created'])
+            lines.append(f'{num:>6}  {created:%Y-%m-%d %H:%M:%S}  ' +
+                         f'{backup["size"]:>12} bytes  ' +
+                         f'{backup["entries"]:>6} entries  {backup["name"]}')
+
+        return lines
+
     @classmethod
     def read_config(cls: Type[Util]) -> Config:
         """
@@ -238,9 +523,32 @@ class Util:
         return Config(config)
 
     @classmethod
-    def restore_backup(cls: Type[Util], num_or_path: str) -> None:
+    def logs_dir_path(cls: Type[Util]) -> Path:
+        """
+        Get the path to the application directory for captured server
+        output (see `ServerLog`).
+        """
+
+        return cls.base_dir_path().joinpath(cls._LOGS_DIR_NAME)
+
+    @classmethod
+    def repository_dir_path(cls: Type[Util]) -> Path:
+        """
+        Get the path to the application repository directory.
+        """
+
+        return cls.base_dir_path().joinpath(cls._REPOSITORY_DIR_NAME)
+
+    @classmethod
+    def restore_backup(cls: Type[Util],
+                       num_or_path: str,
+                       at: Optional[datetime] = None) -> None:
         """
         Restore world backup.
+
+        The backup is given by number (starting from 1, going back in
+        time), by path, or (if `at` is given) as the newest backup made
+        at or before a time.  Backups are looked up in the catalog.
         """
 
         num = 0
@@ -250,25 +558,459 @@ class Util:
         except ValueError:
             is_num = False
 
-        path: PathLike[str]
-        if is_num:
-            with scandir(cls.backups_dir_path()) as itr:
-                files = sorted(itr, key=lambda f: f.stat().st_mtime)
+        path: Path
+        if at is not None or is_num:
+            catalog = cls.catalog()
 
-                if num < 1 or num > len(files):
-                    num = 1
-                selected = files[len(files) - num]
-                path = Path(selected.path)
+            if at is not None:
+                backup = catalog.find_at(at.timestamp())
+                if backup is None:
+                    raise ValueError(f'No backup made at or before {at}')
+            else:
+                backup = catalog.find_recent(max(num, 1))
+                if backup is None:
+                    backup = catalog.find_recent(1)
+                if backup is None:
+                    raise ValueError('No backups found')
+
+            path = cls.backups_dir_path().joinpath(backup['name'])
         else:
             if isabs(num_or_path):
                 path = Path(num_or_path)
             else:
                 path = cls.backups_dir_path().joinpath(num_or_path)
 
-        zip_file = ZipFile(path)
-        name_list = zip_file.namelist()
+        if path.suffix == Repository.MANIFEST_SUFFIX:
+            cls._restore_manifest(path)
+        else:
+            cls._restore_archive(path)
+
+        info(f'Restored "{basename(path)}"')
+
+    @classmethod
+    def save_snapshot(cls: Type[Util], backup_files: List[BackupFile],
+                      config: Config, snapshot_dir_path: Path) -> None:
+        """
+        Save a snapshot made by `snapshot_files` with the configured
+        backup backend.
+
+        If the number of concurrent archives is limited (see
+        `limit_archives`), wait for a free slot first, and stop the pool
+        of compression processes before giving it back: otherwise each
+        supervised server would keep a pool of idle processes (one per
+        CPU by default) between its archives.  Reading and writing are
+        limited to the configured rates (see `IoThrottle`), and kept from
+        crowding the page cache if configured (see `PageCache`).
+        """
+
+        slots = cls._archive_slots
+        if slots is not None and not slots.acquire(block=False):
+            info('waiting for other servers to finish archiving')
+            slots.acquire()
+
+        PageCache.configure(config.page_cache_hints)
+
+        # the compression processes only read for archives
+        read_rate = (config.archive_read_rate * cls._MIB
+                     if config.backup_backend == 'repository' else
+                     cls._archive_read_rate(config))
+
+        try:
+            with IoThrottle.limit(read_rate,
+                                  config.archive_write_rate * cls._MIB,
+                                  config.archive_io_idle):
+                if config.backup_backend == 'repository':
+                    cls.store_files(backup_files, snapshot_dir_path)
+                else:
+                    cls.archive_files(backup_files, config,
+                                      snapshot_dir_path)
+        finally:
+            if slots is not None:
+                cls.shutdown_compression()
+                slots.release()
+
+    @classmethod
+    def snapshot_files(cls: Type[Util],
+                       backup_files: List[BackupFile]) -> Path:
+        """
+        Copy saved files to a snapshot directory, truncated to length.
+
+        This is the only step of a backup that needs the server to hold
+        saving, so it is kept as short as possible (see `copy_file`).
+        Pages of the saved files that were not cached before they were
+        copied are dropped from the page cache afterwards (see
+        `PageCache`).
+
+        Return the path to the snapshot directory, which is laid out
+        like the worlds directory.  Modification times are kept, to
+        detect changed files (see `archive_files`).
+        """
+
+        cls.ensure_temp_dir()
+
+        for world_index in {
+                backup_file.world_index
+                for backup_file in backup_files
+        }:
+            world_index.refresh()
+
+        snapshot_dir_path = cls.temp_dir_path().joinpath(
+            cls._SNAPSHOT_DIR_NAME)
+
+        cached: Dict[Path, bytes] = {}
+
+        for backup_file in backup_files:
+            try:
+                source_path = backup_file.source_path
+                dest_path = snapshot_dir_path.joinpath(
+                    backup_file.archive_name)
+
+                dest_path.parent.mkdir(parents=True, exist_ok=True)
+                source_stat = stat(source_path)
+                cached.update(
+                    PageCache.cached_pages([(source_path,
+                                             backup_file.length)]))
+                cls.copy_file(source_path, dest_path, backup_file.length)
+                utime(dest_path,
+                      ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+            except FileNotFoundError as err:
+                error(err)
+
+        PageCache.drop_uncached(cached)
+
+        return snapshot_dir_path
+
+    @classmethod
+    def split_lines(cls: Type[Util],
+                    pending: bytes,
+                    chunk: bytes,
+                    keep: bool = True) -> Tuple[List[bytes], bytes]:
+        """
+        Split a chunk of output into lines.
+
+        `pending` is the incomplete last line of the previous chunk.
+        Return the complete lines (without line endings) and the new
+        incomplete last line.  If `keep` is false, complete lines are
+        skipped without being split, which is much cheaper.
+        """
+
+        if not keep:
+            (_lines, newline, last) = chunk.rpartition(b'\n')
+            return ([], last if newline else pending + last)
+
+        lines = (pending + chunk).split(b'\n')
+        last = lines.pop()
+
+        return ([line.rstrip(b'\r') for line in lines], last)
+
+    @classmethod
+    def store_files(cls: Type[Util], backup_files: List[BackupFile],
+                    source_dir_path: Path) -> None:
+        """
+        Copy saved files to the repository, with a manifest in backups.
+
+        Files are read from `source_dir_path` (see `archive_files`).
+        """
+
+        world_dir_name = backup_files[0].world_dir_name
+        created = datetime.now().timestamp()
+        manifest_name = (f'{cls.backup_name(world_dir_name)}' +
+                         Repository.MANIFEST_SUFFIX)
+        manifest_path = cls.backups_dir_path().joinpath(manifest_name)
+
+        sources = cls._backup_entries(backup_files, source_dir_path)
+
+        entries = Repository.for_dir(cls.repository_dir_path()).store(
+            sources, world_dir_name, manifest_path, cls.temp_dir_path())
+
+        cls._catalog_backup(manifest_path, world_dir_name, created, entries)
+
+        Metrics.record_archive(
+            sum(backup_file.length for backup_file in backup_files), None)
+
+        cls.ensure_temp_dir()
+
+    @classmethod
+    def shutdown_compression(cls: Type[Util]) -> None:
+        """
+        Stop the pool of compression processes, if it was started (see
+        `archive_files`).
+        """
+
+        with cls._compression_pool_lock:
+            pool = cls._compression_pool
+            cls._compression_pool = None
+
+        if pool is not None:
+            pool.shutdown()
+
+    @classmethod
+    def temp_dir_path(cls: Type[Util]) -> Path:
+        """
+        Get the path to the application temporary directory.
+        """
+
+        return cls.base_dir_path().joinpath(cls._TEMP_DIR_NAME)
+
+    @classmethod
+    def verify_backups(cls: Type[Util],
+                       config: Config,
+                       force: bool = False) -> Dict[str, str]:
+        """
+        Check backups against their checksums (see `ArchiveVerifier`).
+
+        Reading is limited to the configured rate.  Backups verified
+        before are skipped if they did not change since, unless `force`
+        is true.
+
+        Return the status of every backup, by name.
+        """
+
+        verifier = ArchiveVerifier(
+            cls.catalog(), cls.backups_dir_path(),
+            Repository.for_dir(cls.repository_dir_path()),
+            TokenBucket(config.verify_rate * cls._MIB), config.verify_workers)
+
+        return verifier.verify(force)
+
+    @classmethod
+    def worlds_dir_path(cls: Type[Util]) -> Path:
+        """
+        Get the path to the server worlds directory.
+        """
+
+        return Path.cwd().joinpath(cls._WORLDS_DIR_NAME)
+
+    @classmethod
+    def _archive_read_rate(cls: Type[Util], config: Config) -> float:
+        """
+        Get the read limit (in bytes per second) of each process reading
+        for an archive.
+
+        The configured limit is shared evenly by the archiving process
+        (which hashes files, and reads the ones it stores) and its
+        compression processes, so together they stay within it.
+        """
+
+        return (config.archive_read_rate * cls._MIB /
+                (config.compression_workers + 1))
+
+    @classmethod
+    def _backup_entries(
+            cls: Type[Util], backup_files: List[BackupFile],
+            source_dir_path: Optional[Path]) -> List[Tuple[str, Path, int]]:
+        """
+        Get the name, source path, and length of each backup file.
+
+        Files that cannot be found are logged and left out.
+        """
+
+        world_dir_name = backup_files[0].world_dir_name
+
+        entries: List[Tuple[str, Path, int]] = []
+        for backup_file in backup_files:
+            if world_dir_name != backup_file.world_dir_name:
+                error(('world_dir_name mismatch: ' +
+                       '{world_dir_name} {loc.parts[0]}'))
+
+            try:
+                archive_name = backup_file.archive_name
+                source_path = (backup_file.source_path
+                               if source_dir_path is None else
+                               source_dir_path.joinpath(archive_name))
+            except FileNotFoundError as err:
+                error(err)
+                continue
+
+            entries.append((archive_name, source_path, backup_file.length))
+
+        return entries
+
+    @classmethod
+    def _catalog_backup(cls: Type[Util], path: Path, world_dir_name: str,
+                        created: float, entries: int) -> None:
+        """
+        Record a new backup in the catalog.
+        """
+
+        size = path.stat().st_size
+
+        cls.catalog().add(path.name, world_dir_name, created, size, entries,
+                          BackupManifest.hash_file(path, size))
+
+    @classmethod
+    def _compression_executor(cls: Type[Util],
+                              config: Config) -> ProcessPoolExecutor:
+        """
+        Get the pool of compression processes, starting it if needed.
+
+        The pool is kept between archives, so its processes are only
+        spawned once, unless the config of the processes changed or
+        archives are limited (see `save_snapshot`).
+        """
+
+        workers = config.compression_workers
+        args = (workers, cls._archive_read_rate(config),
+                config.archive_io_idle, config.page_cache_hints)
+
+        with cls._compression_pool_lock:
+            pool = cls._compression_pool
+
+            if pool is not None and cls._compression_pool_args == args:
+                return pool
+
+            # forking a process with running threads can deadlock the
+            # child
+            new_pool = ProcessPoolExecutor(max_workers=workers,
+                                           mp_context=get_context('spawn'),
+                                           initializer=cls._configure_worker,
+                                           initargs=args[1:])
+            cls._compression_pool = new_pool
+            cls._compression_pool_args = args
+
+        if pool is not None:
+            pool.shutdown()
+
+        return new_pool
+
+    @classmethod
+    def _configure_worker(cls: Type[Util], read_rate: float, idle: bool,
+                          page_cache_hints: bool) -> None:
+        """
+        Set up a compression process (see `IoThrottle` and `PageCache`).
+        """
+
+        IoThrottle.configure(read_rate, 0.0, idle)
+        PageCache.configure(page_cache_hints)
+
+    @classmethod
+    def _delete_backups(cls: Type[Util], names: List[str]) -> None:
+        """
+        Delete backups (each file, then its record in the catalog), then
+        repository objects not in any manifest left in the backups
+        directory.
+        """
+
+        catalog = cls.catalog()
+
+        for name in names:
+            cls.backups_dir_path().joinpath(name).unlink(missing_ok=True)
+            catalog.remove(name)
+
+        Repository.for_dir(cls.repository_dir_path()).prune(
+            cls.backups_dir_path())
+
+        info(f'Deleted {len(names)} backups')
+
+    @classmethod
+    def _exchange(cls: Type[Util], path: Path, other_path: Path) -> bool:
+        """
+        Atomically exchange two paths, with `renameat2(RENAME_EXCHANGE)`.
+
+        Return whether the paths were exchanged; `False` if the system or
+        file system does not support it.
+        """
+
+        try:
+            renameat2 = CDLL(None, use_errno=True).renameat2
+        except (AttributeError, OSError):
+            return False
+
+        if renameat2(cls._AT_FDCWD, bytes(path), cls._AT_FDCWD,
+                     bytes(other_path), cls._RENAME_EXCHANGE) == 0:
+            return True
+
+        err = get_errno()
+        if err in (ENOSYS, EINVAL):
+            return False
+        raise OSError(err, strerror(err), str(path))
+
+    @classmethod
+    def _extract_world(cls: Type[Util], world_dir_name: str,
+                       entries: List[Tuple[str, Path]]) -> None:
+        """
+        Restore a world from archive entries, given as tuples of the
+        entry name and the path to the archive holding it.
+
+        Entries are extracted in parallel by a pool of threads into a
+        staging directory, which then replaces the world (see
+        `_swap_world`).  Entries of a tar archive are extracted in one
+        pass over it (see `ArchiveReader.extract`).
+        """
+
+        staging_dir_path = cls._staging_dir()
+
+        names_by_archive: Dict[Path, Set[str]] = {}
+        for (name, archive_path) in entries:
+            names_by_archive.setdefault(archive_path, set()).add(name)
+
+            staging_dir_path.joinpath(name).parent.mkdir(parents=True,
+                                                         exist_ok=True)
+
+        archives: List[ArchiveReader] = []
+        try:
+            with ThreadPoolExecutor() as executor:
+                futures: List[Future[None]] = []
+                for (archive_path, names) in names_by_archive.items():
+                    archives.append(ArchiveReader(archive_path))
+                    futures.extend(archives[-1].extract(
+                        names, staging_dir_path, executor))
+
+                for future in futures:
+                    future.result()
+        finally:
+            for archive in archives:
+                archive.close()
+
+        cls._swap_world(staging_dir_path, world_dir_name)
+
+    @classmethod
+    def _fsync_path(cls: Type[Util], path: Union[str, Path]) -> None:
+        """
+        Flush a file or directory to disk.
+        """
+
+        fd = os_open(path, O_RDONLY)
+        try:
+            fsync(fd)
+        finally:
+            close(fd)
+
+    @classmethod
+    def _fsync_tree(cls: Type[Util], dir_path: Path) -> None:
+        """
+        Flush the files and directories under a directory to disk,
+        directories after their entries.
+        """
+
+        for (path, dir_names, file_names) in walk(dir_path, topdown=False):
+            for name in file_names + dir_names:
+                cls._fsync_path(join(path, name))
+
+        cls._fsync_path(dir_path)
+
+    @classmethod
+    def _restore_archive(cls: Type[Util], path: Path) -> None:
+        """
+        Restore a world from an archive, of any format.
 
-        # loop over file names from zip file
+        If the archive has a manifest, the files are taken from the
+        archives it names: the last full backup and the incremental
+        backups since (see `BackupManifest`).
+        """
+
+        manifest = BackupManifest.from_archive(path)
+        if manifest is not None:
+            cls._extract_world(manifest.world_dir_name,
+                               [(file['name'],
+                                 path.parent.joinpath(file['archive']))
+                                for file in manifest.files.values()])
+            return
+
+        with ArchiveReader(path) as archive:
+            name_list = archive.names()
+
+        # loop over file names from archive
         world_name = ''
         for name in name_list:
             my_world_name = name
@@ -287,31 +1029,77 @@ class Util:
                 # subsequent iteration; check agreement
                 error(f'world_name mismatch: {world_name} != {prev_dirname}')
 
-        world_path = cls.worlds_dir_path().joinpath(world_name)
-        if world_path.exists():
-            rmtree(world_path)
+        cls._extract_world(world_name, [(name, path) for name in name_list])
 
-        for name in name_list:
-            src = zip_file.open(name)
-            file_dir = dirname(cls.worlds_dir_path().joinpath(name))
-            Path(file_dir).mkdir(parents=True, exist_ok=True)
-            dst = open(cls.worlds_dir_path().joinpath(name), mode='wb')
-            copyfileobj(src, dst)
+    @classmethod
+    def _restore_manifest(cls: Type[Util], path: Path) -> None:
+        """
+        Restore a world from a repository manifest.
+        """
 
-        info(f'Restored "{basename(path)}"')
+        world_dir_name = Repository.read_manifest(path)['world']
+
+        staging_dir_path = cls._staging_dir()
+        Repository.for_dir(cls.repository_dir_path()).restore(
+            path, staging_dir_path)
+
+        cls._swap_world(staging_dir_path, world_dir_name)
 
     @classmethod
-    def temp_dir_path(cls: Type[Util]) -> Path:
+    def _staging_dir(cls: Type[Util]) -> Path:
         """
-        Get the path to the application temporary directory.
+        Make a new staging directory for restoring a world.
+
+        It is in the application directory, next to the worlds directory
+        (so on the same file system, and the world can be renamed into
+        place), and unique to the restore: directories left behind by an
+        earlier restore are never reused or deleted.
         """
 
-        return cls.base_dir_path().joinpath(cls._TEMP_DIR_NAME)
+        restore_dir_path = cls.base_dir_path().joinpath(cls._RESTORE_DIR_NAME)
+        restore_dir_path.mkdir(parents=True, exist_ok=True)
+
+        for path in restore_dir_path.iterdir():
+            error(f'Left behind by an earlier restore: {path}')
+
+        return Path(mkdtemp(dir=restore_dir_path))
 
     @classmethod
-    def worlds_dir_path(cls: Type[Util]) -> Path:
+    def _swap_world(cls: Type[Util], staging_dir_path: Path,
+                    world_dir_name: str) -> None:
         """
-        Get the path to the server worlds directory.
+        Replace a world with its restored copy in the staging directory.
+
+        Restored files are flushed to disk, then the restored world and
+        the current world are exchanged in one atomic rename, if the file
+        system supports it.  Otherwise, the current world is moved aside,
+        and moved back if the restored world cannot be moved into its
+        place.  The current world is only deleted once the restored world
+        is in place.
         """
 
-        return Path.cwd().joinpath(cls._WORLDS_DIR_NAME)
+        world_path = cls.worlds_dir_path().joinpath(world_dir_name)
+        restored_path = staging_dir_path.joinpath(world_dir_name)
+        old_path = staging_dir_path.joinpath(f'{world_dir_name}.old')
+
+        restored_path.mkdir(exist_ok=True)
+        cls._fsync_tree(staging_dir_path)
+
+        if not world_path.exists():
+            rename(restored_path, world_path)
+        elif not cls._exchange(restored_path, world_path):
+            rename(world_path, old_path)
+            try:
+                rename(restored_path, world_path)
+            except OSError:
+                try:
+                    rename(old_path, world_path)
+                except OSError:
+                    error(f'The world was moved to {old_path}')
+                    raise
+                rmtree(staging_dir_path)
+                raise
+
+        cls._fsync_path(cls.worlds_dir_path())
+
+        rmtree(staging_dir_path)
@@ -0,0 +1,53 @@
+"""
+Provide class VerifyWorker.
+"""
+
+from __future__ import annotations
+
+from logging import warning
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from .archive_verifier import ArchiveVerifier
+from .metrics import Metrics
+from .util import Util
+from .worker_status import WorkerStatus
+
+if TYPE_CHECKING:
+    from .config import Config
+
+
+class VerifyWorker:
+    """
+    Provide a class to do the heavy lifting of verifying backups.
+    """
+
+    def __init__(self: VerifyWorker, config: Config) -> None:
+        self.status: WorkerStatus = WorkerStatus.IDLE
+        self._config: Config = config
+
+    def verify(self: VerifyWorker) -> None:
+        """
+        Verify backups that changed since they were last verified.
+        """
+
+        if self.status is not WorkerStatus.IDLE:
+            warning('previous verification not completed; ' +
+                    'not starting a new one')
+            return
+
+        self.status = WorkerStatus.WORKING
+        start = monotonic()
+
+        try:
+            statuses = Util.verify_backups(self._config)
+        except Exception:
+            Metrics.record_failure('verify')
+            raise
+        finally:
+            self.status = WorkerStatus.IDLE
+
+        Metrics.record_verify(
+            monotonic() - start,
+            sum(1 for status in statuses.values()
+                if status != ArchiveVerifier.OK))
@@ -0,0 +1,142 @@
+"""
+Provide class WorldActivity.
+"""
+
+from __future__ import annotations
+
+from hashlib import sha256
+from os import stat, walk
+from os.path import join, relpath
+from threading import Lock
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Final, Optional, Set, Type
+
+
+class WorldActivity:
+    """
+    Track whether players were online since the last backup.
+
+    Players are tracked from the lines the server prints when they
+    connect and disconnect.  A world is idle if no player was online
+    since the last backup started, and (checked from metadata only) no
+    file in the worlds directory changed since it was backed up,
+    so scheduled backups of idle worlds can be skipped (see
+    `Config.skip_idle_backups`).
+
+    Until a backup finished, worlds are never idle.  Methods can be
+    called from any thread.
+    """
+
+    _CONNECTED: Final[bytes] = b'Player connected: '
+    _DISCONNECTED: Final[bytes] = b'Player disconnected: '
+    _MARKER: Final[bytes] = b'Player '
+    _NAME_END: Final[bytes] = b', xuid'
+
+    @classmethod
+    def fingerprint(cls: Type[WorldActivity], worlds_dir_path: Path) -> str:
+        """
+        Hash the names, lengths, and modification times of all files in
+        a directory, without reading them.
+        """
+
+        hasher = sha256()
+
+        for (dir_path, dir_names, file_names) in walk(worlds_dir_path):
+            dir_names.sort()
+
+            for file_name in sorted(file_names):
+                path = join(dir_path, file_name)
+                try:
+                    stat_result = stat(path)
+                except FileNotFoundError:
+                    continue
+
+                hasher.update((f'{relpath(path, worlds_dir_path)}\0' +
+                               f'{stat_result.st_size}\0' +
+                               f'{stat_result.st_mtime_ns}\n').encode())
+
+        return hasher.hexdigest()
+
+    @classmethod
+    def mentions_players(cls: Type[WorldActivity], pending: bytes,
+                         chunk: bytes) -> bool:
+        """
+        Check if a chunk of server output (after the incomplete line
+        `pending`) may hold a player connecting or disconnecting, i.e.
+        if it is worth splitting into lines (see `Util.split_lines`).
+        """
+
+        overlap = len(cls._MARKER) - 1
+
+        return (cls._MARKER in chunk
+                or cls._MARKER in pending[-overlap:] + chunk[:overlap])
+
+    def __init__(self: WorldActivity) -> None:
+        self._active: bool = True
+        self._fingerprint: Optional[str] = None
+        self._lock: Lock = Lock()
+        self._online: Set[bytes] = set()
+
+    def backup_failed(self: WorldActivity) -> None:
+        """
+        Note that a backup failed, so the next one is not skipped.
+        """
+
+        with self._lock:
+            self._active = True
+
+    def backup_finished(self: WorldActivity, fingerprint: str) -> None:
+        """
+        Note that a backup finished, with the fingerprint of the worlds
+        directory (see `fingerprint`) taken right before saving was held
+        for it.
+        """
+
+        with self._lock:
+            self._fingerprint = fingerprint
+
+    def backup_started(self: WorldActivity) -> None:
+        """
+        Note that a backup started, so only players online from now on
+        make the world active.
+        """
+
+        with self._lock:
+            self._active = bool(self._online)
+
+    def idle(self: WorldActivity, fingerprint: str) -> bool:
+        """
+        Check if no player was online since the last backup started,
+        and the worlds directory has the same fingerprint as when it was
+        taken.
+        """
+
+        with self._lock:
+            return (not self._active and not self._online
+                    and fingerprint == self._fingerprint)
+
+    def scan_line(self: WorldActivity, line: bytes) -> None:
+        """
+        Track a player connecting or disconnecting, from a line of server
+        output (without its line ending).
+        """
+
+        for (marker, connected) in [(self._CONNECTED, True),
+                                    (self._DISCONNECTED, False)]:
+            index = line.find(marker)
+            if index < 0:
+                continue
+
+            name = line[index + len(marker):].split(self._NAME_END)[0]
+
+            with self._lock:
+                if connected:
+                    self._online.add(name)
+                    self._active = True
+                else:
+                    self._online.discard(name)
+
+            return
@@ -0,0 +1,152 @@
+"""
+Provide class WorldIndex.
+"""
+
+from __future__ import annotations
+
+from os import scandir, stat
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import ClassVar, Dict, List, Set, Tuple, Type
+
+
+class WorldIndex:
+    """
+    Map file names to paths within a world directory.
+
+    The world directory is walked once with `scandir` and the result is
+    kept between backups.  Refreshing the index only rescans directories
+    whose modification time changed (which happens when files are added
+    to or removed from them) and drops directories that disappeared.
+
+    One index is shared per world directory; use `for_world` to get it.
+    """
+
+    _indexes: ClassVar[Dict[Path, WorldIndex]] = {}
+    _indexes_lock: ClassVar[Lock] = Lock()
+
+    @classmethod
+    def for_world(cls: Type[WorldIndex], world_dir_path: Path) -> WorldIndex:
+        """
+        Get the shared index for a world directory.
+        """
+
+        with cls._indexes_lock:
+            index = cls._indexes.get(world_dir_path)
+
+            if index is None:
+                index = cls(world_dir_path)
+                cls._indexes[world_dir_path] = index
+
+            return index
+
+    def __init__(self: WorldIndex, world_dir_path: Path) -> None:
+        # directory path -> (mtime, file names, subdirectory paths)
+        self._dirs: Dict[str, Tuple[int, List[str], List[str]]] = {}
+        self._lock: Lock = Lock()
+        # file name -> directory paths
+        self._names: Dict[str, Set[str]] = {}
+        self._world_dir_path: Path = world_dir_path
+
+    def find(self: WorldIndex, name: str) -> List[Path]:
+        """
+        Get the paths of all files in the world with the given name.
+
+        If no file is found, the index is refreshed (fully, if an
+        incremental refresh does not help) in case the file is new.
+        """
+
+        found = self._find(name)
+
+        if len(found) == 0:
+            self.refresh()
+            found = self._find(name)
+
+        if len(found) == 0:
+            self.refresh(full=True)
+            found = self._find(name)
+
+        return found
+
+    def refresh(self: WorldIndex, full: bool = False) -> None:
+        """
+        Bring the index up to date with the world directory.
+
+        Only changed directories are rescanned unless `full` is set.
+        """
+
+        with self._lock:
+            if full:
+                self._dirs = {}
+                self._names = {}
+
+            seen: Set[str] = set()
+            self._refresh_dir(str(self._world_dir_path), seen)
+
+            for dir_path in set(self._dirs) - seen:
+                self._forget_dir(dir_path)
+
+    def _find(self: WorldIndex, name: str) -> List[Path]:
+        with self._lock:
+            return [
+                Path(dir_path, name)
+                for dir_path in sorted(self._names.get(name, set()))
+            ]
+
+    def _forget_dir(self: WorldIndex, dir_path: str) -> None:
+        """
+        Remove a directory (but not its subdirectories) from the index.
+        """
+
+        (_mtime, file_names, _subdir_paths) = self._dirs.pop(dir_path)
+
+        for file_name in file_names:
+            dir_paths = self._names[file_name]
+            dir_paths.discard(dir_path)
+
+            if len(dir_paths) == 0:
+                del self._names[file_name]
+
+    def _refresh_dir(self: WorldIndex, dir_path: str, seen: Set[str]) -> None:
+        """
+        Refresh a directory and its subdirectories, if they changed.
+        """
+
+        try:
+            mtime = stat(dir_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+
+        seen.add(dir_path)
+
+        cached = self._dirs.get(dir_path)
+        if cached is not None and cached[0] == mtime:
+            subdir_paths = cached[2]
+        else:
+            if cached is not None:
+                self._forget_dir(dir_path)
+
+            file_names: List[str] = []
+            subdir_paths = []
+
+            try:
+                with scandir(dir_path) as itr:
+                    for entry in itr:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdir_paths.append(entry.path)
+                        else:
+                            file_names.append(entry.name)
+            except FileNotFoundError:
+                seen.discard(dir_path)
+                return
+
+            for file_name in file_names:
+                self._names.setdefault(file_name, set()).add(dir_path)
+
+            self._dirs[dir_path] = (mtime, file_names, subdir_paths)
+
+        for subdir_path in subdir_paths:
+            self._refresh_dir(subdir_path, seen)
@@ -4,23 +4,33 @@ Provide class Wrapper.
 
 from __future__ import annotations
 
+from functools import partial
 from logging import exception, info
 from pathlib import Path, PurePath
 from signal import SIGINT, signal
 from subprocess import PIPE, Popen
-from sys import stderr, stdin
-from threading import Thread, Timer
+from sys import stderr, stdin, stdout
+from threading import Lock, Thread
+from time import monotonic
 from typing import TYPE_CHECKING
 
 from .config import Config
 from .backup_worker import BackupWorker
 from .cleanup_worker import CleanupWorker
+from .control_server import ControlServer
+from .metrics import Metrics
+from .page_cache import PageCache
+from .scheduled_job import ScheduledJob
+from .scheduler import Scheduler
+from .server_log import ServerLog
 from .util import Util
+from .verify_worker import VerifyWorker
 from .worker_status import WorkerStatus
+from .world_activity import WorldActivity
 
 if TYPE_CHECKING:
     from types import FrameType
-    from typing import Dict, Final, Optional, Type
+    from typing import Any, Dict, Final, List, Optional, Type
 
 
 class Wrapper:
@@ -28,7 +38,23 @@ class Wrapper:
     Wrap bedrock server instance.
 
     Threads are created for stdin, stdout, and stderr, in addition to a
-    Timer thread for performing the backup.
+    Scheduler thread for starting backups, cleanups, and verifications,
+    and, as configured, a control socket (see `ControlServer`).
+    """
+
+    BACKUP_PRIORITY: Final[int] = 0
+    """
+    Scheduling priority of backups (cleanups wait for backups)
+    """
+
+    CLEANUP_PRIORITY: Final[int] = 1
+    """
+    Scheduling priority of cleanups
+    """
+
+    VERIFY_PRIORITY: Final[int] = 2
+    """
+    Scheduling priority of verifications (they wait for everything else)
     """
 
     _SERVER_BIN: Final[str] = 'bedrock_server'
@@ -48,11 +74,15 @@ class Wrapper:
 
     def __init__(self: Wrapper, config: Config) -> None:
         self._config = config
-        self._proc: 'Optional[Popen[str]]' = None
+        self._control_server: Optional[ControlServer] = None
+        self._proc: 'Optional[Popen[bytes]]' = None
+        self._scheduler: Scheduler = Scheduler()
+        self._server_log: Optional[ServerLog] = None
+        self._stdin_lock: Lock = Lock()
         self._threads: Dict[str, Thread] = {}
-        self._timers: Dict[str, Timer] = {}
         self._backup_worker: Optional[BackupWorker] = None
         self._cleanup_worker: Optional[CleanupWorker] = None
+        self._verify_worker: Optional[VerifyWorker] = None
 
         signal(SIGINT, self._signal_sigint)
 
@@ -61,23 +91,23 @@ class Wrapper:
         Start the bedrock server, run the wrapper.
         """
 
+        Metrics.configure(self._config)
+        # for snapshots, which are taken before archiving configures it
+        PageCache.configure(self._config.page_cache_hints)
+
+        if self._config.log_capture:
+            self._server_log = ServerLog.from_config(self._config)
+            self._server_log.start()
+
         self._proc = Popen([self.server_bin_path()],
-                           bufsize=1,
                            stderr=PIPE,
                            stdin=PIPE,
-                           stdout=PIPE,
-                           text=True)
+                           stdout=PIPE)
 
-        self._backup_worker = BackupWorker(self._proc)
-        self._cleanup_worker = CleanupWorker()
+        self._start_workers()
 
-        self._timers['next_backup'] = Timer(self._config.backup_interval,
-                                            self._thread_backup_timer)
-        self._timers['next_backup'].name = 'next_backup'
-
-        self._timers['next_cleanup'] = Timer(self._config.cleanup_interval,
-                                             self._thread_cleanup_timer)
-        self._timers['next_cleanup'].name = 'next_cleanup'
+        for job in self._jobs():
+            self._scheduler.add(job)
 
         self._threads['setup'] = Thread(name='setup', target=Util.ensure_setup)
 
@@ -89,27 +119,35 @@ class Wrapper:
                                         target=self._thread_stdin)
 
         self._threads['stdout'] = Thread(name='stdout',
-                                         target=self._backup_worker.thread_stdout)
+                                         target=self._thread_stdout)
 
-        for timer in self._timers.values():
-            timer.start()
+        self._scheduler.start()
 
         for thread in self._threads.values():
             thread.start()
 
+        if self._config.control_socket:
+            # after setup, since status reads the catalog
+            self._threads['setup'].join()
+
+            self._start_control_server()
+
         for key in ['setup', 'stderr', 'stdout']:
             self._threads[key].join()
 
-        self._timers['next_backup'].cancel()
-        self._timers['next_cleanup'].cancel()
+        if self._control_server is not None:
+            self._control_server.stop()
 
-        if self._timers.get('cur_backup') is not None:
-            self._timers['cur_backup'].join()
+        if self._server_log is not None:
+            self._server_log.stop()
 
-        if self._timers.get('cur_cleanup') is not None:
-            self._timers['cur_cleanup'].join()
+        # waits for a running backup or cleanup to finish
+        self._scheduler.stop()
 
-    def _signal_sigint(self: Wrapper, _signum: int, _frame: FrameType) -> None:
+        Util.shutdown_compression()
+
+    def _signal_sigint(self: Wrapper, _signum: int,
+                       _frame: Optional[FrameType]) -> None:
         """
         Handle sigint by terminating the server and printing a line.
         """
@@ -117,83 +155,239 @@ class Wrapper:
         assert self._proc is not None
 
         self._proc.terminate()
-        print()
+        print(flush=True)
 
-    def _thread_backup_timer(self: Wrapper) -> None:
+    def _job_backup(self: Wrapper) -> None:
         """
-        Set the next timer, start a new backup if one is not running.
+        Start a new backup if one is not running, and (as configured) the
+        adaptive interval passed and the world is not idle.
         """
 
         assert self._backup_worker is not None
 
-        this_backup = self._timers['next_backup']
-        this_backup.name = 'this_backup'
-
-        self._timers['next_backup'] = Timer(self._config.backup_interval,
-                                            self._thread_backup_timer)
-        self._timers['next_backup'].name = 'next_backup'
-        self._timers['next_backup'].start()
-
         if self._backup_worker.status is not WorkerStatus.IDLE:
             info('previous backup not completed; not attempting new backup')
+            Metrics.record_skip('backup')
             return
 
-        self._timers['cur_backup'] = this_backup
-        self._timers['cur_backup'].name = 'cur_backup'
+        if not self._backup_worker.interval.due(monotonic(),
+                                                Util.worlds_dir_path()):
+            info('adaptive backup interval not passed; skipping backup')
+            return
+
+        if (self._config.skip_idle_backups
+                and self._backup_worker.activity.idle(
+                    WorldActivity.fingerprint(Util.worlds_dir_path()))):
+            info('no players online and no changes since the last backup; ' +
+                 'skipping backup')
+            Metrics.record_idle_skip()
+            return
 
         try:
             self._backup_worker.backup()
         except RuntimeError as error:
             exception('backup failed', exc_info=error)
 
-    def _thread_cleanup_timer(self: Wrapper) -> None:
+    def _job_cleanup(self: Wrapper) -> None:
         """
-        Set the next timer, start a new cleanup if one is not running
+        Start a new cleanup if one is not running.
         """
 
         assert self._cleanup_worker is not None
 
-        this_cleanup = self._timers['next_cleanup']
-        this_cleanup.name = 'this_cleanup'
-
-        self._timers['next_cleanup'] = Timer(self._config.cleanup_interval,
-                                             self._thread_cleanup_timer)
-        self._timers['next_cleanup'].name = 'next_cleanup'
-        self._timers['next_cleanup'].start()
-
         if self._cleanup_worker.status is not WorkerStatus.IDLE:
             info('previous cleanup not completed; not attempting new cleanup')
+            Metrics.record_skip('cleanup')
             return
 
-        self._timers['cur_cleanup'] = this_cleanup
-        self._timers['cur_cleanup'].name = 'cur_cleanup'
-
         try:
             self._cleanup_worker.cleanup()
         except RuntimeError as error:
             exception('cleanup failed', exc_info=error)
 
+    def _job_verify(self: Wrapper) -> None:
+        """
+        Start a new verification if one is not running.
+        """
+
+        assert self._verify_worker is not None
+
+        if self._verify_worker.status is not WorkerStatus.IDLE:
+            info('previous verification not completed; ' +
+                 'not attempting new verification')
+            Metrics.record_skip('verify')
+            return
+
+        try:
+            self._verify_worker.verify()
+        except RuntimeError as error:
+            exception('verification failed', exc_info=error)
+
+    def _jobs(self: Wrapper) -> List[ScheduledJob]:
+        """
+        Get the scheduled jobs for backups, cleanups, and verifications.
+        """
+
+        return [
+            ScheduledJob.from_config('backup', self._job_backup,
+                                     self.BACKUP_PRIORITY,
+                                     self._config.backup_interval,
+                                     self._config.backup_schedule,
+                                     self._config),
+            ScheduledJob.from_config('cleanup', self._job_cleanup,
+                                     self.CLEANUP_PRIORITY,
+                                     self._config.cleanup_interval,
+                                     self._config.cleanup_schedule,
+                                     self._config),
+            ScheduledJob.from_config('verify', self._job_verify,
+                                     self.VERIFY_PRIORITY,
+                                     self._config.verify_interval,
+                                     self._config.verify_schedule,
+                                     self._config),
+        ]
+
+    def _respond(self: Wrapper, line: str) -> str:
+        """
+        Run a command from the control socket, and get the response (see
+        `ControlServer`).
+        """
+
+        assert self._backup_worker is not None
+        assert self._cleanup_worker is not None
+        assert self._verify_worker is not None
+
+        try:
+            (command, argument) = ControlServer.parse(line)
+        except ValueError as err:
+            return ControlServer.error(str(err))
+
+        if command == 'backup now':
+            if self._backup_worker.status is not WorkerStatus.IDLE:
+                return ControlServer.error('a backup is already running')
+
+            try:
+                made = self._run_now(
+                    ScheduledJob('backup', self._backup_worker.backup,
+                                 self.BACKUP_PRIORITY, 0))
+            except Exception as err:  # pylint: disable=broad-except
+                exception('backup failed', exc_info=err)
+                return ControlServer.error(f'backup failed: {err}')
+
+            if not made:
+                return ControlServer.error('a backup is already running')
+
+            return ControlServer.OK
+
+        if command == 'list':
+            return ''.join(f'{backup}\n' for backup in Util.list_backups())
+
+        if command == 'send':
+            if not self._server_running():
+                return ControlServer.error('the server is not running')
+
+            self._backup_worker.command(argument)
+            return ControlServer.OK
+
+        return ControlServer.status({
+            'backup': self._backup_worker.status,
+            'cleanup': self._cleanup_worker.status,
+            'verify': self._verify_worker.status,
+        })
+
+    def _run_now(self: Wrapper, job: ScheduledJob) -> Any:
+        """
+        Run a job once, as soon as no higher priority job is running, and
+        get what it returns (see `Scheduler.run_now`).
+        """
+
+        return self._scheduler.run_now(job)
+
+    def _server_running(self: Wrapper) -> bool:
+        """
+        Check if the server is still running.
+        """
+
+        assert self._proc is not None
+
+        return self._proc.poll() is None
+
+    def _start_control_server(self: Wrapper) -> None:
+        """
+        Start the control socket, as configured (see `ControlServer`).
+        """
+
+        self._control_server = ControlServer(
+            Path(self._config.control_socket).resolve(), self._respond)
+        self._control_server.start()
+
+    def _start_workers(self: Wrapper) -> None:
+        """
+        Create the workers for backups, cleanups, and verifications, once
+        the server is started.
+        """
+
+        self._backup_worker = BackupWorker(self._write_stdin, self._config,
+                                           self._server_log)
+        self._cleanup_worker = CleanupWorker(self._config)
+        self._verify_worker = VerifyWorker(self._config)
 
     def _thread_stderr(self: Wrapper) -> None:
         """
-        Forward server stderr to system stderr.
+        Forward server stderr to system stderr (and the server log, if
+        there is one).
         """
 
         assert self._proc is not None
         assert self._proc.stderr is not None
 
-        line: str
-        for line in self._proc.stderr:
-            print(line, end='', file=stderr)
+        Util.forward_stream(
+            self._proc.stderr, stderr.buffer, None if self._server_log is None
+            else partial(self._server_log.write, 'stderr'))
 
     def _thread_stdin(self: Wrapper) -> None:
         """
         Forward system stdin to server stdin.
+
+        Stdin is forwarded a line at a time, taking turns with commands
+        (see `_write_stdin`).
+        """
+
+        # closed when wrapped by `Supervisor`
+        if stdin.closed:
+            return
+
+        line: bytes
+        while line := stdin.buffer.readline():
+            self._write_stdin(line)
+
+    def _thread_stdout(self: Wrapper) -> None:
+        """
+        Forward server stdout, and hand it to the backup worker to scan
+        (see `BackupWorker.scan_chunk`).
+
+        Output is forwarded as bytes in chunks (see
+        `Util.forward_stream`).
+        """
+
+        assert self._backup_worker is not None
+        assert self._proc is not None
+        assert self._proc.stdout is not None
+
+        Util.forward_stream(self._proc.stdout, stdout.buffer,
+                            self._backup_worker.scan_chunk)
+
+    def _write_stdin(self: Wrapper, data: bytes) -> None:
+        """
+        Write to server stdin, while the server is running.
+
+        Writers (commands, the stdin forwarder, and the control socket)
+        take turns, so lines are never interleaved.
         """
 
         assert self._proc is not None
         assert self._proc.stdin is not None
 
-        line: str
-        for line in stdin:
-            self._proc.stdin.write(line)
+        with self._stdin_lock:
+            if self._server_running():
+                self._proc.stdin.write(data)
+                self._proc.stdin.flush()
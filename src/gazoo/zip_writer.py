@@ -0,0 +1,346 @@
+"""
+Provide class ZipWriter.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from mmap import ACCESS_READ, mmap
+from os import SEEK_END
+from struct import Struct
+from typing import TYPE_CHECKING
+from zipfile import ZIP_STORED, ZipFile, ZipInfo
+from zlib import crc32
+
+from .io_throttle import IoThrottle
+from .page_cache import PageCache
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from types import TracebackType
+    from typing import BinaryIO, Final, List, Optional, Tuple, Type
+
+
+class ZipWriter:
+    """
+    Write a zip archive from entries that were compressed elsewhere.
+
+    `ZipFile` compresses each entry as it is written, so it cannot
+    assemble entries that were compressed in parallel.  Instead, each
+    entry is compressed into a single-entry zip archive (a "part") by
+    `compress_entry`, which can run in any process.  The local header
+    and compressed data of each part are copied verbatim into the final
+    archive; only the central directory is written here.
+
+    Data is never held in memory as a whole: it is streamed in chunks of
+    `_CHUNK_SIZE` or copied by the kernel (`sendfile`).  Source files
+    read and archive data written are counted by `IoThrottle`.
+    """
+
+    _CHUNK_SIZE: Final[int] = 1024 * 1024  # 1 MiB
+
+    _CENTRAL_DIR: Final[Struct] = Struct('<4s4B4HL2L5H2L')
+    _END_OF_CENTRAL_DIR: Final[Struct] = Struct('<4s4H2LH')
+    _LOCAL_HEADER: Final[Struct] = Struct('<4s2B4HL2L2H')
+    _ZIP64_END_OF_CENTRAL_DIR: Final[Struct] = Struct('<4sQ2H2L4Q')
+    _ZIP64_END_OF_CENTRAL_DIR_LOCATOR: Final[Struct] = Struct('<4sLQL')
+    _ZIP64_EXTRA_HEADER: Final[Struct] = Struct('<2H')
+
+    _ZIP64_COUNT_LIMIT: Final[int] = 0xffff
+    _ZIP64_LIMIT: Final[int] = 0xffffffff
+    _ZIP64_VERSION: Final[int] = 45
+
+    _DEFAULT_EXTERNAL_ATTR: Final[int] = 0o600 << 16
+    _UTF8_FLAG: Final[int] = 0x800
+
+    @classmethod
+    def compress_entry(cls: Type[ZipWriter], name: str, source_path: Path,
+                       length: int, compression: int, compresslevel: int,
+                       part_path: Path) -> None:
+        """
+        Compress the first `length` bytes of a file into a part.
+
+        The part, a zip archive with the file as its only entry, is
+        written to `part_path`.
+        """
+
+        zip_info = ZipInfo(name, datetime.now().timetuple()[:6])
+        zip_info.compress_type = compression
+        zip_info.external_attr = cls._DEFAULT_EXTERNAL_ATTR
+        zip_info.file_size = length
+
+        source_file: BinaryIO
+        with source_path.open(mode='rb') as source_file, \
+                ZipFile(part_path, 'w', compression,
+                        compresslevel=compresslevel) as zip_file, \
+                zip_file.open(zip_info, mode='w') as entry_file:
+            PageCache.advise_sequential(source_file, length)
+
+            remaining = length
+            while remaining > 0:
+                chunk = source_file.read(min(remaining, cls._CHUNK_SIZE))
+                if not chunk:
+                    break
+                IoThrottle.read(len(chunk))
+                entry_file.write(chunk)
+                remaining -= len(chunk)
+
+    def __init__(self: ZipWriter, path: Path) -> None:
+        self._entries: List[Tuple[ZipInfo, int]] = []
+        self._file: BinaryIO = path.open(mode='wb')
+
+    def __enter__(self: ZipWriter) -> ZipWriter:
+        return self
+
+    def __exit__(self: ZipWriter, _exc_type: Optional[Type[BaseException]],
+                 _exc_value: Optional[BaseException],
+                 _traceback: Optional[TracebackType]) -> None:
+        self.close()
+
+    @property
+    def entry_count(self: ZipWriter) -> int:
+        """
+        Number of entries written so far
+        """
+
+        return len(self._entries)
+
+    def close(self: ZipWriter) -> None:
+        """
+        Write the central directory and close the archive.
+        """
+
+        if self._file.closed:
+            return
+
+        central_dir_offset = self._file.tell()
+
+        for (zip_info, header_offset) in self._entries:
+            self._write_central_dir_record(zip_info, header_offset)
+
+        central_dir_size = self._file.tell() - central_dir_offset
+        count = len(self._entries)
+
+        if (count >= self._ZIP64_COUNT_LIMIT
+                or central_dir_offset >= self._ZIP64_LIMIT
+                or central_dir_size >= self._ZIP64_LIMIT):
+            zip64_offset = self._file.tell()
+            self._file.write(
+                self._ZIP64_END_OF_CENTRAL_DIR.pack(
+                    b'PK\x06\x06', self._ZIP64_END_OF_CENTRAL_DIR.size - 12,
+                    self._ZIP64_VERSION, self._ZIP64_VERSION, 0, 0, count,
+                    count, central_dir_size, central_dir_offset))
+            self._file.write(
+                self._ZIP64_END_OF_CENTRAL_DIR_LOCATOR.pack(
+                    b'PK\x06\x07', 0, zip64_offset, 1))
+
+            count = min(count, self._ZIP64_COUNT_LIMIT)
+            central_dir_offset = min(central_dir_offset, self._ZIP64_LIMIT)
+            central_dir_size = min(central_dir_size, self._ZIP64_LIMIT)
+
+        self._file.write(
+            self._END_OF_CENTRAL_DIR.pack(b'PK\x05\x06', 0, 0, count, count,
+                                          central_dir_size,
+                                          central_dir_offset, 0))
+
+        self._file.close()
+
+    def write_bytes(self: ZipWriter, name: str, data: bytes) -> None:
+        """
+        Write a (small) stored entry from memory.
+        """
+
+        zip_info = ZipInfo(name, datetime.now().timetuple()[:6])
+        zip_info.compress_type = ZIP_STORED
+        zip_info.external_attr = self._DEFAULT_EXTERNAL_ATTR
+        zip_info.CRC = crc32(data)
+        zip_info.compress_size = len(data)
+        zip_info.file_size = len(data)
+
+        self._entries.append((zip_info, self._file.tell()))
+        self._write_local_header(zip_info)
+        self._file.write(data)
+
+    def write_part(self: ZipWriter, part_path: Path) -> None:
+        """
+        Copy the entry of a part made by `compress_entry` to the archive.
+        """
+
+        with ZipFile(part_path) as part_zip_file:
+            zip_info = part_zip_file.infolist()[0]
+
+        part_file: BinaryIO
+        with part_path.open(mode='rb') as part_file:
+            header_fields = self._LOCAL_HEADER.unpack(
+                part_file.read(self._LOCAL_HEADER.size))
+            entry_length = (self._LOCAL_HEADER.size + header_fields[-2] +
+                            header_fields[-1] + zip_info.compress_size)
+
+            self._entries.append((zip_info, self._file.tell()))
+            self._send(part_file, 0, entry_length)
+
+    def write_stored(self: ZipWriter, name: str, source_path: Path,
+                     length: int) -> None:
+        """
+        Write the first `length` bytes of a file as a stored entry.
+
+        The checksum is calculated from a memory map of the file and the
+        data is then copied directly from the file to the archive.
+        """
+
+        zip_info = ZipInfo(name, datetime.now().timetuple()[:6])
+        zip_info.compress_type = ZIP_STORED
+        zip_info.external_attr = self._DEFAULT_EXTERNAL_ATTR
+        if not name.isascii():
+            zip_info.flag_bits |= self._UTF8_FLAG
+
+        source_file: BinaryIO
+        with source_path.open(mode='rb') as source_file:
+            length = min(length, source_file.seek(0, SEEK_END))
+            PageCache.advise_sequential(source_file, length)
+
+            crc = 0
+            if length > 0:
+                with mmap(source_file.fileno(), length,
+                          access=ACCESS_READ) as source_map:
+                    with memoryview(source_map) as view:
+                        for start in range(0, length, self._CHUNK_SIZE):
+                            IoThrottle.read(
+                                min(length - start, self._CHUNK_SIZE))
+                            crc = crc32(view[start:start + self._CHUNK_SIZE],
+                                        crc)
+
+            zip_info.CRC = crc
+            zip_info.compress_size = length
+            zip_info.file_size = length
+
+            self._entries.append((zip_info, self._file.tell()))
+            self._write_local_header(zip_info)
+            self._send(source_file, 0, length)
+
+    def _send(self: ZipWriter, source_file: BinaryIO, offset: int,
+              length: int) -> None:
+        """
+        Append `length` bytes of a file, starting at `offset`, to the
+        archive.
+
+        The kernel copies the data (`sendfile`) where that is supported,
+        in chunks of `_CHUNK_SIZE`, so the copy can be throttled.
+        """
+
+        self._file.flush()
+
+        sent = 0
+        try:
+            # pylint: disable=import-outside-toplevel
+            from os import sendfile
+            while sent < length:
+                count = sendfile(self._file.fileno(), source_file.fileno(),
+                                 offset + sent,
+                                 min(length - sent, self._CHUNK_SIZE))
+                if count == 0:
+                    break
+                IoThrottle.write(count)
+                sent += count
+        except (ImportError, OSError):
+            self._file.seek(0, SEEK_END)
+            source_file.seek(offset + sent)
+            while sent < length:
+                chunk = source_file.read(
+                    min(length - sent, self._CHUNK_SIZE))
+                if not chunk:
+                    break
+                IoThrottle.write(len(chunk))
+                self._file.write(chunk)
+                sent += len(chunk)
+            return
+
+        self._file.seek(0, SEEK_END)
+
+    def _write_central_dir_record(self: ZipWriter, zip_info: ZipInfo,
+                                  header_offset: int) -> None:
+        """
+        Write the central directory record for one entry.
+        """
+
+        extra_values: List[int] = []
+
+        file_size = zip_info.file_size
+        if file_size >= self._ZIP64_LIMIT:
+            extra_values.append(file_size)
+            file_size = self._ZIP64_LIMIT
+
+        compress_size = zip_info.compress_size
+        if compress_size >= self._ZIP64_LIMIT:
+            extra_values.append(compress_size)
+            compress_size = self._ZIP64_LIMIT
+
+        if header_offset >= self._ZIP64_LIMIT:
+            extra_values.append(header_offset)
+            header_offset = self._ZIP64_LIMIT
+
+        extract_version = zip_info.extract_version
+        extra = b''
+        if extra_values:
+            extract_version = max(extract_version, self._ZIP64_VERSION)
+            extra = self._ZIP64_EXTRA_HEADER.pack(1, 8 * len(extra_values))
+            extra += b''.join(
+                value.to_bytes(8, 'little') for value in extra_values)
+
+        (dos_date, dos_time) = self._dos_date_time(zip_info)
+        name = zip_info.filename.encode('utf-8')
+
+        self._file.write(
+            self._CENTRAL_DIR.pack(b'PK\x01\x02',
+                                   max(zip_info.create_version,
+                                       extract_version),
+                                   zip_info.create_system, extract_version, 0,
+                                   zip_info.flag_bits,
+                                   zip_info.compress_type,
+                                   dos_time, dos_date, zip_info.CRC,
+                                   compress_size, file_size, len(name),
+                                   len(extra), 0, 0, zip_info.internal_attr,
+                                   zip_info.external_attr, header_offset))
+        self._file.write(name)
+        self._file.write(extra)
+
+    def _write_local_header(self: ZipWriter, zip_info: ZipInfo) -> None:
+        """
+        Write the local header for an entry of known size and checksum.
+        """
+
+        compress_size = zip_info.compress_size
+        file_size = zip_info.file_size
+        extract_version = zip_info.extract_version
+
+        extra = b''
+        if max(compress_size, file_size) >= self._ZIP64_LIMIT:
+            extract_version = max(extract_version, self._ZIP64_VERSION)
+            extra = self._ZIP64_EXTRA_HEADER.pack(1, 16)
+            extra += file_size.to_bytes(8, 'little')
+            extra += compress_size.to_bytes(8, 'little')
+            compress_size = self._ZIP64_LIMIT
+            file_size = self._ZIP64_LIMIT
+
+        (dos_date, dos_time) = self._dos_date_time(zip_info)
+        name = zip_info.filename.encode('utf-8')
+
+        self._file.write(
+            self._LOCAL_HEADER.pack(b'PK\x03\x04', extract_version, 0,
+                                    zip_info.flag_bits,
+                                    zip_info.compress_type, dos_time,
+                                    dos_date, zip_info.CRC, compress_size,
+                                    file_size, len(name), len(extra)))
+        self._file.write(name)
+        self._file.write(extra)
+
+    @staticmethod
+    def _dos_date_time(zip_info: ZipInfo) -> Tuple[int, int]:
+        """
+        Get the MS-DOS date and time fields for an entry.
+        """
+
+        (year, month, day, hour, minute, second) = zip_info.date_time
+
+        return ((year - 1980) << 9 | month << 5 | day,
+                hour << 11 | minute << 5 | second // 2)
@@ -0,0 +1,97 @@
+"""
+Provide class `StubServerTestCase`.
+"""
+
+from __future__ import annotations
+
+from configparser import ConfigParser
+from io import BytesIO
+from pathlib import Path
+from signal import SIGINT, getsignal, signal
+from sys import executable
+from typing import TYPE_CHECKING
+from unittest.mock import MagicMock, patch
+from zipfile import ZipFile
+
+from gazoo.config import Config
+from gazoo.util import Util
+from gazoo.wrapper import Wrapper
+
+from .temp_cwd_test_case import TempCwdTestCase
+
+if TYPE_CHECKING:
+    from typing import Final, Type
+
+
+class StubServerTestCase(TempCwdTestCase):
+    """
+    Provide a stub bedrock server to run a wrapper around, in a
+    temporary working directory.
+
+    The stub echoes every line it gets as `got <line>`, answers save
+    queries with the one file of its world, and exits once saving is
+    resumed.
+    """
+
+    _SCRIPT: Final[str] = f'''#!{executable}
+from sys import stdin
+
+print('[INFO] Server started.', flush=True)
+for line in stdin:
+    command = line.strip()
+    print(f'got {{command}}', flush=True)
+    if command == 'save query':
+        print('Data saved. Files are now ready to be copied.', flush=True)
+        print('world/level.dat:3', flush=True)
+    elif command == 'save resume':
+        break
+'''
+
+    def setUp(self: StubServerTestCase) -> None:
+        super().setUp()
+
+        # the wrappers handle SIGINT
+        self.addCleanup(signal, SIGINT, getsignal(SIGINT))
+
+        level_path = Util.worlds_dir_path().joinpath('world', 'level.dat')
+        level_path.parent.mkdir(parents=True)
+        level_path.write_bytes(b'abc')
+
+        self.server_bin_path: Path = Path.cwd().joinpath('bedrock_server')
+        self.server_bin_path.write_text(self._SCRIPT, encoding='utf-8')
+        self.server_bin_path.chmod(0o755)
+
+    def assert_wraps(self: StubServerTestCase,
+                     wrapper_class: Type[Wrapper]) -> None:
+        """
+        Run a wrapper until the stub exits, with a line on stdin and
+        backups every second.
+
+        Assert that the line was forwarded to the stub, the output of
+        the stub and the backup commands were forwarded to stdout, and a
+        scheduled backup was made.
+        """
+
+        parser = ConfigParser()
+        parser.read_string(Config.PREAMBLE + 'backup_interval=1\n')
+
+        stdin = MagicMock(closed=False, buffer=BytesIO(b'say hi\n'))
+        stdout = MagicMock(buffer=BytesIO())
+
+        with patch.object(Wrapper, 'server_bin_path',
+                          return_value=self.server_bin_path), \
+                patch('gazoo.wrapper.stdin', new=stdin), \
+                patch('gazoo.backup_worker.stdout', new=stdout), \
+                patch(f'{wrapper_class.__module__}.stdout', new=stdout):
+            wrapper_class(Config(parser)).run()
+
+        output = stdout.buffer.getvalue()
+        self.assertIn(b'got say hi\n', output)
+        self.assertIn(b'save hold\n', output)
+        self.assertIn(b'got save resume\n', output)
+
+        archives = list(Util.backups_dir_path().glob('world *.zip'))
+        self.assertEqual(len(archives), 1)
+        with ZipFile(archives[0]) as zip_file:
+            self.assertEqual(zip_file.read(str(Path('world', 'level.dat'))),
+                             b'abc')
@@ -0,0 +1,143 @@
+"""
+Test module `gazoo.adaptive_interval`.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from unittest import main
+
+from gazoo.adaptive_interval import AdaptiveInterval
+from gazoo.backup_file import BackupFile
+
+from .helpers.temp_cwd_test_case import TempCwdTestCase
+
+
+class TestAdaptiveInterval(TempCwdTestCase):
+    """
+    Test class `AdaptiveInterval`.
+    """
+
+    _MIB = 1024 * 1024
+
+    def test_changed_bytes(self: TestAdaptiveInterval) -> None:
+        """
+        Test `AdaptiveInterval.changed_bytes`.
+
+        Expect new files counted in full, files with a new length counted
+        by the difference, and unchanged or removed files not counted.
+        """
+
+        self.assertEqual(
+            AdaptiveInterval.changed_bytes(
+                {
+                    'world/db/000001.ldb': 100,
+                    'world/db/000002.log': 50,
+                    'world/db/000003.ldb': 70,
+                }, {
+                    'world/db/000001.ldb': 100,
+                    'world/db/000002.log': 80,
+                    'world/db/000004.ldb': 200,
+                }), 230)
+
+    def test_due(self: TestAdaptiveInterval) -> None:
+        """
+        Test `AdaptiveInterval.due`.
+
+        Expect always due when not enabled or before the first backup,
+        and otherwise due once the interval passed (rounded to the
+        nearest request).
+        """
+
+        disabled = AdaptiveInterval(60, 0, self._MIB, 0.0)
+        disabled.record([], 0.0, 1.0)
+        self.assertTrue(disabled.due(1.0))
+
+        interval = AdaptiveInterval(60, 600, self._MIB, 0.0)
+        self.assertTrue(interval.due(0.0))
+
+        interval.record([], 0.0, 1.0)
+        interval.record([], 60.0, 1.0)  # nothing changed: maximum
+        self.assertEqual(interval.interval, 600)
+        self.assertFalse(interval.due(600.0))
+        self.assertTrue(interval.due(631.0))
+
+    def test_due_changed(self: TestAdaptiveInterval) -> None:
+        """
+        Test `AdaptiveInterval.due` with the worlds directory, after a
+        quiet spell.
+
+        Expect a backup made before the (maximum) interval passed once
+        the change target changed on disk, but not before the I/O budget
+        allows.
+        """
+
+        db_dir_path = Path('worlds', 'world', 'db')
+        db_dir_path.mkdir(parents=True)
+        db_dir_path.joinpath('000001.ldb').write_bytes(b'x' * 100)
+
+        interval = AdaptiveInterval(60, 3600, 1000, 0.1)
+        interval.record([BackupFile('world/000001.ldb', 100)], 0.0, 10.0)
+        interval.record([BackupFile('world/000001.ldb', 100)], 60.0, 10.0)
+        self.assertEqual(interval.interval, 3600)
+
+        self.assertFalse(interval.due(180.0, Path('worlds')))
+
+        db_dir_path.joinpath('000002.ldb').write_bytes(b'x' * 1000)
+        self.assertFalse(interval.due(120.0))
+        self.assertFalse(interval.due(120.0, Path('worlds')))  # budget
+        self.assertTrue(interval.due(180.0, Path('worlds')))
+
+    def test_disk_lengths(self: TestAdaptiveInterval) -> None:
+        """
+        Test `AdaptiveInterval.disk_lengths`.
+
+        Expect the length of every file, named by world and file name.
+        """
+
+        db_dir_path = Path('worlds', 'world', 'db')
+        db_dir_path.mkdir(parents=True)
+        db_dir_path.joinpath('000001.ldb').write_bytes(b'abc')
+        Path('worlds', 'world', 'level.dat').write_bytes(b'ab')
+
+        self.assertEqual(AdaptiveInterval.disk_lengths(Path('worlds')), {
+            str(Path('world', '000001.ldb')): 3,
+            str(Path('world', 'level.dat')): 2,
+        })
+
+    def test_record(self: TestAdaptiveInterval) -> None:
+        """
+        Test `AdaptiveInterval.record`.
+
+        Expect the minimum before the change rate is known, then the
+        interval for the change target, at least as long as the I/O
+        budget allows, and within the minimum and maximum.
+        """
+
+        interval = AdaptiveInterval(60, 3600, 10 * self._MIB, 0.1)
+        interval.record([BackupFile('world/db/000001.ldb', 0)], 0.0, 1.0)
+        self.assertEqual(interval.interval, 60)
+
+        # 10 MiB in 100 seconds
+        interval.record([BackupFile('world/db/000001.ldb', 10 * self._MIB)],
+                        100.0, 1.0)
+        self.assertAlmostEqual(interval.interval, 100.0)
+
+        # backups taking 30 seconds may only run every 300 seconds
+        interval.record([BackupFile('world/db/000001.ldb', 20 * self._MIB)],
+                        200.0, 30.0)
+        self.assertAlmostEqual(interval.interval, 300.0)
+
+        # 100 MiB in 100 seconds
+        interval.record([BackupFile('world/db/000001.ldb', 120 * self._MIB)],
+                        300.0, 1.0)
+        self.assertEqual(interval.interval, 60)
+
+        # 1 MiB in 1000 seconds
+        interval.record([BackupFile('world/db/000001.ldb', 121 * self._MIB)],
+                        1300.0, 1.0)
+        self.assertEqual(interval.interval, 3600)
+
+
+if __name__ == '__main__':
+    main()
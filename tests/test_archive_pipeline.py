@@ -0,0 +1,108 @@
+"""
+Test module `gazoo.archive_pipeline`.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tarfile import open as tar_open
+from typing import TYPE_CHECKING
+from unittest import main
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from gazoo.archive_pipeline import ArchivePipeline
+from gazoo.backup_manifest import BackupManifest
+from gazoo.tar_writer import TarWriter
+from gazoo.zip_writer import ZipWriter
+
+from .helpers.temp_cwd_test_case import TempCwdTestCase
+
+if TYPE_CHECKING:
+    from typing import List, Tuple
+
+
+class TestArchivePipeline(TempCwdTestCase):
+    """
+    Test class `ArchivePipeline`.
+    """
+
+    def setUp(self: TestArchivePipeline) -> None:
+        super().setUp()
+
+        self.parts_dir_path: Path = Path('parts')
+        self.parts_dir_path.mkdir()
+
+        self.entries: List[Tuple[str, Path, int]] = []
+        for index in range(8):
+            path = Path(f'{index}.ldb')
+            path.write_bytes(bytes([index]) * (index + 1) * 1000)
+            self.entries.append((path.name, path, path.stat().st_size))
+
+    def test_run(self: TestArchivePipeline) -> None:
+        """
+        Test `ArchivePipeline.run` with queues one file deep.
+
+        Expect a zip archive with every file, in order, then the
+        manifest, and no parts left over.
+        """
+
+        manifest = BackupManifest('world', 0)
+        with ThreadPoolExecutor(max_workers=2) as executor, ZipWriter(
+                Path('archive.zip')) as writer:
+            pipeline = ArchivePipeline(writer, ZIP_DEFLATED, 6, executor,
+                                       self.parts_dir_path, 1, 1)
+            pipeline.run(self.entries, None, False, manifest, 'archive.zip')
+
+        self.assertEqual(pipeline.archived, self.entries)
+        self.assertEqual(list(manifest.files), [
+            name for (name, _path, _length) in self.entries
+        ])
+        self.assertEqual(list(self.parts_dir_path.iterdir()), [])
+
+        with ZipFile('archive.zip') as zip_file:
+            self.assertEqual(zip_file.namelist(), [
+                *(name for (name, _path, _length) in self.entries),
+                BackupManifest.ENTRY_NAME
+            ])
+            self.assertEqual(zip_file.read('7.ldb'), b'\x07' * 8000)
+
+    def test_run_incremental(self: TestArchivePipeline) -> None:
+        """
+        Test `ArchivePipeline.run` to a tar archive, with a previous
+        manifest and a missing file.
+
+        Expect the manifest first, then only the changed file, and the
+        missing file left out of the manifest.
+        """
+
+        previous = BackupManifest('world', 0)
+        for (name, path, length) in self.entries:
+            previous.add(name, length, path.stat().st_mtime_ns,
+                         BackupManifest.hash_file(path, length),
+                         'previous.tar.xz')
+
+        self.entries[2][1].write_bytes(b'\x09' * 3000)
+        self.entries[5][1].unlink()
+
+        manifest = BackupManifest('world', 1)
+        with ThreadPoolExecutor(max_workers=2) as executor, TarWriter(
+                Path('archive.tar.xz'), 'xz', 6) as writer:
+            pipeline = ArchivePipeline(writer, 'xz', 6, executor,
+                                       self.parts_dir_path, 1, 1)
+            pipeline.run(self.entries, previous, False, manifest,
+                         'archive.tar.xz')
+
+        self.assertEqual([name for (name, _path, _length) in
+                          pipeline.archived], ['2.ldb'])
+        self.assertNotIn('5.ldb', manifest.files)
+        self.assertEqual(manifest.archive_names(),
+                         {'archive.tar.xz', 'previous.tar.xz'})
+
+        with tar_open('archive.tar.xz', mode='r:xz') as tar_file:
+            self.assertEqual(tar_file.getnames(),
+                             [BackupManifest.ENTRY_NAME, '2.ldb'])
+
+
+if __name__ == '__main__':
+    main()
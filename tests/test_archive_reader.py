@@ -0,0 +1,96 @@
+"""
+Test module `gazoo.archive_reader`.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import main
+from zipfile import ZipFile
+
+from gazoo.archive_reader import ArchiveReader
+from gazoo.tar_writer import TarWriter
+
+from .helpers.temp_cwd_test_case import TempCwdTestCase
+
+
+class TestArchiveReader(TempCwdTestCase):
+    """
+    Test class `ArchiveReader`.
+    """
+
+    def setUp(self: TestArchiveReader) -> None:
+        super().setUp()
+
+        self.archive_paths = [Path('archive.zip'), Path('archive.tar.xz')]
+
+        with ZipFile(self.archive_paths[0], mode='w') as zip_file:
+            zip_file.writestr('manifest.json', b'{}')
+            zip_file.writestr('world/level.dat', b'gazoo')
+
+        with TarWriter(self.archive_paths[1], 'xz', 1) as tar_writer:
+            tar_writer.write_bytes('manifest.json', b'{}')
+            tar_writer.write_bytes('world/level.dat', b'gazoo')
+
+    def test_detect_format(self: TestArchiveReader) -> None:
+        """
+        Test `ArchiveReader.detect_format`.
+
+        Expect the format from the contents, whatever the name, and
+        `ValueError` for anything else.
+        """
+
+        self.archive_paths[1].rename('archive.zip.bak')
+
+        self.assertEqual(ArchiveReader.detect_format(self.archive_paths[0]),
+                         'zip')
+        self.assertEqual(
+            ArchiveReader.detect_format(Path('archive.zip.bak')), 'tar.xz')
+
+        Path('other').write_bytes(b'gazoo')
+        self.assertRaises(ValueError, ArchiveReader.detect_format,
+                          Path('other'))
+
+    def test_extract(self: TestArchiveReader) -> None:
+        """
+        Test `ArchiveReader.extract` with every format.
+
+        Expect only the files asked for to be extracted.
+        """
+
+        for archive_path in self.archive_paths:
+            with self.subTest(archive_path=archive_path):
+                dest_dir_path = Path(f'{archive_path}.d')
+                dest_dir_path.joinpath('world').mkdir(parents=True)
+
+                with ArchiveReader(archive_path) as archive, \
+                        ThreadPoolExecutor() as executor:
+                    for future in archive.extract({'world/level.dat'},
+                                                  dest_dir_path, executor):
+                        future.result()
+
+                self.assertEqual(
+                    dest_dir_path.joinpath('world', 'level.dat').read_bytes(),
+                    b'gazoo')
+                self.assertFalse(
+                    dest_dir_path.joinpath('manifest.json').exists())
+
+    def test_read(self: TestArchiveReader) -> None:
+        """
+        Test `ArchiveReader.read` with every format.
+
+        Expect the contents of a file, or None for a missing file.
+        """
+
+        for archive_path in self.archive_paths:
+            with self.subTest(archive_path=archive_path), \
+                    ArchiveReader(archive_path) as archive:
+                self.assertEqual(archive.names(),
+                                 ['manifest.json', 'world/level.dat'])
+                self.assertEqual(archive.read('world/level.dat'), b'gazoo')
+                self.assertIsNone(archive.read('world/missing'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Test module `gazoo.archive_slots`.
+"""
+
+from __future__ import annotations
+
+from multiprocessing import get_context
+from unittest import TestCase, main
+
+from gazoo.archive_slots import ArchiveSlots
+
+
+def _hold_slot(slots: ArchiveSlots) -> None:
+    """
+    Take a slot and exit without giving it back (in a process).
+    """
+
+    slots.acquire()
+
+
+class TestArchiveSlots(TestCase):
+    """
+    Test class `ArchiveSlots`.
+    """
+
+    def test_acquire(self: TestArchiveSlots) -> None:
+        """
+        Test `ArchiveSlots.acquire` and `ArchiveSlots.release`.
+
+        Expect no more slots taken than there are, until one is given
+        back, and `ValueError` when giving back a slot not taken.
+        """
+
+        slots = ArchiveSlots(get_context('spawn'), 2)
+
+        self.assertTrue(slots.acquire())
+        self.assertTrue(slots.acquire(block=False))
+        self.assertFalse(slots.acquire(block=False))
+
+        slots.release()
+        self.assertTrue(slots.acquire(block=False))
+
+        slots.release()
+        slots.release()
+        self.assertRaises(ValueError, slots.release)
+
+    def test_free(self: TestArchiveSlots) -> None:
+        """
+        Test `ArchiveSlots.free` with a process that exited holding a
+        slot.
+
+        Expect the slot taken until freed, and only the slots of that
+        process freed.
+        """
+
+        context = get_context('spawn')
+        slots = ArchiveSlots(context, 1)
+
+        process = context.Process(target=_hold_slot, args=[slots])
+        process.start()
+        process.join()
+
+        self.assertEqual(process.exitcode, 0)
+        self.assertFalse(slots.acquire(block=False))
+
+        assert process.pid is not None
+        self.assertEqual(slots.free(process.pid + 1), 0)
+        self.assertEqual(slots.free(process.pid), 1)
+        self.assertTrue(slots.acquire(block=False))
+
+
+if __name__ == '__main__':
+    main()
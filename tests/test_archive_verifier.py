@@ -0,0 +1,160 @@
+"""
+Test module `gazoo.archive_verifier`.
+"""
+
+from __future__ import annotations
+
+from hashlib import sha256
+from pathlib import Path
+from unittest import main
+from unittest.mock import patch
+from typing import TYPE_CHECKING
+from zipfile import ZipFile
+
+from gazoo.archive_verifier import ArchiveVerifier
+from gazoo.catalog import Catalog
+from gazoo.repository import Repository
+from gazoo.token_bucket import TokenBucket
+
+from .helpers.temp_cwd_test_case import TempCwdTestCase
+
+if TYPE_CHECKING:
+    from typing import Any
+
+
+class TestArchiveVerifier(TempCwdTestCase):
+    """
+    Test class `ArchiveVerifier`.
+    """
+
+    def setUp(self: TestArchiveVerifier) -> None:
+        super().setUp()
+
+        self.backups_dir_path: Path = Path('backups')
+        self.backups_dir_path.mkdir()
+        self.catalog: Catalog = Catalog(Path('catalog.sqlite3'))
+        self.repository: Repository = Repository(Path('repository'))
+
+    def test_verify(self: TestArchiveVerifier) -> None:
+        """
+        Test `ArchiveVerifier.verify`.
+
+        Expect intact, corrupt, and missing backups to be told apart, and
+        the outcomes to be recorded in the catalog.
+        """
+
+        self._add_zip('a.zip', 100.0)
+        self._add_zip('b.zip', 200.0)
+        self.catalog.add('c.zip', 'world', 300.0, 1, 1, 'checksum')
+
+        with self.backups_dir_path.joinpath('b.zip').open(mode='r+b') as file:
+            file.write(b'PK\x03\x04corrupt')
+
+        self.assertEqual(self._verifier().verify(), {
+            'c.zip': ArchiveVerifier.MISSING,
+            'b.zip': ArchiveVerifier.CORRUPT,
+            'a.zip': ArchiveVerifier.OK,
+        })
+        self.assertEqual(self.catalog.verifications()['b.zip']['status'],
+                         ArchiveVerifier.CORRUPT)
+
+    def test_verify_cleaned_up(self: TestArchiveVerifier) -> None:
+        """
+        Test `ArchiveVerifier.verify` with a backup cleaned up while it is
+        verified.
+
+        Expect no verification recorded for it, and it left out.
+        """
+
+        self._add_zip('a.zip', 100.0)
+        self._add_zip('b.zip', 200.0)
+        verifier = self._verifier()
+        # pylint: disable=protected-access
+        verify_backup = verifier._verify_backup
+
+        def clean_up(backup: Any) -> str:
+            if backup['name'] == 'b.zip':
+                self.catalog.remove('b.zip')
+            return verify_backup(backup)
+
+        with patch.object(verifier, '_verify_backup', side_effect=clean_up):
+            self.assertEqual(verifier.verify(), {'a.zip': ArchiveVerifier.OK})
+
+        self.assertEqual(list(self.catalog.verifications()), ['a.zip'])
+
+    def test_verify_legacy(self: TestArchiveVerifier) -> None:
+        """
+        Test `ArchiveVerifier.verify` with a backup without a checksum.
+
+        Expect its entries to be checked, and its checksum recorded.
+        """
+
+        path = self._add_zip('a.zip', 100.0)
+        self.catalog.add('a.zip', 'world', 100.0, path.stat().st_size, 1)
+
+        self.assertEqual(self._verifier().verify(),
+                         {'a.zip': ArchiveVerifier.OK})
+        self.assertEqual(self.catalog.recent()[0]['checksum'],
+                         sha256(path.read_bytes()).hexdigest())
+
+    def test_verify_repository(self: TestArchiveVerifier) -> None:
+        """
+        Test `ArchiveVerifier.verify` with repository backups.
+
+        Expect a backup to be corrupt if one of its objects is.
+        """
+
+        digest = sha256(b'data').hexdigest()
+        object_path = self.repository.object_path(digest)
+        object_path.parent.mkdir(parents=True)
+        object_path.write_bytes(b'date')
+
+        manifest_path = self.backups_dir_path.joinpath('a.json')
+        manifest_path.write_text('{"version": 1, "world": "world", ' +
+                                 '"files": [{"name": "world/level.dat", ' +
+                                 f'"length": 4, "sha256": "{digest}"}}]}}')
+        self.catalog.add('a.json', 'world', 100.0,
+                         manifest_path.stat().st_size, 1,
+                         sha256(manifest_path.read_bytes()).hexdigest())
+
+        self.assertEqual(self._verifier().verify(),
+                         {'a.json': ArchiveVerifier.CORRUPT})
+
+    def test_verify_unchanged(self: TestArchiveVerifier) -> None:
+        """
+        Test `ArchiveVerifier.verify` with backups verified before.
+
+        Expect the last outcome to be reused without reading the backup,
+        unless forced.
+        """
+
+        self._add_zip('a.zip', 100.0)
+        self._verifier().verify()
+
+        self.catalog.set_checksum('a.zip', 'changed')
+
+        self.assertEqual(self._verifier().verify(),
+                         {'a.zip': ArchiveVerifier.OK})
+        self.assertEqual(self._verifier().verify(force=True),
+                         {'a.zip': ArchiveVerifier.CORRUPT})
+
+    def _add_zip(self: TestArchiveVerifier, name: str,
+                 created: float) -> Path:
+        path = self.backups_dir_path.joinpath(name)
+
+        with ZipFile(path, mode='w') as zip_file:
+            zip_file.writestr('world/level.dat', b'level' * 100)
+
+        data = path.read_bytes()
+        self.catalog.add(name, 'world', created, len(data), 1,
+                         sha256(data).hexdigest())
+
+        return path
+
+    def _verifier(self: TestArchiveVerifier) -> ArchiveVerifier:
+        return ArchiveVerifier(self.catalog, self.backups_dir_path,
+                               self.repository, TokenBucket(0), 2)
+
+
+if __name__ == '__main__':
+    main()
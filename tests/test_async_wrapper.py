@@ -0,0 +1,31 @@
+"""
+Test module `gazoo.async_wrapper`.
+"""
+
+from __future__ import annotations
+
+from unittest import main
+
+from gazoo.async_wrapper import AsyncWrapper
+
+from .helpers.stub_server_test_case import StubServerTestCase
+
+
+class TestAsyncWrapper(StubServerTestCase):
+    """
+    Test class `AsyncWrapper`.
+    """
+
+    def test_run(self: TestAsyncWrapper) -> None:
+        """
+        Test `AsyncWrapper.run` with a stub server.
+
+        Expect stdin forwarded to the server, its output and the backup
+        commands forwarded to stdout, and a scheduled backup made.
+        """
+
+        self.assert_wraps(AsyncWrapper)
+
+
+if __name__ == '__main__':
+    main()
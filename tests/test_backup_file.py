@@ -105,5 +105,5 @@ class TestBackupFile(TempCwdTestCase):
         self.assertEqual(backup_file.world_dir_name, 'worldname')
 
 
-if __name__ == 'main':
+if __name__ == '__main__':
     main()
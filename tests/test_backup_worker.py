@@ -0,0 +1,211 @@
+"""
+Test module `gazoo.backup_worker`.
+"""
+
+from __future__ import annotations
+
+from configparser import ConfigParser
+from pathlib import Path
+from unittest import main
+from unittest.mock import MagicMock, patch
+
+from gazoo.backup_worker import BackupWorker
+from gazoo.config import Config
+from gazoo.util import Util
+from gazoo.worker_status import WorkerStatus
+from gazoo.world_activity import WorldActivity
+
+from .helpers.temp_cwd_test_case import TempCwdTestCase
+
+
+class TestBackupWorker(TempCwdTestCase):
+    """
+    Test class `BackupWorker`.
+    """
+
+    def test_backup(self: TestBackupWorker) -> None:
+        """
+        Test `BackupWorker.backup` with a world changed after saving
+        resumed.
+
+        Expect the commands echoed to stdout as bytes, the world not idle
+        after the backup, since the change was not in it, and no backup
+        made while one is running.
+        """
+
+        write_stdin = MagicMock()
+        worker = self._worker(write_stdin)
+
+        level_path = Util.worlds_dir_path().joinpath('world', 'level.dat')
+        level_path.parent.mkdir(parents=True)
+        level_path.write_bytes(b'abc')
+
+        def save_snapshot(*_args: object) -> None:
+            level_path.write_bytes(b'abcdef')
+
+        with patch.object(worker, '_wait_for_query', return_value=1), \
+                patch.object(Util, 'snapshot_files', return_value=Path()), \
+                patch.object(Util, 'save_snapshot',
+                             side_effect=save_snapshot), \
+                patch('gazoo.backup_worker.stdout') as stdout:
+            self.assertTrue(worker.backup())
+
+        self.assertIs(worker.status, WorkerStatus.IDLE)
+        self.assertEqual(
+            [call.args for call in write_stdin.call_args_list],
+            [(b'save hold\n', ), (b'save resume\n', )])
+        self.assertEqual(
+            [call.args for call in stdout.buffer.write.call_args_list],
+            [(b'save hold\n', ), (b'save resume\n', )])
+
+        worker.status = WorkerStatus.WORKING
+        self.assertFalse(worker.backup())
+        self.assertEqual(write_stdin.call_count, 2)
+        self.assertFalse(
+            worker.activity.idle(
+                WorldActivity.fingerprint(Util.worlds_dir_path())))
+
+    def test_backup_fingerprint(self: TestBackupWorker) -> None:
+        """
+        Test `BackupWorker.backup` with a world that did not change.
+
+        Expect the worlds directory fingerprinted before saving is held,
+        and the world idle after the backup.
+        """
+
+        write_stdin = MagicMock()
+        worker = self._worker(write_stdin)
+        fingerprint = WorldActivity.fingerprint
+
+        def fingerprint_unheld(worlds_dir_path: Path) -> str:
+            self.assertEqual(write_stdin.call_count, 0)
+            return fingerprint(worlds_dir_path)
+
+        Util.worlds_dir_path().joinpath('world').mkdir(parents=True)
+
+        with patch.object(worker, '_wait_for_query', return_value=1), \
+                patch.object(Util, 'snapshot_files', return_value=Path()), \
+                patch.object(Util, 'save_snapshot'), \
+                patch.object(WorldActivity, 'fingerprint',
+                             side_effect=fingerprint_unheld), \
+                patch('gazoo.backup_worker.stdout'):
+            self.assertTrue(worker.backup())
+
+        self.assertTrue(
+            worker.activity.idle(
+                WorldActivity.fingerprint(Util.worlds_dir_path())))
+
+    def test_backup_failed(self: TestBackupWorker) -> None:
+        """
+        Test `BackupWorker.backup` with a snapshot that fails.
+
+        Expect the error raised, saving resumed anyway, and the worker
+        idle again, with the world not idle.
+        """
+
+        write_stdin = MagicMock()
+        worker = self._worker(write_stdin)
+
+        with patch.object(worker, '_wait_for_query', return_value=1), \
+                patch.object(Util, 'snapshot_files',
+                             side_effect=OSError('disk full')), \
+                patch('gazoo.backup_worker.stdout'):
+            self.assertRaises(OSError, worker.backup)
+
+        self.assertIs(worker.status, WorkerStatus.IDLE)
+        self.assertEqual(
+            [call.args for call in write_stdin.call_args_list],
+            [(b'save hold\n', ), (b'save resume\n', )])
+        self.assertFalse(worker.activity.idle(''))
+
+    def test_backup_timeout(self: TestBackupWorker) -> None:
+        """
+        Test `BackupWorker.backup` with a server that never reports the
+        saved files.
+
+        Expect `RuntimeError` once the save query timeout passed, and
+        saving resumed.
+        """
+
+        write_stdin = MagicMock()
+        worker = self._worker(write_stdin, 'save_query_timeout=0\n')
+
+        with patch('gazoo.backup_worker.stdout'):
+            self.assertRaises(RuntimeError, worker.backup)
+
+        self.assertIs(worker.status, WorkerStatus.IDLE)
+        self.assertEqual(write_stdin.call_args_list[-1].args,
+                         (b'save resume\n', ))
+
+    def test_scan_chunk(self: TestBackupWorker) -> None:
+        """
+        Test `BackupWorker.scan_chunk` with lines split across chunks.
+
+        Expect the saved files parsed once their line is complete, and
+        players connecting tracked in any status.
+        """
+
+        worker = self._worker(MagicMock())
+
+        worker.scan_chunk(b'[INFO] Player connected: Steve, xuid: 1\n')
+        worker.scan_chunk(b'[INFO] Player disconnected: Steve, xuid: 1\n')
+        self.assertFalse(worker.activity.idle(''))
+
+        worker.status = WorkerStatus.QUERY
+        worker.scan_chunk(b'Data saved. Files are now ready to be copied.\n' +
+                          b'world/db/0000')
+        self.assertIs(worker.status, WorkerStatus.INFO)
+
+        worker.scan_chunk(b'05.ldb:123, world/level.dat:4\n')
+        self.assertIs(worker.status, WorkerStatus.READY)
+
+        # pylint: disable=protected-access
+        self.assertEqual([(backup_file.path_fragment, backup_file.length)
+                          for backup_file in worker._backup_files],
+                         [(str(Path('world', 'db', '000005.ldb')), 123),
+                          (str(Path('world', 'level.dat')), 4)])
+
+    def test_scan_line(self: TestBackupWorker) -> None:
+        """
+        Test `BackupWorker.scan_line` through a save query.
+
+        Expect INFO after the query response, then READY with the files
+        from the payload; other lines leave the status unchanged.
+        """
+
+        self.assertEqual(
+            BackupWorker.scan_line(WorkerStatus.QUERY,
+                                   b'A previous save has not been completed.'),
+            (WorkerStatus.QUERY, []))
+
+        self.assertEqual(
+            BackupWorker.scan_line(
+                WorkerStatus.QUERY,
+                b'Data saved. Files are now ready to be copied.'),
+            (WorkerStatus.INFO, []))
+
+        (status, backup_files) = BackupWorker.scan_line(
+            WorkerStatus.INFO, b'world/db/000005.ldb:123, world/level.dat:4')
+
+        self.assertIs(status, WorkerStatus.READY)
+        self.assertEqual([(backup_file.world_dir_name, backup_file.length)
+                          for backup_file in backup_files], [('world', 123),
+                                                             ('world', 4)])
+
+        self.assertEqual(
+            BackupWorker.scan_line(
+                WorkerStatus.IDLE,
+                b'Data saved. Files are now ready to be copied.'),
+            (WorkerStatus.IDLE, []))
+
+    def _worker(self: TestBackupWorker,
+                write_stdin: MagicMock,
+                config_string: str = '') -> BackupWorker:
+        parser = ConfigParser()
+        parser.read_string(Config.PREAMBLE + config_string)
+
+        return BackupWorker(write_stdin, Config(parser))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""
+Test module `gazoo.catalog`.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+from unittest import main
+from unittest.mock import patch
+from typing import TYPE_CHECKING
+from zipfile import ZipFile
+
+from gazoo.catalog import Catalog
+
+from .helpers.temp_cwd_test_case import TempCwdTestCase
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, Optional
+
+
+class TestCatalog(TempCwdTestCase):
+    """
+    Test class `Catalog`.
+    """
+
+    def test_find(self: TestCatalog) -> None:
+        """
+        Test `Catalog.find_at`, `Catalog.find_recent`, and
+        `Catalog.recent`.
+
+        Expect the newest backup at or before a time, the backups by
+        number from the most recent one back, None past either end, and
+        the backups of one world if asked.
+        """
+
+        catalog = Catalog(Path('catalog.sqlite3'))
+        for (name, created) in [('b', 200.0), ('a', 100.0), ('c', 300.0)]:
+            catalog.add(name, 'world', created, 1, 1)
+        catalog.add('d', 'other', 150.0, 1, 1)
+
+        self.assertIsNone(catalog.find_at(99.0))
+        self.assertEqual(self._name(catalog.find_at(100.0)), 'a')
+        self.assertEqual(self._name(catalog.find_at(299.0)), 'b')
+
+        self.assertEqual(self._name(catalog.find_recent(1)), 'c')
+        self.assertEqual(self._name(catalog.find_recent(4)), 'a')
+        self.assertIsNone(catalog.find_recent(5))
+
+        catalog.remove('c')
+        self.assertEqual([backup['name'] for backup in catalog.recent()],
+                         ['b', 'd', 'a'])
+        self.assertEqual(
+            [backup['name'] for backup in catalog.recent('world')],
+            ['b', 'a'])
+
+    def test_for_path(self: TestCatalog) -> None:
+        """
+        Test `Catalog.for_path` with existing backups.
+
+        Expect the backups to be imported with the time from their name,
+        other files to be ignored, and files named like backups that
+        cannot be read to be skipped.
+        """
+
+        backups_dir_path = Path('backups')
+        backups_dir_path.mkdir()
+        with ZipFile(backups_dir_path.joinpath(
+                'my world 2024-01-31 18-00-00.zip'), 'w') as zip_file:
+            zip_file.writestr('my world/level.dat', b'abc')
+        backups_dir_path.joinpath('notes.txt').touch()
+        backups_dir_path.joinpath('my world 2024-01-30 18-00-00.zip'
+                                  ).write_bytes(b'damaged')
+        backups_dir_path.joinpath('my world 2024-01-29 18-00-00.json'
+                                  ).write_text('{}', encoding='utf-8')
+
+        with self.assertLogs(level='WARNING') as logs:
+            catalog = Catalog.for_path(
+                Path.cwd().joinpath('catalog.sqlite3'), backups_dir_path)
+
+        self.assertEqual(len(logs.records), 2)
+
+        backup = catalog.find_recent(1)
+        assert backup is not None
+        self.assertEqual(backup['world'], 'my world')
+        self.assertEqual(backup['created'],
+                         datetime(2024, 1, 31, 18).timestamp())
+        self.assertEqual(backup['entries'], 1)
+        self.assertIsNone(catalog.find_recent(2))
+
+    def test_for_path_interrupted(self: TestCatalog) -> None:
+        """
+        Test `Catalog.for_path` with an import that fails.
+
+        Expect nothing recorded, and the import done again (and only
+        once) the next time the catalog is asked for.
+        """
+
+        backups_dir_path = Path('backups')
+        backups_dir_path.mkdir()
+        with ZipFile(backups_dir_path.joinpath(
+                'my world 2024-01-31 18-00-00.zip'), 'w') as zip_file:
+            zip_file.writestr('my world/level.dat', b'abc')
+        path = Path.cwd().joinpath('catalog.sqlite3')
+
+        with patch.object(Catalog, '_count_entries',
+                          side_effect=RuntimeError):
+            self.assertRaises(RuntimeError, Catalog.for_path, path,
+                              backups_dir_path)
+
+        self.assertEqual(Catalog(path).recent(), [])
+
+        catalog = Catalog.for_path(path, backups_dir_path)
+        self.assertEqual(len(catalog.recent()), 1)
+
+        with patch.object(Catalog, 'import_dir') as import_dir:
+            self.assertIs(Catalog.for_path(path, backups_dir_path), catalog)
+            # pylint: disable=protected-access
+            Catalog._catalogs.pop(path)
+            Catalog.for_path(path, backups_dir_path)
+
+        import_dir.assert_not_called()
+
+    def test_set_verified(self: TestCatalog) -> None:
+        """
+        Test `Catalog.set_verified` and `Catalog.verifications`.
+
+        Expect the last verification of each backup, forgotten along
+        with the backup, and nothing recorded for a backup not in the
+        catalog.
+        """
+
+        catalog = Catalog(Path('catalog.sqlite3'))
+        catalog.add('a', 'world', 100.0, 1, 1)
+        self.assertTrue(catalog.set_verified('a', 200.0, 1, 2, 'corrupt'))
+        self.assertTrue(catalog.set_verified('a', 300.0, 1, 2, 'ok'))
+        self.assertFalse(catalog.set_verified('b', 300.0, 1, 2, 'ok'))
+
+        self.assertEqual(catalog.verifications(), {
+            'a': {
+                'name': 'a',
+                'verified': 300.0,
+                'size': 1,
+                'mtime_ns': 2,
+                'status': 'ok',
+            },
+        })
+
+        catalog.remove('a')
+        self.assertEqual(catalog.verifications(), {})
+
+    @staticmethod
+    def _name(backup: Optional[Dict[str, Any]]) -> Optional[str]:
+        return None if backup is None else backup['name']
+
+
+if __name__ == '__main__':
+    main()
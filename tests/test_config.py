@@ -6,6 +6,7 @@ from __future__ import annotations
 
 from configparser import ConfigParser
 from unittest import TestCase, main
+from zipfile import ZIP_DEFLATED, ZIP_LZMA
 
 from gazoo.config import Config
 
@@ -21,6 +22,79 @@ class TestConfig(TestCase):
 
         self.config: Config = Config(parser)
 
+    def test_archive_format(self: TestConfig) -> None:
+        """
+        Test `Config.archive_format`.
+
+        Expect str of default value, or of configured value, and
+        `ValueError` for an unknown format.
+        """
+
+        self.assertEqual(self.config.archive_format, 'zip')
+
+        parser: ConfigParser = ConfigParser()
+        parser.read_string(f'{Config.PREAMBLE}archive_format=TAR.XZ\n')
+        self.assertEqual(Config(parser).archive_format, 'tar.xz')
+
+        parser = ConfigParser()
+        parser.read_string(f'{Config.PREAMBLE}archive_format=rar\n')
+        self.assertRaises(ValueError, getattr, Config(parser),
+                          'archive_format')
+
+    def test_archive_io_idle(self: TestConfig) -> None:
+        """
+        Test `Config.archive_io_idle`.
+
+        Expect bool of default value.
+        """
+
+        self.assertEqual(self.config.archive_io_idle, False)
+
+    def test_archive_read_rate(self: TestConfig) -> None:
+        """
+        Test `Config.archive_read_rate`.
+
+        Expect float of default value.
+        """
+
+        self.assertEqual(self.config.archive_read_rate, 0.0)
+
+    def test_archive_write_rate(self: TestConfig) -> None:
+        """
+        Test `Config.archive_write_rate`.
+
+        Expect float of default value.
+        """
+
+        self.assertEqual(self.config.archive_write_rate, 0.0)
+
+    def test_asyncio(self: TestConfig) -> None:
+        """
+        Test `Config.asyncio`.
+
+        Expect bool of default value.
+        """
+
+        self.assertEqual(self.config.asyncio, False)
+
+    def test_backup_backend(self: TestConfig) -> None:
+        """
+        Test `Config.backup_backend`.
+
+        Expect str of default value.
+        """
+
+        self.assertEqual(self.config.backup_backend, 'zip')
+
+    def test_backup_change_target(self: TestConfig) -> None:
+        """
+        Test `Config.backup_change_target`.
+
+        Expect float of default value.
+        """
+
+        self.assertEqual(self.config.backup_change_target, 64.0)
+
     def test_backup_interval(self: TestConfig) -> None:
         """
         Test `Config.backup_interval`.
@@ -30,6 +104,38 @@ class TestConfig(TestCase):
 
         self.assertEqual(self.config.backup_interval, 600)
 
+    def test_backup_interval_max(self: TestConfig) -> None:
+        """
+        Test `Config.backup_interval_max`.
+
+        Expect int of default value.
+        """
+
+        self.assertEqual(self.config.backup_interval_max, 0)
+
+    def test_backup_io_budget(self: TestConfig) -> None:
+        """
+        Test `Config.backup_io_budget`.
+
+        Expect float of default value.
+        """
+
+        self.assertEqual(self.config.backup_io_budget, 0.05)
+
+    def test_backup_schedule(self: TestConfig) -> None:
+        """
+        Test `Config.backup_schedule`.
+
+        Expect None for default value, and `CronExpression` of configured
+        value.
+        """
+
+        self.assertIsNone(self.config.backup_schedule)
+
+        parser: ConfigParser = ConfigParser()
+        parser.read_string(f'{Config.PREAMBLE}backup_schedule=*/15 * * * *\n')
+        self.assertEqual(str(Config(parser).backup_schedule), '*/15 * * * *')
+
     def test_cleanup_interval(self: TestConfig) -> None:
         """
         Test `Config.cleanup_interval`.
@@ -39,6 +145,75 @@ class TestConfig(TestCase):
 
         self.assertEqual(self.config.cleanup_interval, 86400)
 
+    def test_cleanup_schedule(self: TestConfig) -> None:
+        """
+        Test `Config.cleanup_schedule`.
+
+        Expect None for default value.
+        """
+
+        self.assertIsNone(self.config.cleanup_schedule)
+
+    def test_compress_queue_depth(self: TestConfig) -> None:
+        """
+        Test `Config.compress_queue_depth`.
+
+        Expect twice the compression workers for the default value, and
+        int of configured value.
+        """
+
+        self.assertEqual(self.config.compress_queue_depth,
+                         2 * self.config.compression_workers)
+
+        parser: ConfigParser = ConfigParser()
+        parser.read_string(f'{Config.PREAMBLE}compress_queue_depth=3\n')
+        self.assertEqual(Config(parser).compress_queue_depth, 3)
+
+    def test_compression(self: TestConfig) -> None:
+        """
+        Test `Config.compression`.
+
+        Expect `zipfile` constant of default value, or of configured
+        value, and `ValueError` for an unknown method.
+        """
+
+        self.assertEqual(self.config.compression, ZIP_DEFLATED)
+
+        parser: ConfigParser = ConfigParser()
+        parser.read_string(f'{Config.PREAMBLE}compression=LZMA\n')
+        self.assertEqual(Config(parser).compression, ZIP_LZMA)
+
+        parser = ConfigParser()
+        parser.read_string(f'{Config.PREAMBLE}compression=rar\n')
+        self.assertRaises(ValueError, getattr, Config(parser), 'compression')
+
+    def test_compression_level(self: TestConfig) -> None:
+        """
+        Test `Config.compression_level`.
+
+        Expect int of default value.
+        """
+
+        self.assertEqual(self.config.compression_level, 6)
+
+    def test_compression_workers(self: TestConfig) -> None:
+        """
+        Test `Config.compression_workers`.
+
+        Expect a positive int for the default value.
+        """
+
+        self.assertGreaterEqual(self.config.compression_workers, 1)
+
+    def test_control_socket(self: TestConfig) -> None:
+        """
+        Test `Config.control_socket`.
+
+        Expect str of default value.
+        """
+
+        self.assertEqual(self.config.control_socket, '')
+
     def test_debug(self: TestConfig) -> None:
         """
         Test `Config.debug`.
@@ -48,6 +223,216 @@ class TestConfig(TestCase):
 
         self.assertEqual(self.config.debug, False)
 
+    def test_full_backup_every(self: TestConfig) -> None:
+        """
+        Test `Config.full_backup_every`.
+
+        Expect int of default value.
+        """
+
+        self.assertEqual(self.config.full_backup_every, 1)
+
+    def test_keep_daily(self: TestConfig) -> None:
+        """
+        Test `Config.keep_daily`.
+
+        Expect int of default value.
+        """
+
+        self.assertEqual(self.config.keep_daily, 14)
+
+    def test_keep_hourly(self: TestConfig) -> None:
+        """
+        Test `Config.keep_hourly`.
+
+        Expect int of default value.
+        """
+
+        self.assertEqual(self.config.keep_hourly, 24)
+
+    def test_keep_monthly(self: TestConfig) -> None:
+        """
+        Test `Config.keep_monthly`.
+
+        Expect int of default value.
+        """
+
+        self.assertEqual(self.config.keep_monthly, 12)
+
+    def test_keep_weekly(self: TestConfig) -> None:
+        """
+        Test `Config.keep_weekly`.
+
+        Expect int of default value.
+        """
+
+        self.assertEqual(self.config.keep_weekly, 8)
+
+    def test_log_capture(self: TestConfig) -> None:
+        """
+        Test `Config.log_capture`.
+
+        Expect bool of default value.
+        """
+
+        self.assertEqual(self.config.log_capture, True)
+
+    def test_log_keep_days(self: TestConfig) -> None:
+        """
+        Test `Config.log_keep_days`.
+
+        Expect int of default value.
+        """
+
+        self.assertEqual(self.config.log_keep_days, 28)
+
+    def test_log_rotate_interval(self: TestConfig) -> None:
+        """
+        Test `Config.log_rotate_interval`.
+
+        Expect int of default value.
+        """
+
+        self.assertEqual(self.config.log_rotate_interval, 86400)
+
+    def test_log_rotate_size(self: TestConfig) -> None:
+        """
+        Test `Config.log_rotate_size`.
+
+        Expect float of default value.
+        """
+
+        self.assertEqual(self.config.log_rotate_size, 16.0)
+
+    def test_metrics_file(self: TestConfig) -> None:
+        """
+        Test `Config.metrics_file`.
+
+        Expect str of default value.
+        """
+
+        self.assertEqual(self.config.metrics_file, '')
+
+    def test_metrics_port(self: TestConfig) -> None:
+        """
+        Test `Config.metrics_port`.
+
+        Expect int of default value.
+        """
+
+        self.assertEqual(self.config.metrics_port, 0)
+
+    def test_misfire_grace(self: TestConfig) -> None:
+        """
+        Test `Config.misfire_grace`.
+
+        Expect int of default value.
+        """
+
+        self.assertEqual(self.config.misfire_grace, 60)
+
+    def test_misfire_policy(self: TestConfig) -> None:
+        """
+        Test `Config.misfire_policy`.
+
+        Expect str of default value, and `ValueError` for an unknown
+        policy.
+        """
+
+        self.assertEqual(self.config.misfire_policy, 'coalesce')
+
+        parser: ConfigParser = ConfigParser()
+        parser.read_string(f'{Config.PREAMBLE}misfire_policy=retry\n')
+        self.assertRaises(ValueError, getattr, Config(parser),
+                          'misfire_policy')
+
+    def test_page_cache_hints(self: TestConfig) -> None:
+        """
+        Test `Config.page_cache_hints`.
+
+        Expect bool of default value.
+        """
+
+        self.assertEqual(self.config.page_cache_hints, True)
+
+    def test_read_queue_depth(self: TestConfig) -> None:
+        """
+        Test `Config.read_queue_depth`.
+
+        Expect twice the compression workers for the default value, and
+        int of configured value.
+        """
+
+        self.assertEqual(self.config.read_queue_depth,
+                         2 * self.config.compression_workers)
+
+        parser: ConfigParser = ConfigParser()
+        parser.read_string(f'{Config.PREAMBLE}read_queue_depth=1\n')
+        self.assertEqual(Config(parser).read_queue_depth, 1)
+
+    def test_save_query_timeout(self: TestConfig) -> None:
+        """
+        Test `Config.save_query_timeout`.
+
+        Expect int of default value.
+        """
+
+        self.assertEqual(self.config.save_query_timeout, 60)
+
+    def test_schedule_jitter(self: TestConfig) -> None:
+        """
+        Test `Config.schedule_jitter`.
+
+        Expect int of default value.
+        """
+
+        self.assertEqual(self.config.schedule_jitter, 0)
+
+    def test_skip_idle_backups(self: TestConfig) -> None:
+        """
+        Test `Config.skip_idle_backups`.
+
+        Expect bool of default value.
+        """
+
+        self.assertEqual(self.config.skip_idle_backups, True)
+
+    def test_verify_interval(self: TestConfig) -> None:
+        """
+        Test `Config.verify_interval`.
+
+        Expect int of default value.
+        """
+
+        self.assertEqual(self.config.verify_interval, 24 * 60 * 60)
+
+    def test_verify_rate(self: TestConfig) -> None:
+        """
+        Test `Config.verify_rate`.
+
+        Expect float of default value.
+        """
+
+        self.assertEqual(self.config.verify_rate, 16.0)
+
+    def test_verify_schedule(self: TestConfig) -> None:
+        """
+        Test `Config.verify_schedule`.
+
+        Expect None for the default (empty) value.
+        """
+
+        self.assertIsNone(self.config.verify_schedule)
+
+    def test_verify_workers(self: TestConfig) -> None:
+        """
+        Test `Config.verify_workers`.
+
+        Expect int of default value.
+        """
+
+        self.assertEqual(self.config.verify_workers, 2)
+
 
-if __name__ == 'main':
+if __name__ == '__main__':
     main()
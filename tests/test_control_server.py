@@ -0,0 +1,102 @@
+"""
+Test module `gazoo.control_server`.
+"""
+
+from __future__ import annotations
+
+import socketserver
+from pathlib import Path
+from stat import S_IMODE
+from unittest import main, skipIf
+
+from gazoo.control_server import ControlServer
+from gazoo.metrics import Metrics
+from gazoo.util import Util
+from gazoo.worker_status import WorkerStatus
+
+from .helpers.temp_cwd_test_case import TempCwdTestCase
+
+
+class TestControlServer(TempCwdTestCase):
+    """
+    Test class `ControlServer`.
+    """
+
+    def test_parse(self: TestControlServer) -> None:
+        """
+        Test `ControlServer.parse`.
+
+        Expect commands with whitespace normalized, the server command of
+        `send` as given, and `ValueError` for unknown commands or `send`
+        without a server command.
+        """
+
+        self.assertEqual(ControlServer.parse('backup  now\n'),
+                         ('backup now', ''))
+        self.assertEqual(ControlServer.parse('status\n'), ('status', ''))
+        self.assertEqual(ControlServer.parse('send say  hello\n'),
+                         ('send', 'say  hello'))
+
+        self.assertRaises(ValueError, ControlServer.parse, 'backup later')
+        self.assertRaises(ValueError, ControlServer.parse, 'send \n')
+        self.assertRaises(ValueError, ControlServer.parse, '')
+
+    @skipIf(not hasattr(socketserver, 'ThreadingUnixStreamServer'),
+            'no Unix sockets')
+    def test_start(self: TestControlServer) -> None:
+        """
+        Test `ControlServer.start`, `ControlServer.request`, and
+        `ControlServer.stop`.
+
+        Expect a socket only the owner can use (and nothing else left in
+        its directory), which answers requests with the response made for
+        the line sent, and is removed when stopped.
+        """
+
+        socket_path = Path('control.sock').resolve()
+        socket_path.write_text('left behind')
+
+        server = ControlServer(socket_path,
+                               lambda line: f'got {line.strip()}\n')
+        server.start()
+        try:
+            self.assertEqual(S_IMODE(socket_path.stat().st_mode), 0o600)
+            self.assertEqual(list(Path.cwd().iterdir()), [socket_path])
+            self.assertEqual(ControlServer.request(socket_path, 'status'),
+                             'got status\n')
+        finally:
+            server.stop()
+
+        self.assertFalse(socket_path.exists())
+
+    def test_status(self: TestControlServer) -> None:
+        """
+        Test `ControlServer.status`.
+
+        Expect a line per worker, then the last backup in the catalog,
+        and its stats from the metrics.
+        """
+
+        Util.ensure_backups_dir()
+        Util.catalog().add('world 2024-01-01 00-00-00.zip', 'world', 0.0, 10,
+                           2, '')
+        Metrics.reset()
+        Metrics.record_backup(1, {'query': 1, 'snapshot': 2, 'archive': 4})
+
+        lines = ControlServer.status({
+            'backup': WorkerStatus.WORKING,
+            'cleanup': WorkerStatus.IDLE,
+        }).splitlines()
+
+        self.assertEqual(lines[:3], [
+            'backup: working',
+            'cleanup: idle',
+            'last_backup: world 2024-01-01 00-00-00.zip',
+        ])
+        self.assertIn('last_backup_size: 10', lines)
+        self.assertIn('last_backup_seconds: 7', lines)
+        self.assertIn('last_backup_hold_seconds: 3', lines)
+
+
+if __name__ == '__main__':
+    main()
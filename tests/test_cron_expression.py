@@ -0,0 +1,63 @@
+"""
+Test module `gazoo.cron_expression`.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from unittest import TestCase, main
+
+from gazoo.cron_expression import CronExpression
+
+
+class TestCronExpression(TestCase):
+    """
+    Test class `CronExpression`.
+    """
+
+    def test_init(self: TestCronExpression) -> None:
+        """
+        Test `CronExpression.__init__` with invalid expressions.
+
+        Expect `ValueError`.
+        """
+
+        for expression in ['* * * *', '60 * * * *', '*/0 * * * *',
+                           '5-1 * * * *', 'a * * * *']:
+            self.assertRaises(ValueError, CronExpression, expression)
+
+    def test_next_after(self: TestCronExpression) -> None:
+        """
+        Test `CronExpression.next_after`.
+
+        Expect the first matching minute strictly after the given time,
+        with either day field matching if both are restricted.
+        """
+
+        after = datetime(2024, 2, 28, 23, 59, 30)
+
+        self.assertEqual(
+            CronExpression('* * * * *').next_after(after),
+            datetime(2024, 2, 29, 0, 0))
+        self.assertEqual(
+            CronExpression('*/15 * * * *').next_after(
+                datetime(2024, 1, 1, 10, 15)), datetime(2024, 1, 1, 10, 30))
+        self.assertEqual(
+            CronExpression('30 4 1,15 * *').next_after(after),
+            datetime(2024, 3, 1, 4, 30))
+        # 2024-03-03 is a Sunday
+        self.assertEqual(
+            CronExpression('0 0 * 3 7').next_after(after),
+            datetime(2024, 3, 3, 0, 0))
+        self.assertEqual(
+            CronExpression('0 0 13 * 5').next_after(after),
+            datetime(2024, 3, 1, 0, 0))
+        self.assertEqual(
+            CronExpression('0 12 29 2 *').next_after(after),
+            datetime(2024, 2, 29, 12, 0))
+        self.assertRaises(ValueError,
+                          CronExpression('0 0 31 2 *').next_after, after)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Test module `gazoo.io_throttle`.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from unittest import main
+from unittest.mock import patch
+
+from gazoo.backup_manifest import BackupManifest
+from gazoo.io_throttle import IoThrottle
+
+from .helpers.temp_cwd_test_case import TempCwdTestCase
+
+
+class TestIoThrottle(TempCwdTestCase):
+    """
+    Test class `IoThrottle`.
+    """
+
+    def test_limit(self: TestIoThrottle) -> None:
+        """
+        Test `IoThrottle.limit`.
+
+        Expect reads and writes to wait for their own limits within the
+        context, and no waits after it.
+        """
+
+        with patch('gazoo.token_bucket.monotonic', return_value=0.0), \
+                patch('gazoo.token_bucket.sleep') as sleep:
+            with IoThrottle.limit(100.0, 0.0, False):
+                IoThrottle.read(150)
+                sleep.assert_called_once_with(0.5)
+
+                IoThrottle.write(1 << 40)
+                sleep.assert_called_once()
+
+            IoThrottle.read(1 << 40)
+            sleep.assert_called_once()
+
+    def test_limit_hash(self: TestIoThrottle) -> None:
+        """
+        Test `IoThrottle.limit` with files hashed while archiving (see
+        `BackupManifest.hash_file`).
+
+        Expect the bytes hashed to wait for the read limit.
+        """
+
+        path = Path('000001.ldb')
+        path.write_bytes(b'x' * 300)
+
+        with patch('gazoo.token_bucket.monotonic', return_value=0.0), \
+                patch('gazoo.token_bucket.sleep') as sleep:
+            with IoThrottle.limit(100.0, 0.0, False):
+                BackupManifest.hash_file(path, 250)
+                sleep.assert_called_once_with(1.5)
+
+    def test_limit_idle(self: TestIoThrottle) -> None:
+        """
+        Test `IoThrottle.limit` with the idle I/O scheduling class.
+
+        Expect the idle class within the context, and the previous
+        priority restored after it.
+        """
+
+        with patch.object(IoThrottle, '_ioprio',
+                          side_effect=[4, 0, 0]) as ioprio:
+            with IoThrottle.limit(0.0, 0.0, True):
+                ioprio.assert_called_with(1, 3 << 13)
+
+        ioprio.assert_called_with(1, 4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Test module `gazoo.metrics`.
+"""
+
+from __future__ import annotations
+
+from configparser import ConfigParser
+from pathlib import Path
+from socket import socket
+from unittest import main
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from gazoo.config import Config
+from gazoo.metrics import Metrics
+
+from .helpers.temp_cwd_test_case import TempCwdTestCase
+
+
+class TestMetrics(TempCwdTestCase):
+    """
+    Test class `Metrics`.
+    """
+
+    def setUp(self: TestMetrics) -> None:
+        super().setUp()
+
+        Metrics.reset()
+
+    def tearDown(self: TestMetrics) -> None:
+        parser = ConfigParser()
+        parser.read_string(Config.PREAMBLE)
+        Metrics.configure(Config(parser))
+
+        super().tearDown()
+
+    def test_configure(self: TestMetrics) -> None:
+        """
+        Test `Metrics.configure`.
+
+        Expect metrics to be written to the metrics file after a backup,
+        and served at `/metrics` (and nothing else) on the metrics port.
+        """
+
+        with socket() as free_socket:
+            free_socket.bind(('127.0.0.1', 0))
+            port = free_socket.getsockname()[1]
+
+        parser = ConfigParser()
+        parser.read_string(f'{Config.PREAMBLE}metrics_file=metrics.prom\n' +
+                           f'metrics_port={port}\n')
+        Metrics.configure(Config(parser))
+
+        Metrics.record_backup(1, {'query': 1, 'snapshot': 1, 'archive': 1})
+
+        self.assertIn('gazoo_backup_seconds_sum 3\n',
+                      Path('metrics.prom').read_text())
+
+        with urlopen(f'http://127.0.0.1:{port}/metrics') as response:
+            self.assertIn(b'gazoo_backup_seconds_count 1\n', response.read())
+
+        with self.assertRaises(HTTPError):
+            urlopen(f'http://127.0.0.1:{port}/')
+
+    def test_last_backup(self: TestMetrics) -> None:
+        """
+        Test `Metrics.last_backup`.
+
+        Expect no stats before a backup, then the stats of the last one.
+        """
+
+        self.assertEqual(Metrics.last_backup(), {})
+
+        Metrics.record_archive(100, 50)
+        Metrics.record_backup(1, {'query': 1, 'snapshot': 2, 'archive': 4})
+        Metrics.record_backup(1, {'query': 1, 'snapshot': 1, 'archive': 1})
+
+        stats = Metrics.last_backup()
+        self.assertEqual(stats['seconds'], 3)
+        self.assertEqual(stats['hold_seconds'], 2)
+        self.assertEqual(stats['read_bytes'], 100)
+        self.assertEqual(stats['written_bytes'], 50)
+        self.assertIn('timestamp', stats)
+
+    def test_record_backup(self: TestMetrics) -> None:
+        """
+        Test `Metrics.record_backup`.
+
+        Expect summaries of the hold time, total time, and each phase,
+        with the most recent values as gauges.
+        """
+
+        Metrics.record_backup(2, {'query': 1, 'snapshot': 2, 'archive': 4})
+        Metrics.record_backup(4, {'query': 1, 'snapshot': 1, 'archive': 1})
+
+        metrics = Metrics.render()
+
+        for sample in [
+                'gazoo_backup_hold_seconds_sum 5',
+                'gazoo_backup_hold_seconds_count 2',
+                'gazoo_backup_hold_seconds_last 2',
+                'gazoo_backup_seconds_sum 10',
+                'gazoo_backup_query_round_trips_sum 6',
+                'gazoo_backup_phase_seconds_sum{phase="archive"} 5',
+                'gazoo_backup_phase_seconds_last{phase="archive"} 1',
+        ]:
+            self.assertIn(f'{sample}\n', metrics)
+
+    def test_record_output(self: TestMetrics) -> None:
+        """
+        Test `Metrics.record_output`.
+
+        Expect newlines and bytes to be counted across chunks.
+        """
+
+        Metrics.record_output(b'one\ntw')
+        Metrics.record_output(b'o\nthree\n')
+
+        metrics = Metrics.render()
+
+        self.assertIn('gazoo_server_stdout_lines_total 3\n', metrics)
+        self.assertIn('gazoo_server_stdout_bytes_total 14\n', metrics)
+
+    def test_render(self: TestMetrics) -> None:
+        """
+        Test `Metrics.render`.
+
+        Expect every metric to be described, counters and gauges to
+        start at zero, and labels to be kept apart.
+        """
+
+        Metrics.record_skip('backup')
+        Metrics.record_skip('backup')
+        Metrics.record_failure('cleanup')
+
+        metrics = Metrics.render()
+
+        self.assertIn('# TYPE gazoo_backup_seconds summary\n', metrics)
+        self.assertIn('# TYPE gazoo_backup_seconds_last gauge\n', metrics)
+        self.assertIn('gazoo_last_backup_timestamp_seconds 0\n', metrics)
+        self.assertIn('gazoo_skipped_total{job="backup"} 2\n', metrics)
+        self.assertIn('gazoo_failures_total{job="cleanup"} 1\n', metrics)
+
+
+if __name__ == '__main__':
+    main()
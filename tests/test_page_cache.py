@@ -0,0 +1,87 @@
+"""
+Test module `gazoo.page_cache`.
+"""
+
+from __future__ import annotations
+
+from mmap import PAGESIZE
+from pathlib import Path
+from unittest import main
+
+from gazoo.page_cache import PageCache
+
+from .helpers.temp_cwd_test_case import TempCwdTestCase
+
+
+class TestPageCache(TempCwdTestCase):
+    """
+    Test class `PageCache`.
+    """
+
+    def setUp(self: TestPageCache) -> None:
+        super().setUp()
+
+        self.length = 1024 * PAGESIZE
+        self.path = Path('source')
+
+        self.path.write_bytes(b'gazoo' * (self.length // 5 + 1))
+        PageCache.drop_written(self.path)
+
+        with self.path.open(mode='rb') as source_file:
+            resident = PageCache.resident_pages(source_file, self.length)
+
+        if resident is None or any(page & 1 for page in resident):
+            self.skipTest('page cache hints are not supported here')
+
+    def tearDown(self: TestPageCache) -> None:
+        PageCache.configure(True)
+
+        super().tearDown()
+
+    def test_configure(self: TestPageCache) -> None:
+        """
+        Test `PageCache.configure` to turn hints off.
+
+        Expect nothing to be dropped from the page cache.
+        """
+
+        PageCache.configure(False)
+
+        self.assertEqual(
+            PageCache.cached_pages([(self.path, self.length)]), {})
+
+        self.path.read_bytes()
+        PageCache.drop_written(self.path)
+
+        with self.path.open(mode='rb') as source_file:
+            resident = PageCache.resident_pages(source_file, self.length)
+
+        assert resident is not None
+        self.assertTrue(all(page & 1 for page in resident))
+
+    def test_drop_uncached(self: TestPageCache) -> None:
+        """
+        Test `PageCache.cached_pages`, then `PageCache.drop_uncached`
+        after reading.
+
+        Expect the pages that were cached before to stay cached, and the
+        others (past what the kernel may have read ahead) to be dropped.
+        """
+
+        with self.path.open(mode='rb') as source_file:
+            source_file.read(16 * PAGESIZE)
+
+        cached = PageCache.cached_pages([(self.path, self.length)])
+        self.path.read_bytes()
+        PageCache.drop_uncached(cached)
+
+        with self.path.open(mode='rb') as source_file:
+            resident = PageCache.resident_pages(source_file, self.length)
+
+        assert resident is not None
+        self.assertTrue(all(page & 1 for page in resident[:16]))
+        self.assertFalse(any(page & 1 for page in resident[512:]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Test module `gazoo.repository`.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from unittest import main
+
+from gazoo.repository import Repository
+
+from .helpers.temp_cwd_test_case import TempCwdTestCase
+
+
+class TestRepository(TempCwdTestCase):
+    """
+    Test class `Repository`.
+    """
+
+    def setUp(self: TestRepository) -> None:
+        super().setUp()
+
+        self.repository = Repository(Path.cwd().joinpath('repository'))
+        self.source_dir_path = Path.cwd().joinpath('source')
+        self.source_dir_path.mkdir()
+        self.temp_dir_path = Path.cwd().joinpath('temp')
+        self.temp_dir_path.mkdir()
+
+    def test_prune(self: TestRepository) -> None:
+        """
+        Test `Repository.prune`.
+
+        Expect only objects referenced by the manifests in the directory
+        to be kept.
+        """
+
+        manifests_dir_path = Path('manifests')
+        manifests_dir_path.mkdir()
+        self.source_dir_path.joinpath('a').write_bytes(b'aaa')
+        self.source_dir_path.joinpath('b').write_bytes(b'bbb')
+
+        self.repository.store(
+            [('world/a', self.source_dir_path.joinpath('a'), 3)], 'world',
+            manifests_dir_path.joinpath('1.json'), self.temp_dir_path)
+        self.repository.store(
+            [('world/b', self.source_dir_path.joinpath('b'), 3)], 'world',
+            manifests_dir_path.joinpath('2.json'), self.temp_dir_path)
+
+        manifests_dir_path.joinpath('1.json').unlink()
+        self.repository.prune(manifests_dir_path)
+
+        objects = [
+            path for path in Path('repository').glob('objects/*/*')
+            if path.is_file()
+        ]
+        self.assertEqual(len(objects), 1)
+        self.assertEqual(objects[0].read_bytes(), b'bbb')
+
+    def test_store_restore(self: TestRepository) -> None:
+        """
+        Test `Repository.store` and `Repository.restore`.
+
+        Expect identical contents to be stored once, files to be
+        truncated to their length, and the files to be restored.
+        """
+
+        self.source_dir_path.joinpath('a').write_bytes(b'same')
+        self.source_dir_path.joinpath('b').write_bytes(b'same')
+        self.source_dir_path.joinpath('c').write_bytes(b'truncated')
+
+        manifest_path = Path('backup.json')
+        self.repository.store([
+            ('world/db/a', self.source_dir_path.joinpath('a'), 4),
+            ('world/db/b', self.source_dir_path.joinpath('b'), 4),
+            ('world/c', self.source_dir_path.joinpath('c'), 5),
+        ], 'world', manifest_path, self.temp_dir_path)
+
+        manifest = Repository.read_manifest(manifest_path)
+        self.assertEqual(manifest['world'], 'world')
+        self.assertEqual(len(manifest['files']), 3)
+        self.assertEqual(
+            len(list(Path('repository').glob('objects/*/*'))), 2)
+
+        worlds_dir_path = Path.cwd().joinpath('worlds')
+        self.repository.restore(manifest_path, worlds_dir_path)
+
+        self.assertEqual(
+            worlds_dir_path.joinpath('world', 'db', 'a').read_bytes(),
+            b'same')
+        self.assertEqual(
+            worlds_dir_path.joinpath('world', 'db', 'b').read_bytes(),
+            b'same')
+        self.assertEqual(
+            worlds_dir_path.joinpath('world', 'c').read_bytes(), b'trunc')
+
+
+if __name__ == '__main__':
+    main()
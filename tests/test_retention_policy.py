@@ -0,0 +1,149 @@
+"""
+Test module `gazoo.retention_policy`.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+from unittest import TestCase, main
+
+from gazoo.retention_policy import RetentionPolicy
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, List
+
+
+class TestRetentionPolicy(TestCase):
+    """
+    Test class `RetentionPolicy`.
+    """
+
+    def test_keep(self: TestRetentionPolicy) -> None:
+        """
+        Test `RetentionPolicy.keep` with backups every 10 minutes.
+
+        Expect the most recent backup of each of the last hours, days,
+        weeks, and months (up to the limits) to be kept.
+        """
+
+        start = datetime(2024, 1, 1)
+        backups = [{
+            'name': str(num),
+            'created': (start + timedelta(minutes=10 * num)).timestamp(),
+        } for num in reversed(range(6 * 24 * 60))]
+
+        def name_at(time: datetime) -> str:
+            return str((time - start) // timedelta(minutes=10))
+
+        last = start + timedelta(days=60, minutes=-10)
+
+        self.assertEqual(RetentionPolicy(0, 0, 0, 0).keep(backups),
+                         {name_at(last)})
+
+        self.assertEqual(
+            RetentionPolicy(3, 0, 0, 0).keep(backups), {
+                name_at(last - timedelta(hours=hours))
+                for hours in range(3)
+            })
+
+        self.assertEqual(
+            RetentionPolicy(2, 2, 0, 2).keep(backups), {
+                name_at(last),
+                name_at(last - timedelta(hours=1)),
+                name_at(last - timedelta(days=1)),
+                name_at(datetime(2024, 1, 31, 23, 50)),
+            })
+
+        # 2024-02-25 is the last Sunday
+        self.assertEqual(
+            RetentionPolicy(0, 0, 2, 0).keep(backups), {
+                name_at(last),
+                name_at(datetime(2024, 2, 25, 23, 50)),
+            })
+
+    def test_keep_boundaries(self: TestRetentionPolicy) -> None:
+        """
+        Test `RetentionPolicy.keep` with backups on either side of
+        period boundaries, at the turn of a year.
+
+        Expect periods to start at midnight, ISO weeks to span the turn
+        of the year, and months not to.
+        """
+
+        backups = self._backups([
+            datetime(2025, 1, 1, 0, 0),
+            datetime(2024, 12, 31, 23, 59, 59),  # ISO week 1 of 2025
+            datetime(2024, 12, 30, 0, 0),  # Monday
+            datetime(2024, 12, 29, 23, 59, 59),  # Sunday
+        ])
+
+        self.assertEqual(
+            RetentionPolicy(0, 3, 0, 0).keep(backups), {
+                '2025-01-01T00:00:00',
+                '2024-12-31T23:59:59',
+                '2024-12-30T00:00:00',
+            })
+        self.assertEqual(
+            RetentionPolicy(0, 0, 2, 0).keep(backups), {
+                '2025-01-01T00:00:00',
+                '2024-12-29T23:59:59',
+            })
+        self.assertEqual(
+            RetentionPolicy(0, 0, 0, 2).keep(backups), {
+                '2025-01-01T00:00:00',
+                '2024-12-31T23:59:59',
+            })
+        self.assertEqual(
+            RetentionPolicy(2, 0, 0, 0).keep(backups), {
+                '2025-01-01T00:00:00',
+                '2024-12-31T23:59:59',
+            })
+
+    def test_keep_empty(self: TestRetentionPolicy) -> None:
+        """
+        Test `RetentionPolicy.keep` without backups.
+
+        Expect nothing to keep.
+        """
+
+        self.assertEqual(RetentionPolicy(1, 1, 1, 1).keep([]), set())
+        self.assertEqual(RetentionPolicy(0, 0, 0, 0).keep([]), set())
+
+    def test_keep_overlapping(self: TestRetentionPolicy) -> None:
+        """
+        Test `RetentionPolicy.keep` with a backup on the first of each
+        month.
+
+        Expect a backup that counts for several periods to be kept once,
+        periods without backups not to count, and every backup kept if
+        the limits exceed the backups.
+        """
+
+        backups = self._backups(
+            [datetime(2024, month, 1) for month in [4, 3, 2, 1]])
+
+        self.assertEqual(
+            RetentionPolicy(2, 2, 2, 2).keep(backups),
+            {'2024-04-01T00:00:00', '2024-03-01T00:00:00'})
+        self.assertEqual(
+            RetentionPolicy(1, 1, 1, 3).keep(backups), {
+                '2024-04-01T00:00:00',
+                '2024-03-01T00:00:00',
+                '2024-02-01T00:00:00',
+            })
+        self.assertEqual(
+            RetentionPolicy(10, 10, 10, 10).keep(backups),
+            {backup['name']
+             for backup in backups})
+
+    def _backups(self: TestRetentionPolicy,
+                 times: List[datetime]) -> List[Dict[str, Any]]:
+        return [{
+            'name': time.isoformat(),
+            'created': time.timestamp(),
+        } for time in times]
+
+
+if __name__ == '__main__':
+    main()
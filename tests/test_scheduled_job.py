@@ -0,0 +1,67 @@
+"""
+Test module `gazoo.scheduled_job`.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from unittest import TestCase, main
+
+from gazoo.cron_expression import CronExpression
+from gazoo.scheduled_job import ScheduledJob
+
+
+class TestScheduledJob(TestCase):
+    """
+    Test class `ScheduledJob`.
+    """
+
+    def test_next_run(self: TestScheduledJob) -> None:
+        """
+        Test `ScheduledJob.next_run`.
+
+        Expect interval runs on a grid starting at the first call (so
+        missed runs collapse into one), cron runs at matching times, and
+        jitter within bounds.
+        """
+
+        job = ScheduledJob('job', print, 0, 60)
+        self.assertEqual(job.next_run(1000.0), 1060.0)
+        self.assertEqual(job.next_run(1060.0), 1120.0)
+        self.assertEqual(job.next_run(1365.0), 1420.0)
+
+        start = datetime(2024, 1, 1, 10, 7).timestamp()
+        job = ScheduledJob('job', print, 0, 60,
+                           cron=CronExpression('*/15 * * * *'))
+        self.assertEqual(job.next_run(start),
+                         datetime(2024, 1, 1, 10, 15).timestamp())
+
+        job = ScheduledJob('job', print, 0, 60, jitter=10.0)
+        for after in [0.0, 60.0, 120.0]:
+            run_at = job.next_run(after)
+            self.assertGreaterEqual(run_at, after + 60.0)
+            self.assertLessEqual(run_at, after + 70.0)
+
+    def test_should_run(self: TestScheduledJob) -> None:
+        """
+        Test `ScheduledJob.should_run`.
+
+        Expect runs within the grace period to start, and missed runs to
+        start only with the `coalesce` policy.
+        """
+
+        job = ScheduledJob('job', print, 0, 60, misfire_grace=5.0)
+        self.assertTrue(job.should_run(100.0, 104.0))
+        self.assertTrue(job.should_run(100.0, 500.0))
+
+        job = ScheduledJob('job', print, 0, 60, misfire_policy='skip',
+                           misfire_grace=5.0)
+        self.assertTrue(job.should_run(100.0, 104.0))
+        self.assertFalse(job.should_run(100.0, 500.0))
+
+        self.assertRaises(ValueError, ScheduledJob, 'job', print, 0, 60,
+                          misfire_policy='retry')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Test module `gazoo.scheduler`.
+"""
+
+from __future__ import annotations
+
+from threading import Event
+from time import sleep
+from typing import TYPE_CHECKING
+from unittest import TestCase, main
+
+from gazoo.scheduled_job import ScheduledJob
+from gazoo.scheduler import Scheduler
+
+if TYPE_CHECKING:
+    from typing import List
+
+
+class TestScheduler(TestCase):
+    """
+    Test class `Scheduler`.
+    """
+
+    def test_blocked(self: TestScheduler) -> None:
+        """
+        Test `Scheduler` with a due run blocked by a running job.
+
+        Expect a later run of a job that is not blocked to start while
+        the blocking job is still running.
+        """
+
+        cleanup_started = Event()
+        cleanup_ended = Event()
+        backups: List[bool] = []
+
+        def backup() -> None:
+            backups.append(cleanup_ended.is_set())
+
+        def cleanup() -> None:
+            if cleanup_started.is_set():
+                return
+            cleanup_started.set()
+            sleep(0.5)
+            cleanup_ended.set()
+
+        scheduler = Scheduler()
+        scheduler.add(ScheduledJob('cleanup', cleanup, 1, 0.05))
+        scheduler.add(ScheduledJob('verify', lambda: None, 2, 0.1))
+        scheduler.add(ScheduledJob('backup', backup, 0, 0.2))
+        scheduler.start()
+
+        self.assertTrue(cleanup_ended.wait(5.0))
+        scheduler.stop()
+
+        self.assertEqual(backups[:1], [False])
+
+    def test_priority(self: TestScheduler) -> None:
+        """
+        Test `Scheduler` with a long, high priority job.
+
+        Expect a due lower priority job to wait until the high priority
+        job finishes, and `stop` to wait for running jobs.
+        """
+
+        order: List[str] = []
+        started = Event()
+
+        def backup() -> None:
+            if started.is_set():
+                return
+            started.set()
+            order.append('backup start')
+            sleep(0.3)
+            order.append('backup end')
+
+        def cleanup() -> None:
+            order.append('cleanup')
+
+        scheduler = Scheduler()
+        scheduler.add(ScheduledJob('backup', backup, 0, 0.05))
+        scheduler.add(ScheduledJob('cleanup', cleanup, 1, 0.1))
+        scheduler.start()
+
+        self.assertTrue(started.wait(5.0))
+        scheduler.stop()
+
+        self.assertEqual(order[:2], ['backup start', 'backup end'])
+        self.assertNotIn('cleanup', order[:2])
+
+    def test_run_now(self: TestScheduler) -> None:
+        """
+        Test `Scheduler.run_now` with a long, high priority job.
+
+        Expect the job to run in the calling thread, a due lower priority
+        job to wait until it finishes, and what it returns to be returned
+        and its exceptions to be raised.
+        """
+
+        order: List[str] = []
+
+        def backup() -> bool:
+            order.append('backup start')
+            sleep(0.3)
+            order.append('backup end')
+            return True
+
+        def cleanup() -> None:
+            order.append('cleanup')
+
+        def fail() -> None:
+            raise RuntimeError('failed')
+
+        scheduler = Scheduler()
+        scheduler.start()
+        scheduler.add(ScheduledJob('cleanup', cleanup, 1, 0.1))
+        self.assertTrue(scheduler.run_now(ScheduledJob('backup', backup, 0,
+                                                       0)))
+
+        self.assertRaises(RuntimeError, scheduler.run_now,
+                          ScheduledJob('backup', fail, 0, 0))
+        scheduler.stop()
+
+        self.assertEqual(order[:2], ['backup start', 'backup end'])
+
+
+if __name__ == '__main__':
+    main()
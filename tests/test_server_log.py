@@ -0,0 +1,112 @@
+"""
+Test module `gazoo.server_log`.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from json import loads
+from pathlib import Path
+from re import compile as compyle
+from unittest import main
+
+from gazoo.metrics import Metrics
+from gazoo.server_log import ServerLog
+
+from .helpers.temp_cwd_test_case import TempCwdTestCase
+
+
+class TestServerLog(TempCwdTestCase):
+    """
+    Test class `ServerLog`.
+    """
+
+    def test_grep(self: TestServerLog) -> None:
+        """
+        Test `ServerLog.compress_segment` and `ServerLog.grep`.
+
+        Expect a segment compressed into several indexed members, and
+        matching lines in a time range found without decompressing the
+        members out of range.
+        """
+
+        logs_dir_path = Path('logs')
+        logs_dir_path.mkdir()
+        segment_path = logs_dir_path.joinpath('server-20240131-180000-0.log')
+
+        filler = b'x' * 200 * 1024
+        with segment_path.open('wb') as segment:
+            for hour in range(18, 22):
+                segment.write(f'2024-01-31 {hour}:00:00.000 stdout '.encode() +
+                              b'hour ' + str(hour).encode() + b' ' + filler +
+                              b'\n')
+
+        ServerLog.compress_segment(segment_path)
+        self.assertFalse(segment_path.exists())
+
+        index = loads(
+            logs_dir_path.joinpath('server-20240131-180000-0.log.idx')
+            .read_text())
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index[0][2], '2024-01-31 18:00:00.000')
+        self.assertEqual(index[1][3], '2024-01-31 21:00:00.000')
+
+        # make the first member unreadable, to be sure it is skipped
+        gzip_path = logs_dir_path.joinpath('server-20240131-180000-0.log.gz')
+        with gzip_path.open('r+b') as gzip_file:
+            gzip_file.write(b'\0' * 16)
+
+        lines = list(
+            ServerLog.grep(logs_dir_path, compyle(b'hour 2'),
+                           datetime(2024, 1, 31, 20), None))
+
+        self.assertEqual([line[:40] for line in lines], [
+            b'2024-01-31 20:00:00.000 stdout hour 20 x',
+            b'2024-01-31 21:00:00.000 stdout hour 21 x',
+        ])
+        self.assertEqual(
+            list(
+                ServerLog.grep(logs_dir_path, compyle(b'hour'),
+                               datetime(2024, 1, 31, 20),
+                               datetime(2024, 1, 31, 20, 30)))[0][:40],
+            b'2024-01-31 20:00:00.000 stdout hour 20 x')
+
+    def test_write(self: TestServerLog) -> None:
+        """
+        Test `ServerLog.write`, `ServerLog.start`, and `ServerLog.stop`.
+
+        Expect lines of each stream prefixed with the time and stream,
+        also when split across chunks, a compressed segment once
+        stopped, and output written while the buffer is full dropped and
+        counted.
+        """
+
+        Metrics.reset()
+        logs_dir_path = Path('logs')
+        server_log = ServerLog(logs_dir_path, 1024 * 1024, 3600, 0)
+
+        server_log.write('stdout', b'Starting Server\nLev')
+        server_log.write('stderr', b'warning\n')
+        server_log.write('stdout', b'el Name: world\n')
+        server_log.write('stdout', b'x' * 9 * 1024 * 1024)
+
+        server_log.start()
+        server_log.stop()
+
+        self.assertEqual(
+            sorted(path.suffix for path in logs_dir_path.iterdir()),
+            ['.gz', '.idx'])
+
+        lines = list(ServerLog.grep(logs_dir_path, compyle(b'')))
+        self.assertEqual([line[24:] for line in lines], [
+            b'stdout Starting Server\n',
+            b'stderr warning\n',
+            b'stdout Level Name: world\n',
+        ])
+        self.assertIn(
+            f'gazoo_server_log_dropped_bytes_total {9 * 1024 * 1024}',
+            Metrics.render())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Test module `gazoo.supervisor`.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from signal import SIGINT, SIGTERM, getsignal, signal
+from threading import Thread
+from time import monotonic, sleep
+from typing import TYPE_CHECKING
+from unittest import main
+from unittest.mock import patch
+
+from gazoo.archive_slots import ArchiveSlots
+from gazoo.supervisor import Supervisor
+
+from .helpers.temp_cwd_test_case import TempCwdTestCase
+
+if TYPE_CHECKING:
+    from typing import List
+
+
+class TestSupervisor(TempCwdTestCase):
+    """
+    Test class `Supervisor`.
+    """
+
+    def setUp(self: TestSupervisor) -> None:
+        super().setUp()
+
+        # `Supervisor.run` handles signals
+        for signum in [SIGINT, SIGTERM]:
+            self.addCleanup(signal, signum, getsignal(signum))
+
+    def test_read_roots(self: TestSupervisor) -> None:
+        """
+        Test `Supervisor.read_roots`.
+
+        Expect a root for each line that is not empty or a comment,
+        relative to the directory of the file.
+        """
+
+        Path('servers').mkdir()
+        roots_file_path = Path('servers', 'roots.txt')
+        roots_file_path.write_text('# survival\none\n\n  /srv/two  \n')
+
+        self.assertEqual(Supervisor.read_roots(roots_file_path),
+                         [Path('servers', 'one'), Path('/srv/two')])
+
+    def test_run(self: TestSupervisor) -> None:
+        """
+        Test `Supervisor.run` with servers that exit by themselves.
+
+        Expect a process for each root, working in it, and the archive
+        slots of each process freed once it exited.
+        """
+
+        roots = self._make_roots(2, '#!/bin/sh\ntouch started\n')
+        supervisor = Supervisor(roots, 1)
+
+        with patch.object(ArchiveSlots, 'free', autospec=True,
+                          return_value=0) as free:
+            supervisor.run()
+
+        # pylint: disable=protected-access
+        processes = supervisor._processes
+        self.assertEqual([process.exitcode for process in processes],
+                         [0, 0])
+        self.assertTrue(
+            all(root.joinpath('started').exists() for root in roots))
+        self.assertEqual(sorted(call.args[1] for call in free.call_args_list),
+                         sorted(process.pid for process in processes))
+
+    def test_run_stop(self: TestSupervisor) -> None:
+        """
+        Test `Supervisor.run` terminated while the servers run.
+
+        Expect every server stopped, and their processes to exit
+        cleanly.
+        """
+
+        roots = self._make_roots(2,
+                                 '#!/bin/sh\ntouch started\nexec sleep 30\n')
+        supervisor = Supervisor(roots, 1)
+
+        def stop() -> None:
+            deadline = monotonic() + 30.0
+            while (monotonic() < deadline and not all(
+                    root.joinpath('started').exists() for root in roots)):
+                sleep(0.1)
+
+            # pylint: disable=protected-access
+            supervisor._signal_sigterm(SIGTERM, None)
+
+        stopper = Thread(target=stop)
+        stopper.start()
+        supervisor.run()
+        stopper.join()
+
+        # pylint: disable=protected-access
+        self.assertEqual(
+            [process.exitcode for process in supervisor._processes], [0, 0])
+
+    def _make_roots(self: TestSupervisor, count: int,
+                    server_script: str) -> List[Path]:
+        roots: List[Path] = []
+
+        for num in range(count):
+            root = Path.cwd().joinpath(f'server{num}')
+            root.mkdir()
+            server_bin_path = root.joinpath('bedrock_server')
+            server_bin_path.write_text(server_script)
+            server_bin_path.chmod(0o755)
+            roots.append(root)
+
+        return roots
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Test module `gazoo.tar_writer`.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from tarfile import open as tar_open
+from unittest import main
+
+from gazoo.tar_writer import TarWriter
+
+from .helpers.temp_cwd_test_case import TempCwdTestCase
+
+
+class TestTarWriter(TempCwdTestCase):
+    """
+    Test class `TarWriter`.
+    """
+
+    def test_write_bytes(self: TestTarWriter) -> None:
+        """
+        Test `TarWriter.write_bytes`.
+
+        Expect a valid tar.xz archive with the data as an entry.
+        """
+
+        tar_file_path = Path('archive.tar.xz')
+        with TarWriter(tar_file_path, 'xz', 6) as tar_writer:
+            tar_writer.write_bytes('manifest.json', b'{}')
+
+        self.assertEqual(tar_writer.entry_count, 1)
+
+        with tar_open(tar_file_path, mode='r:xz') as tar_file:
+            entry_file = tar_file.extractfile('manifest.json')
+            assert entry_file is not None
+            self.assertEqual(entry_file.read(), b'{}')
+
+    def test_write_part(self: TestTarWriter) -> None:
+        """
+        Test `TarWriter.write_part` with parts of several lengths.
+
+        Expect a valid tar.xz archive with the entries in the order
+        written, each truncated to its length.
+        """
+
+        source_path = Path('source')
+        source_path.write_bytes(b'gazoo ' * 1000)
+
+        lengths = [0, 5, 512, 600, 10000]
+        tar_file_path = Path('archive.tar.xz')
+        with TarWriter(tar_file_path, 'xz', 1) as tar_writer:
+            for length in lengths:
+                part_path = Path(f'{length}.part')
+                TarWriter.compress_entry(f'world/{length}', source_path,
+                                         length, 'xz', 1, part_path)
+                tar_writer.write_part(part_path)
+
+        with tar_open(tar_file_path, mode='r:xz') as tar_file:
+            self.assertEqual(tar_file.getnames(),
+                             [f'world/{length}' for length in lengths])
+
+            for length in lengths:
+                entry_file = tar_file.extractfile(f'world/{length}')
+                assert entry_file is not None
+                self.assertEqual(entry_file.read(),
+                                 (b'gazoo ' * 1000)[:length])
+
+
+if __name__ == '__main__':
+    main()
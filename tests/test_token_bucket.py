@@ -0,0 +1,47 @@
+"""
+Test module `gazoo.token_bucket`.
+"""
+
+from __future__ import annotations
+
+from unittest import TestCase, main
+from unittest.mock import patch
+
+from gazoo.token_bucket import TokenBucket
+
+
+class TestTokenBucket(TestCase):
+    """
+    Test class `TokenBucket`.
+    """
+
+    def test_consume(self: TestTokenBucket) -> None:
+        """
+        Test `TokenBucket.consume`.
+
+        Expect no wait within the burst, then a wait for the debt.
+        """
+
+        with patch('gazoo.token_bucket.monotonic', return_value=0.0), \
+                patch('gazoo.token_bucket.sleep') as sleep:
+            bucket = TokenBucket(100.0)
+            bucket.consume(100)
+            sleep.assert_not_called()
+
+            bucket.consume(50)
+            sleep.assert_called_once_with(0.5)
+
+    def test_consume_unlimited(self: TestTokenBucket) -> None:
+        """
+        Test `TokenBucket.consume` with a rate of 0.
+
+        Expect no wait.
+        """
+
+        with patch('gazoo.token_bucket.sleep') as sleep:
+            TokenBucket(0).consume(1 << 40)
+            sleep.assert_not_called()
+
+
+if __name__ == '__main__':
+    main()
@@ -4,20 +4,170 @@ Test module `gazoo.util`.
 
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from io import BytesIO
+from multiprocessing import get_context
 from pathlib import Path
+from tarfile import open as tar_open
 from tempfile import NamedTemporaryFile
+from typing import TYPE_CHECKING
 from unittest import main
-
+from unittest.mock import patch
+from zipfile import ZipFile
+
+from gazoo.archive_slots import ArchiveSlots
+from gazoo.backup_file import BackupFile
+from gazoo.backup_manifest import BackupManifest
+from gazoo.io_throttle import IoThrottle
+from gazoo.page_cache import PageCache
+from gazoo.repository import Repository
 from gazoo.util import Util
 
 from .helpers.temp_cwd_test_case import TempCwdTestCase
 
+if TYPE_CHECKING:
+    from typing import List
+
 
-class TestUtil(TempCwdTestCase):
+class TestUtil(TempCwdTestCase):  # pylint: disable=too-many-public-methods
     """
     Test class `Util`.
     """
 
+    def test_archive_files(self: TestUtil) -> None:
+        """
+        Test `Util.archive_files` with a snapshot directory.
+
+        Expect a zip archive in the backups directory with the snapshot
+        files, named relative to the worlds directory.
+        """
+
+        Util.ensure_backups_dir()
+        db_dir_path = Util.worlds_dir_path().joinpath('world', 'db')
+        db_dir_path.mkdir(parents=True)
+        db_dir_path.joinpath('000001.ldb').write_bytes(b'0123456789')
+
+        backup_file = BackupFile(str(Path('world', '000001.ldb')), 4)
+        snapshot_dir_path = Util.snapshot_files([backup_file])
+        Util.archive_files([backup_file], Util.read_config(),
+                           snapshot_dir_path)
+
+        archives = list(Util.backups_dir_path().glob('world *.zip'))
+        self.assertEqual(len(archives), 1)
+
+        with ZipFile(archives[0]) as zip_file:
+            self.assertEqual(zip_file.read(str(Path('world', 'db',
+                                                    '000001.ldb'))),
+                             b'0123')
+
+        self.assertFalse(snapshot_dir_path.exists())
+
+    def test_archive_files_incremental(self: TestUtil) -> None:
+        """
+        Test `Util.archive_files` twice, then `Util.restore_backup`.
+
+        Expect the second archive to only hold the changed file (backups
+        not in the catalog are not taken for the previous one), both
+        compressed by the same pool of processes, and the restored world
+        to have the latest version of every file.
+        """
+
+        Util.ensure_backups_dir()
+        Util.config_file_path().write_text('full_backup_every=24\n',
+                                           encoding='utf-8')
+        Util.shutdown_compression()
+        self.addCleanup(Util.shutdown_compression)
+        world_dir_path = Util.worlds_dir_path().joinpath('world')
+        world_dir_path.joinpath('db').mkdir(parents=True)
+        world_dir_path.joinpath('db', '000001.ldb').write_bytes(b'0123456789')
+        world_dir_path.joinpath('level.dat').write_bytes(b'abc')
+
+        names = ['world 2024-01-01 00-00-00', 'world 2024-01-01 00-10-00']
+        with patch.object(Util, 'backup_name', side_effect=names), \
+                patch('gazoo.util.ProcessPoolExecutor',
+                      wraps=ProcessPoolExecutor) as pool_class:
+            for length in [3, 4]:
+                world_dir_path.joinpath('level.dat').write_bytes(
+                    b'abcd'[:length])
+                backup_files = [
+                    BackupFile(str(Path('world', '000001.ldb')), 10),
+                    BackupFile(str(Path('world', 'level.dat')), length),
+                ]
+                Util.archive_files(backup_files, Util.read_config(),
+                                   Util.snapshot_files(backup_files))
+
+                Util.backups_dir_path().joinpath(
+                    'world 2024-01-01 00-05-00.zip').write_bytes(b'stray')
+
+        self.assertEqual(pool_class.call_count, 1)
+
+        second_path = Util.backups_dir_path().joinpath(f'{names[1]}.zip')
+        with ZipFile(second_path) as zip_file:
+            self.assertEqual(
+                sorted(zip_file.namelist()),
+                sorted([BackupManifest.ENTRY_NAME,
+                        str(Path('world', 'level.dat'))]))
+
+        manifest = BackupManifest.from_archive(second_path)
+        assert manifest is not None
+        self.assertEqual(manifest.runs, 1)
+        self.assertEqual(manifest.archive_names(),
+                         {f'{name}.zip' for name in names})
+
+        world_dir_path.joinpath('level.dat').unlink()
+        Util.restore_backup(second_path.name)
+
+        self.assertEqual(
+            world_dir_path.joinpath('db', '000001.ldb').read_bytes(),
+            b'0123456789')
+        self.assertEqual(world_dir_path.joinpath('level.dat').read_bytes(),
+                         b'abcd')
+
+    def test_archive_files_tar(self: TestUtil) -> None:
+        """
+        Test `Util.archive_files` twice with the `tar.xz` archive format,
+        then `Util.restore_backup`.
+
+        Expect tar archives with the manifest first, and the restored
+        world to have the latest version of every file.
+        """
+
+        Util.ensure_backups_dir()
+        Util.config_file_path().write_text(
+            'archive_format=tar.xz\nfull_backup_every=24\n')
+        world_dir_path = Util.worlds_dir_path().joinpath('world')
+        world_dir_path.joinpath('db').mkdir(parents=True)
+        world_dir_path.joinpath('db', '000001.ldb').write_bytes(b'0123456789')
+
+        names = ['world 2024-01-01 00-00-00', 'world 2024-01-01 00-10-00']
+        with patch.object(Util, 'backup_name', side_effect=names):
+            for length in [3, 4]:
+                world_dir_path.joinpath('level.dat').write_bytes(
+                    b'abcd'[:length])
+                backup_files = [
+                    BackupFile(str(Path('world', '000001.ldb')), 10),
+                    BackupFile(str(Path('world', 'level.dat')), length),
+                ]
+                Util.archive_files(backup_files, Util.read_config(),
+                                   Util.snapshot_files(backup_files))
+
+        second_path = Util.backups_dir_path().joinpath(f'{names[1]}.tar.xz')
+        with tar_open(second_path, mode='r:xz') as tar_file:
+            self.assertEqual(tar_file.getnames(), [
+                BackupManifest.ENTRY_NAME,
+                str(Path('world', 'level.dat'))
+            ])
+
+        world_dir_path.joinpath('level.dat').unlink()
+        Util.restore_backup(second_path.name)
+
+        self.assertEqual(
+            world_dir_path.joinpath('db', '000001.ldb').read_bytes(),
+            b'0123456789')
+        self.assertEqual(world_dir_path.joinpath('level.dat').read_bytes(),
+                         b'abcd')
+
     def test_backups_dir_path(self: TestUtil) -> None:
         """
         Test `Util.backups_dir_path`.
@@ -37,6 +187,81 @@ class TestUtil(TempCwdTestCase):
 
         self.assertEqual(Util.base_dir_path(), Path.cwd().joinpath('gazoo'))
 
+    def test_cleanup_archives(self: TestUtil) -> None:
+        """
+        Test `Util.cleanup_archives` with `dry_run`.
+
+        Expect the backups the default policy does not keep (all but the
+        last of an old day), and nothing to be deleted.
+        """
+
+        Util.ensure_backups_dir()
+        for hour in range(24):
+            Util.catalog().add(f'new {hour}', 'world',
+                               datetime(2024, 1, 1, hour).timestamp(), 0, 0)
+            Util.catalog().add(f'old {hour}', 'world',
+                               datetime(2023, 1, 1, hour).timestamp(), 0, 0)
+
+        deleted = Util.cleanup_archives(Util.read_config(), dry_run=True)
+
+        self.assertEqual(sorted(deleted),
+                         sorted(f'old {hour}' for hour in range(23)))
+        self.assertEqual(len(Util.catalog().recent()), 48)
+
+    def test_cleanup_archives_store(self: TestUtil) -> None:
+        """
+        Test `Util.cleanup_archives` with a repository backup stored
+        while cleaning up.
+
+        Expect the deleted backup gone from the backups directory and
+        the catalog once the cleanup returns, its objects pruned, but the
+        objects of a backup stored after the cleanup decided what to
+        delete (and before it pruned the repository) kept.
+        """
+
+        Util.ensure_setup()
+        source_dir_path = Path('source')
+        source_dir_path.mkdir()
+        repository = Repository.for_dir(Util.repository_dir_path())
+
+        backups = [('old', b'old', 0), ('kept', b'kept', 30)]
+        for (name, data, minute) in backups:
+            source_dir_path.joinpath(name).write_bytes(data)
+            repository.store(
+                [(f'world/{name}', source_dir_path.joinpath(name), len(data))],
+                'world', Util.backups_dir_path().joinpath(f'{name}.json'),
+                Util.temp_dir_path())
+            Util.catalog().add(f'{name}.json', 'world',
+                               datetime(2024, 1, 1, 0, minute).timestamp(),
+                               0, 1)
+
+        source_dir_path.joinpath('new').write_bytes(b'new')
+        # pylint: disable=protected-access
+        delete_backups = Util._delete_backups
+
+        def store_then_delete(names: List[str]) -> None:
+            repository.store(
+                [('world/new', source_dir_path.joinpath('new'), 3)], 'world',
+                Util.backups_dir_path().joinpath('new.json'),
+                Util.temp_dir_path())
+            delete_backups(names)
+
+        with patch.object(Util,
+                          '_delete_backups',
+                          side_effect=store_then_delete):
+            self.assertEqual(Util.cleanup_archives(Util.read_config()),
+                             ['old.json'])
+
+        self.assertFalse(Util.backups_dir_path().joinpath('old.json').exists())
+        self.assertEqual(
+            [backup['name'] for backup in Util.catalog().recent()],
+            ['kept.json'])
+
+        objects = sorted(
+            path.read_bytes()
+            for path in Util.repository_dir_path().glob('objects/*/*'))
+        self.assertEqual(objects, [b'kept', b'new'])
+
     def test_config_file_path(self: TestUtil) -> None:
         """
         Test `Util.config_file_path`.
@@ -112,6 +337,32 @@ class TestUtil(TempCwdTestCase):
         Util.ensure_temp_dir()
         self.assertFalse(temp_file_path.exists())
 
+    def test_forward_stream(self: TestUtil) -> None:
+        """
+        Test `Util.forward_stream`.
+
+        Expect all bytes to be forwarded and every chunk to be scanned,
+        also from a raw (unbuffered) source.
+        """
+
+        source = BytesIO(b'line 1\nline 2\n' * 10000)
+        dest = BytesIO()
+        chunks = []
+
+        Util.forward_stream(source, dest, chunks.append)
+
+        self.assertEqual(dest.getvalue(), source.getvalue())
+        self.assertEqual(b''.join(chunks), source.getvalue())
+
+        source_path = Path('source')
+        source_path.write_bytes(source.getvalue())
+        dest = BytesIO()
+
+        with source_path.open('rb', buffering=0) as raw_source:
+            Util.forward_stream(raw_source, dest)
+
+        self.assertEqual(dest.getvalue(), source.getvalue())
+
     def test_read_config(self: TestUtil) -> None:
         """
         Test `Util.read_config`.
@@ -132,6 +383,189 @@ class TestUtil(TempCwdTestCase):
         self.assertEqual(config.backup_interval, 17)
         self.assertTrue(config.debug)
 
+    def test_restore_backup(self: TestUtil) -> None:
+        """
+        Test `Util.restore_backup` with a zip archive without manifest.
+
+        Expect the world to be replaced by the files of the archive (and
+        nothing else), no staging directory to be left behind, and
+        directories left behind by an earlier restore kept.
+        """
+
+        Util.ensure_backups_dir()
+        world_dir_path = Util.worlds_dir_path().joinpath('world')
+        world_dir_path.mkdir(parents=True)
+        world_dir_path.joinpath('stale').write_bytes(b'stale')
+        left_dir_path = Util.base_dir_path().joinpath('restore', 'left',
+                                                      'world.old')
+        left_dir_path.mkdir(parents=True)
+
+        zip_file_path = Util.backups_dir_path().joinpath(
+            'world 2024-01-01 00-00-00.zip')
+        with ZipFile(zip_file_path, 'w') as zip_file:
+            zip_file.writestr('world/db/', b'')
+            zip_file.writestr('world/db/000001.ldb', b'0123456789')
+            zip_file.writestr('world/level.dat', b'abc')
+
+        Util.restore_backup('1')
+
+        self.assertEqual(
+            sorted(str(path.relative_to(world_dir_path))
+                   for path in world_dir_path.rglob('*')),
+            ['db', str(Path('db', '000001.ldb')), 'level.dat'])
+        self.assertEqual(world_dir_path.joinpath('level.dat').read_bytes(),
+                         b'abc')
+        self.assertEqual([path.name for path in
+                          Util.worlds_dir_path().iterdir()], ['world'])
+        self.assertEqual(
+            list(Util.base_dir_path().joinpath('restore').iterdir()),
+            [left_dir_path.parent])
+
+    def test_restore_backup_rollback(self: TestUtil) -> None:
+        """
+        Test `Util.restore_backup` when the restored world cannot be
+        renamed into place (without an atomic exchange).
+
+        Expect the error raised, and the world and the restore directory
+        as they were.
+        """
+
+        Util.ensure_backups_dir()
+        world_dir_path = Util.worlds_dir_path().joinpath('world')
+        world_dir_path.mkdir(parents=True)
+        world_dir_path.joinpath('level.dat').write_bytes(b'old')
+
+        with ZipFile(
+                Util.backups_dir_path().joinpath(
+                    'world 2024-01-01 00-00-00.zip'), 'w') as zip_file:
+            zip_file.writestr('world/level.dat', b'new')
+
+        renames: List[Path] = []
+
+        def rename(path: Path, dest_path: Path) -> None:
+            renames.append(path)
+            if len(renames) == 2:
+                raise OSError('rename failed')
+            path.rename(dest_path)
+
+        with patch.object(Util, '_exchange', return_value=False), \
+                patch('gazoo.util.rename', side_effect=rename), \
+                self.assertRaises(OSError):
+            Util.restore_backup('1')
+
+        self.assertEqual(len(renames), 3)
+        self.assertEqual(world_dir_path.joinpath('level.dat').read_bytes(),
+                         b'old')
+        self.assertEqual([path.name for path in
+                          Util.worlds_dir_path().iterdir()], ['world'])
+        self.assertEqual(
+            list(Util.base_dir_path().joinpath('restore').iterdir()), [])
+
+    def test_save_snapshot_read_rate(self: TestUtil) -> None:
+        """
+        Test `Util.save_snapshot` with a read limit.
+
+        Expect the limit split evenly between the archiving process and
+        its compression processes, adding up to the configured limit.
+        """
+
+        Util.ensure_base_dir()
+        Util.config_file_path().write_text(
+            'archive_read_rate=4\ncompression_workers=3\n',
+            encoding='utf-8')
+        config = Util.read_config()
+
+        with patch.object(Util, 'archive_files'), \
+                patch.object(IoThrottle, 'limit',
+                             wraps=IoThrottle.limit) as limit:
+            Util.save_snapshot([], config, Path('snapshot'))
+
+        self.addCleanup(Util.shutdown_compression)
+        with patch('gazoo.util.ProcessPoolExecutor') as pool_class:
+            # pylint: disable=protected-access
+            Util._compression_executor(config)
+
+        read_rate = limit.call_args.args[0]
+        worker_read_rate = pool_class.call_args.kwargs['initargs'][0]
+        self.assertEqual(read_rate, worker_read_rate)
+        self.assertEqual(read_rate + 3 * worker_read_rate, 4 * 1024 * 1024)
+
+    def test_save_snapshot_limited(self: TestUtil) -> None:
+        """
+        Test `Util.save_snapshot` with archives limited to shared slots.
+
+        Expect the pool of compression processes stopped before the slot
+        is given back.
+        """
+
+        slots = ArchiveSlots(get_context('spawn'), 1)
+        Util.limit_archives(slots)
+        # pylint: disable=protected-access
+        self.addCleanup(setattr, Util, '_archive_slots', None)
+
+        def shutdown_compression() -> None:
+            self.assertFalse(slots.acquire(block=False))
+
+        with patch.object(Util, 'archive_files'), \
+                patch.object(Util, 'shutdown_compression',
+                             side_effect=shutdown_compression) as shutdown:
+            Util.save_snapshot([], Util.read_config(), Path('snapshot'))
+
+        shutdown.assert_called_once_with()
+        self.assertTrue(slots.acquire(block=False))
+
+    def test_snapshot_files(self: TestUtil) -> None:
+        """
+        Test `Util.snapshot_files`.
+
+        Expect copies of the files truncated to the reported length,
+        laid out like the worlds directory, and the page cache residency
+        of the live files (not the copies) sampled and dropped.
+        """
+
+        db_dir_path = Util.worlds_dir_path().joinpath('world', 'db')
+        db_dir_path.mkdir(parents=True)
+        db_dir_path.joinpath('000001.ldb').write_bytes(b'0123456789')
+        db_dir_path.joinpath('000002.log').write_bytes(b'abcdefghij')
+
+        backup_files = [
+            BackupFile(str(Path('world', '000001.ldb')), 10),
+            BackupFile(str(Path('world', '000002.log')), 3),
+        ]
+
+        with patch.object(PageCache, 'drop_uncached') as drop_uncached:
+            snapshot_dir_path = Util.snapshot_files(backup_files)
+        snapshot_db_dir_path = snapshot_dir_path.joinpath('world', 'db')
+
+        self.assertEqual(
+            sorted(drop_uncached.call_args.args[0]),
+            [db_dir_path.joinpath('000001.ldb'),
+             db_dir_path.joinpath('000002.log')])
+
+        self.assertEqual(
+            snapshot_db_dir_path.joinpath('000001.ldb').read_bytes(),
+            b'0123456789')
+        self.assertEqual(
+            snapshot_db_dir_path.joinpath('000002.log').read_bytes(), b'abc')
+        self.assertEqual(db_dir_path.joinpath('000002.log').read_bytes(),
+                         b'abcdefghij')
+
+    def test_split_lines(self: TestUtil) -> None:
+        """
+        Test `Util.split_lines`.
+
+        Expect complete lines without line endings and the incomplete
+        last line, which is also tracked when lines are not kept.
+        """
+
+        self.assertEqual(Util.split_lines(b'', b'a\r\nb\nc'),
+                         ([b'a', b'b'], b'c'))
+        self.assertEqual(Util.split_lines(b'c', b'd\ne'), ([b'cd'], b'e'))
+        self.assertEqual(Util.split_lines(b'c', b'd', keep=False),
+                         ([], b'cd'))
+        self.assertEqual(Util.split_lines(b'c', b'd\ne', keep=False),
+                         ([], b'e'))
+
     def test_temp_dir_path(self: TestUtil) -> None:
         """
         Test `Util.temp_dir_path`.
@@ -152,5 +586,5 @@ class TestUtil(TempCwdTestCase):
         self.assertEqual(Util.worlds_dir_path(), Path.cwd().joinpath('worlds'))
 
 
-if __name__ == 'main':
+if __name__ == '__main__':
     main()
@@ -0,0 +1,102 @@
+"""
+Test module `gazoo.world_activity`.
+"""
+
+from __future__ import annotations
+
+from os import utime
+from pathlib import Path
+from unittest import main
+
+from gazoo.world_activity import WorldActivity
+
+from .helpers.temp_cwd_test_case import TempCwdTestCase
+
+
+class TestWorldActivity(TempCwdTestCase):
+    """
+    Test class `WorldActivity`.
+    """
+
+    _CONNECTED = (b'[2024-01-01 00:00:00:000 INFO] Player connected: ' +
+                  b'Steve, xuid: 2535400000000000')
+    _DISCONNECTED = (b'[2024-01-01 01:00:00:000 INFO] Player disconnected: ' +
+                     b'Steve, xuid: 2535400000000000, pfid: 0123456789abcdef')
+
+    def test_fingerprint(self: TestWorldActivity) -> None:
+        """
+        Test `WorldActivity.fingerprint`.
+
+        Expect the same fingerprint for the same files, and a different
+        one after a file is modified or added.
+        """
+
+        db_dir_path = Path('worlds', 'world', 'db')
+        db_dir_path.mkdir(parents=True)
+        db_dir_path.joinpath('000001.ldb').write_bytes(b'0123')
+
+        fingerprint = WorldActivity.fingerprint(Path('worlds'))
+        self.assertEqual(WorldActivity.fingerprint(Path('worlds')),
+                         fingerprint)
+
+        utime(db_dir_path.joinpath('000001.ldb'), ns=(0, 0))
+        modified = WorldActivity.fingerprint(Path('worlds'))
+        self.assertNotEqual(modified, fingerprint)
+
+        db_dir_path.joinpath('000002.log').write_bytes(b'')
+        self.assertNotEqual(WorldActivity.fingerprint(Path('worlds')),
+                            modified)
+
+    def test_idle(self: TestWorldActivity) -> None:
+        """
+        Test `WorldActivity.idle` through backups and players connecting.
+
+        Expect not idle before the first backup, while a player is
+        online, after a player was online since the last backup, after a
+        failed backup, or with a different fingerprint; idle otherwise.
+        """
+
+        activity = WorldActivity()
+        self.assertFalse(activity.idle('a'))
+
+        activity.backup_started()
+        activity.backup_finished('a')
+        self.assertTrue(activity.idle('a'))
+        self.assertFalse(activity.idle('b'))
+
+        activity.scan_line(self._CONNECTED)
+        self.assertFalse(activity.idle('a'))
+
+        # online while backing up
+        activity.backup_started()
+        activity.backup_finished('a')
+        self.assertFalse(activity.idle('a'))
+
+        activity.scan_line(self._DISCONNECTED)
+        self.assertFalse(activity.idle('a'))
+
+        activity.backup_started()
+        activity.backup_finished('a')
+        self.assertTrue(activity.idle('a'))
+
+        activity.backup_started()
+        activity.backup_failed()
+        self.assertFalse(activity.idle('a'))
+
+    def test_mentions_players(self: TestWorldActivity) -> None:
+        """
+        Test `WorldActivity.mentions_players`.
+
+        Expect true for chunks mentioning players, also across the end
+        of the incomplete line before them, and false otherwise.
+        """
+
+        self.assertTrue(WorldActivity.mentions_players(b'', self._CONNECTED))
+        self.assertTrue(
+            WorldActivity.mentions_players(b'INFO] Pla', b'yer connected'))
+        self.assertFalse(
+            WorldActivity.mentions_players(b'INFO] ', b'Running compaction'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Test module `gazoo.world_index`.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from shutil import rmtree
+from unittest import main
+
+from gazoo.world_index import WorldIndex
+
+from .helpers.temp_cwd_test_case import TempCwdTestCase
+
+
+class TestWorldIndex(TempCwdTestCase):
+    """
+    Test class `WorldIndex`.
+    """
+
+    def test_find(self: TestWorldIndex) -> None:
+        """
+        Test `WorldIndex.find`.
+
+        Expect paths to all files with the name, including files added
+        after the index was built.
+        """
+
+        world_dir_path = Path.cwd().joinpath('world')
+        world_dir_path.joinpath('db').mkdir(parents=True)
+        world_dir_path.joinpath('db', 'CURRENT').touch()
+
+        index = WorldIndex(world_dir_path)
+        self.assertEqual(index.find('CURRENT'),
+                         [world_dir_path.joinpath('db', 'CURRENT')])
+        self.assertEqual(index.find('level.dat'), [])
+
+        world_dir_path.joinpath('level.dat').touch()
+        world_dir_path.joinpath('other').mkdir()
+        world_dir_path.joinpath('other', 'CURRENT').touch()
+
+        self.assertEqual(index.find('level.dat'),
+                         [world_dir_path.joinpath('level.dat')])
+        self.assertEqual(index.find('CURRENT'), [
+            world_dir_path.joinpath('db', 'CURRENT'),
+            world_dir_path.joinpath('other', 'CURRENT'),
+        ])
+
+    def test_for_world(self: TestWorldIndex) -> None:
+        """
+        Test `WorldIndex.for_world`.
+
+        Expect the same index for the same world directory.
+        """
+
+        self.assertIs(WorldIndex.for_world(Path.cwd().joinpath('world')),
+                      WorldIndex.for_world(Path.cwd().joinpath('world')))
+        self.assertIsNot(WorldIndex.for_world(Path.cwd().joinpath('world')),
+                         WorldIndex.for_world(Path.cwd().joinpath('other')))
+
+    def test_refresh(self: TestWorldIndex) -> None:
+        """
+        Test `WorldIndex.refresh`.
+
+        Expect removed files and directories to be dropped.
+        """
+
+        world_dir_path = Path.cwd().joinpath('world')
+        world_dir_path.joinpath('db').mkdir(parents=True)
+        world_dir_path.joinpath('db', '000001.ldb').touch()
+        world_dir_path.joinpath('db', '000002.ldb').touch()
+
+        index = WorldIndex(world_dir_path)
+        index.refresh()
+
+        world_dir_path.joinpath('db', '000001.ldb').unlink()
+        index.refresh(full=True)
+        self.assertEqual(index.find('000001.ldb'), [])
+        self.assertEqual(len(index.find('000002.ldb')), 1)
+
+        rmtree(world_dir_path.joinpath('db'))
+        index.refresh()
+        self.assertEqual(index.find('000002.ldb'), [])
+
+
+if __name__ == '__main__':
+    main()
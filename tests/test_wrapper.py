@@ -0,0 +1,31 @@
+"""
+Test module `gazoo.wrapper`.
+"""
+
+from __future__ import annotations
+
+from unittest import main
+
+from gazoo.wrapper import Wrapper
+
+from .helpers.stub_server_test_case import StubServerTestCase
+
+
+class TestWrapper(StubServerTestCase):
+    """
+    Test class `Wrapper`.
+    """
+
+    def test_run(self: TestWrapper) -> None:
+        """
+        Test `Wrapper.run` with a stub server.
+
+        Expect stdin forwarded to the server, its output and the backup
+        commands forwarded to stdout, and a scheduled backup made.
+        """
+
+        self.assert_wraps(Wrapper)
+
+
+if __name__ == '__main__':
+    main()
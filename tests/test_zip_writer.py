@@ -0,0 +1,108 @@
+"""
+Test module `gazoo.zip_writer`.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from unittest import main
+from zipfile import ZIP_BZIP2, ZIP_DEFLATED, ZIP_LZMA, ZIP_STORED, ZipFile
+
+from gazoo.zip_writer import ZipWriter
+
+from .helpers.temp_cwd_test_case import TempCwdTestCase
+
+
+class TestZipWriter(TempCwdTestCase):
+    """
+    Test class `ZipWriter`.
+    """
+
+    def test_write_bytes(self: TestZipWriter) -> None:
+        """
+        Test `ZipWriter.write_bytes`, mixed with stored entries.
+
+        Expect a valid zip archive with the data as an entry.
+        """
+
+        source_path = Path('source')
+        source_path.write_bytes(b'gazoo')
+
+        zip_file_path = Path('archive.zip')
+        with ZipWriter(zip_file_path) as zip_writer:
+            zip_writer.write_stored('world/source', source_path, 5)
+            zip_writer.write_bytes('manifest.json', b'{}')
+
+        with ZipFile(zip_file_path) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            self.assertEqual(zip_file.read('world/source'), b'gazoo')
+            self.assertEqual(zip_file.read('manifest.json'), b'{}')
+
+    def test_write_part(self: TestZipWriter) -> None:
+        """
+        Test `ZipWriter.write_part` with parts of every compression.
+
+        Expect a valid zip archive with the entries in the order written,
+        each truncated to its length.
+        """
+
+        source_path = Path('source')
+        source_path.write_bytes(b'gazoo ' * 1000)
+
+        compressions = [ZIP_STORED, ZIP_DEFLATED, ZIP_BZIP2, ZIP_LZMA]
+        zip_file_path = Path('archive.zip')
+        with ZipWriter(zip_file_path) as zip_writer:
+            for compression in compressions:
+                part_path = Path(f'{compression}.zip')
+                ZipWriter.compress_entry(f'world/{compression}', source_path,
+                                         600, compression, 9, part_path)
+                zip_writer.write_part(part_path)
+
+        with ZipFile(zip_file_path) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            self.assertEqual(
+                [info.filename for info in zip_file.infolist()],
+                [f'world/{compression}' for compression in compressions])
+            self.assertEqual(
+                [info.compress_type for info in zip_file.infolist()],
+                compressions)
+
+            for compression in compressions:
+                self.assertEqual(zip_file.read(f'world/{compression}'),
+                                 b'gazoo ' * 100)
+
+    def test_write_stored(self: TestZipWriter) -> None:
+        """
+        Test `ZipWriter.write_stored`, mixed with parts.
+
+        Expect a valid zip archive with stored entries truncated to their
+        length (or the length of the file, if shorter).
+        """
+
+        source_path = Path('source')
+        source_path.write_bytes(b'gazoo ' * 1000)
+        empty_path = Path('empty')
+        empty_path.touch()
+
+        zip_file_path = Path('archive.zip')
+        with ZipWriter(zip_file_path) as zip_writer:
+            zip_writer.write_stored('world/truncated', source_path, 12)
+
+            part_path = Path('part.zip')
+            ZipWriter.compress_entry('world/part', source_path, 6000,
+                                     ZIP_DEFLATED, 6, part_path)
+            zip_writer.write_part(part_path)
+
+            zip_writer.write_stored('world/empty', empty_path, 0)
+            zip_writer.write_stored('world/short', source_path, 9999)
+
+        with ZipFile(zip_file_path) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            self.assertEqual(zip_file.read('world/truncated'), b'gazoo gazoo ')
+            self.assertEqual(zip_file.read('world/part'), b'gazoo ' * 1000)
+            self.assertEqual(zip_file.read('world/empty'), b'')
+            self.assertEqual(zip_file.read('world/short'), b'gazoo ' * 1000)
+
+
+if __name__ == '__main__':
+    main()